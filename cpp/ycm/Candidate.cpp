@@ -17,10 +17,23 @@
 
 #include "Candidate.h"
 #include "Result.h"
+#include "Utils.h"
 
 namespace YouCompleteMe {
 
 void Candidate::ComputeCaseSwappedText() {
+  if ( IsAscii() ) {
+    case_swapped_text_.reserve( Text().size() );
+    for ( char byte : Text() ) {
+      uint8_t character = static_cast< uint8_t >( byte );
+      if ( IsUppercase( character ) || IsUppercase( character ^ 0x20 ) ) {
+        character ^= 0x20;
+      }
+      case_swapped_text_.push_back( static_cast< char >( character ) );
+    }
+    return;
+  }
+
   for ( const auto &character : Characters() ) {
     case_swapped_text_.append( character->SwappedCase() );
   }
@@ -100,6 +113,36 @@ Result Candidate::QueryMatchResult( const Word &query ) const {
   size_t candidate_index = 0;
   size_t index_sum = 0;
 
+  if ( query.IsAscii() && IsAscii() ) {
+    // Same as below but on bytes. Smart base matching is smart case matching
+    // for ASCII characters: a lowercase letter matches both cases while any
+    // other character only matches itself.
+    const std::string &query_text = query.Text();
+    const std::string &candidate_text = Text();
+
+    for ( ; candidate_index < candidate_text.size(); ++candidate_index ) {
+      uint8_t query_character = query_text[ query_index ];
+      uint8_t candidate_character = candidate_text[ candidate_index ];
+
+      if ( query_character == candidate_character ||
+           ( !IsUppercase( query_character ) &&
+             Lowercase( candidate_character ) == query_character ) ) {
+        index_sum += candidate_index;
+
+        if ( query_index + 1 == query_text.size() ) {
+          return Result( this,
+                         &query,
+                         index_sum,
+                         candidate_index == query_index );
+        }
+
+        ++query_index;
+      }
+    }
+
+    return Result();
+  }
+
   const CharacterSequence &query_characters = query.Characters();
   const CharacterSequence &candidate_characters = Characters();
 
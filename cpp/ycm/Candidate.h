@@ -32,11 +32,8 @@ public:
 
   YCM_EXPORT explicit Candidate( std::string&& text );
   // Make class noncopyable
-private:
-  Candidate( const Candidate& ) = default;
-  Candidate& operator=( const Candidate& ) = default;
-public:
-  Candidate clone() const { return *this; }
+  Candidate( const Candidate& ) = delete;
+  Candidate& operator=( const Candidate& ) = delete;
   Candidate( Candidate&& ) = default;
   Candidate& operator=( Candidate&& ) = default;
   ~Candidate() = default;
@@ -18,7 +18,6 @@
 #include "CodePoint.h"
 #include "Repository.h"
 
-#include <algorithm>
 #include <array>
 #include <cstdint>
 #include <cstring>
@@ -48,18 +47,73 @@ int GetCodePointLength( uint8_t leading_byte ) {
 }
 
 
+// Decodes |text| into |scalar_value| and returns true if |text| is the shortest
+// UTF-8 encoding of a single code point. Surrogates are decoded like any other
+// code point.
+bool DecodeCodePoint( std::string_view text, uint32_t &scalar_value ) {
+  if ( text.empty() ) {
+    return false;
+  }
+
+  auto leading_byte = static_cast< uint8_t >( text[ 0 ] );
+  size_t length;
+  uint32_t min_scalar_value;
+  if ( ( leading_byte & 0x80 ) == 0x00 ) {
+    length = 1;
+    scalar_value = leading_byte;
+    min_scalar_value = 0;
+  } else if ( ( leading_byte & 0xe0 ) == 0xc0 ) {
+    length = 2;
+    scalar_value = leading_byte & 0x1f;
+    min_scalar_value = 0x80;
+  } else if ( ( leading_byte & 0xf0 ) == 0xe0 ) {
+    length = 3;
+    scalar_value = leading_byte & 0x0f;
+    min_scalar_value = 0x800;
+  } else if ( ( leading_byte & 0xf8 ) == 0xf0 ) {
+    length = 4;
+    scalar_value = leading_byte & 0x07;
+    min_scalar_value = 0x10000;
+  } else {
+    return false;
+  }
+
+  if ( text.size() != length ) {
+    return false;
+  }
+
+  for ( size_t position = 1; position < length; ++position ) {
+    auto byte = static_cast< uint8_t >( text[ position ] );
+    // 10xxxxxx
+    if ( ( byte & 0xc0 ) != 0x80 ) {
+      return false;
+    }
+    scalar_value = ( scalar_value << 6 ) | ( byte & 0x3f );
+  }
+
+  return min_scalar_value <= scalar_value && scalar_value <= 0x10ffff;
+}
+
+
 RawCodePoint FindCodePoint( std::string_view text ) {
 #include "UnicodeTable.inc"
 
-  // Do a binary search on the array of code points to find the raw code point
-  // corresponding to the text. If no code point is found, return the default
-  // raw code point for that text.
-  const auto& original = code_points.original;
+  // Look up the position of the code point in the arrays through the two-stage
+  // table indexed by its scalar value. If the text is not a code point or if
+  // the code point is not in the arrays, return the default raw code point for
+  // that text.
+  uint32_t scalar_value;
+  if ( !DecodeCodePoint( text, scalar_value ) ) {
+    return { text, text, text, text, false, false, false, 0, 0, 0 };
+  }
 
-  auto it = std::lower_bound( original.begin(), original.end(), text );
-  if ( it != original.end() && text == *it ) {
-    auto index = static_cast< size_t >( std::distance( original.begin(), it ) );
-    return { *it,
+  size_t block = code_point_blocks[ scalar_value >> code_point_block_shift ];
+  size_t offset = scalar_value & ( ( 1 << code_point_block_shift ) - 1 );
+  uint32_t position = code_point_indexes[
+    ( block << code_point_block_shift ) + offset ];
+  if ( position != 0 ) {
+    size_t index = position - 1;
+    return { text,
              code_points.normal[ index ],
              code_points.folded_case[ index ],
              code_points.swapped_case[ index ],
@@ -19,14 +19,74 @@
 
 #include "Candidate.h"
 #include "IdentifierUtils.h"
+#include "RepositoryCollector.h"
 #include "Result.h"
 #include "Utils.h"
 
+#include <algorithm>
+#include <functional>
+#include <string_view>
+
 namespace YouCompleteMe {
 
+namespace {
+
+// Tags files are compared in blocks of this size to find out if they were only
+// appended to since the last time they were read.
+constexpr size_t TAGS_FILE_BLOCK_SIZE = 1 << 20;
+
+
+size_t HashBlock( std::string_view block ) {
+  return std::hash< std::string_view >()( block );
+}
+
+
+std::vector< size_t > BlockHashes( std::string_view tags ) {
+  std::vector< size_t > block_hashes;
+  block_hashes.reserve( tags.size() / TAGS_FILE_BLOCK_SIZE + 1 );
+  for ( size_t begin = 0; begin < tags.size(); begin += TAGS_FILE_BLOCK_SIZE ) {
+    block_hashes.push_back( HashBlock( tags.substr( begin,
+                                                    TAGS_FILE_BLOCK_SIZE ) ) );
+  }
+  return block_hashes;
+}
+
+
+// Returns true if |tags| starts with the |old_size| bytes whose block hashes
+// were |old_block_hashes|, followed by whole lines.
+bool TagsAppended( std::string_view tags,
+                   const std::vector< size_t > &block_hashes,
+                   size_t old_size,
+                   const std::vector< size_t > &old_block_hashes ) {
+  if ( old_size == 0 || tags.size() <= old_size ||
+       tags[ old_size - 1 ] != '\n' ) {
+    return false;
+  }
+  size_t num_full_blocks = old_size / TAGS_FILE_BLOCK_SIZE;
+  if ( !std::equal( old_block_hashes.begin(),
+                    old_block_hashes.begin() + num_full_blocks,
+                    block_hashes.begin() ) ) {
+    return false;
+  }
+  size_t last_block_size = old_size % TAGS_FILE_BLOCK_SIZE;
+  return last_block_size == 0 ||
+         HashBlock( tags.substr( num_full_blocks * TAGS_FILE_BLOCK_SIZE,
+                                 last_block_size ) ) ==
+           old_block_hashes.back();
+}
+
+
+size_t CombineHash( size_t seed, const std::string &identifier ) {
+  return seed ^ ( std::hash< std::string >()( identifier ) + 0x9e3779b9 +
+                  ( seed << 6 ) + ( seed >> 2 ) );
+}
+
+} // unnamed namespace
+
 
 IdentifierCompleter::IdentifierCompleter(
   std::vector< std::string > candidates ) {
+  auto locker = RepositoryCollector::Instance().UsageLock();
   identifier_database_.RecreateIdentifiers( std::move( candidates ), "", "" );
 }
 
@@ -35,6 +95,7 @@ IdentifierCompleter::IdentifierCompleter(
   std::vector< std::string >&& candidates,
   std::string&& filetype,
   std::string&& filepath ) {
+  auto locker = RepositoryCollector::Instance().UsageLock();
   identifier_database_.RecreateIdentifiers( std::move( candidates ),
                                             std::move( filetype ),
                                             std::move( filepath ) );
@@ -45,9 +106,13 @@ void IdentifierCompleter::AddSingleIdentifierToDatabase(
   std::string& new_candidate,
   std::string& filetype,
   std::string& filepath ) {
-  identifier_database_.AddSingleIdentifier( std::move( new_candidate ),
-                                            std::move( filetype ),
-                                            std::move( filepath ) );
+  {
+    auto locker = RepositoryCollector::Instance().UsageLock();
+    identifier_database_.AddSingleIdentifier( std::move( new_candidate ),
+                                              std::move( filetype ),
+                                              std::move( filepath ) );
+  }
+  RepositoryCollector::Instance().CollectIfOverBudget();
 }
 
 
@@ -55,18 +120,254 @@ void IdentifierCompleter::ClearForFileAndAddIdentifiersToDatabase(
   std::vector< std::string >& new_candidates,
   std::string& filetype,
   std::string& filepath ) {
-  identifier_database_.RecreateIdentifiers( std::move( new_candidates ),
+  {
+    // The identifiers of the file are not validated against the index they may
+    // have been loaded from anymore.
+    std::lock_guard indexed_files_locker( indexed_files_mutex_ );
+    indexed_files_.erase( filepath );
+    auto locker = RepositoryCollector::Instance().UsageLock();
+    identifier_database_.RecreateIdentifiers( std::move( new_candidates ),
+                                              std::move( filetype ),
+                                              std::move( filepath ) );
+  }
+  RepositoryCollector::Instance().CollectIfOverBudget();
+}
+
+
+void IdentifierCompleter::UpdateIdentifiersInDatabase(
+  std::vector< std::string >& added_candidates,
+  std::vector< std::string >& removed_candidates,
+  std::string& filetype,
+  std::string& filepath ) {
+  {
+    // The identifiers of the file are not validated against the index they may
+    // have been loaded from anymore.
+    std::lock_guard indexed_files_locker( indexed_files_mutex_ );
+    indexed_files_.erase( filepath );
+    auto locker = RepositoryCollector::Instance().UsageLock();
+    identifier_database_.UpdateIdentifiers( std::move( added_candidates ),
+                                            std::move( removed_candidates ),
                                             std::move( filetype ),
                                             std::move( filepath ) );
+  }
+  RepositoryCollector::Instance().CollectIfOverBudget();
 }
 
 
 void IdentifierCompleter::AddIdentifiersToDatabaseFromTagFiles(
   std::vector< std::string >& absolute_paths_to_tag_files ) {
-  for( auto&& path : absolute_paths_to_tag_files ) {
-    identifier_database_.RecreateIdentifiers(
-      ExtractIdentifiersFromTagsFile( std::move( path ) ) );
+  {
+    std::lock_guard locker( tags_files_mutex_ );
+    for( auto&& path : absolute_paths_to_tag_files ) {
+      AddIdentifiersFromTagsFileNoLock( std::move( path ) );
+    }
+  }
+  RepositoryCollector::Instance().CollectIfOverBudget();
+}
+
+
+bool IdentifierCompleter::SaveIndex( const std::string &path_to_index ) {
+  IdentifierIndex index;
+  {
+    auto locker = RepositoryCollector::Instance().UsageLock();
+    index.identifiers = identifier_database_.Identifiers();
+  }
+  {
+    std::lock_guard locker( tags_files_mutex_ );
+    index.tags_files = tags_files_;
+  }
+
+  // The identifiers from tags files are validated by comparing the tags files
+  // when they are added again so the modification times of their files are not
+  // needed.
+  HashMap< std::string, bool > files_in_tags;
+  for ( const auto& [ _, state ] : index.tags_files ) {
+    for ( const auto& [ _, filetype_hashes ] : state.identifier_hashes ) {
+      for ( const auto& [ filepath, _ ] : filetype_hashes ) {
+        files_in_tags[ filepath ] = true;
+      }
+    }
+  }
+
+  std::lock_guard locker( indexed_files_mutex_ );
+  for ( const auto& [ _, paths_to_identifiers ] : index.identifiers ) {
+    for ( const auto& [ filepath, _ ] : paths_to_identifiers ) {
+      if ( files_in_tags.count( filepath ) ||
+           index.file_mtimes.count( filepath ) ) {
+        continue;
+      }
+      // Files not validated yet keep the modification time of the index they
+      // were loaded from.
+      auto indexed_file = indexed_files_.find( filepath );
+      if ( indexed_file != indexed_files_.end() ) {
+        index.file_mtimes[ filepath ] = indexed_file->second.mtime;
+      } else if ( auto mtime = LastWriteTime( filepath ) ) {
+        index.file_mtimes[ filepath ] = *mtime;
+      }
+    }
   }
+
+  return WriteIdentifierIndex( path_to_index, index );
+}
+
+
+bool IdentifierCompleter::LoadIndex( const std::string &path_to_index ) {
+  std::optional< IdentifierIndex > index = ReadIdentifierIndex( path_to_index );
+  if ( !index ) {
+    return false;
+  }
+
+  {
+    std::lock_guard locker( tags_files_mutex_ );
+    for ( auto& [ path, state ] : index->tags_files ) {
+      tags_files_.try_emplace( path, std::move( state ) );
+    }
+  }
+
+  {
+    std::lock_guard locker( indexed_files_mutex_ );
+    std::vector< std::pair< std::string, std::string > > new_files;
+    {
+      auto usage_locker = RepositoryCollector::Instance().UsageLock();
+      new_files = identifier_database_.AddIdentifiersOfNewFiles(
+                    std::move( index->identifiers ) );
+    }
+    for ( auto&& [ filetype, filepath ] : new_files ) {
+      auto mtime = index->file_mtimes.find( filepath );
+      if ( mtime == index->file_mtimes.end() ) {
+        continue;
+      }
+      auto [ indexed_file, _ ] = indexed_files_.try_emplace(
+                                   std::move( filepath ),
+                                   IndexedFile{ mtime->second, {} } );
+      indexed_file->second.filetypes.push_back( std::move( filetype ) );
+    }
+  }
+
+  RepositoryCollector::Instance().CollectIfOverBudget();
+  return true;
+}
+
+
+void IdentifierCompleter::RemoveStaleIndexedIdentifiers() {
+  std::vector< std::pair< std::string, int64_t > > files_to_check;
+  {
+    std::lock_guard locker( indexed_files_mutex_ );
+    for ( const auto& [ filepath, indexed_file ] : indexed_files_ ) {
+      files_to_check.emplace_back( filepath, indexed_file.mtime );
+    }
+  }
+
+  // Checking the files can take a while so it's done without holding the lock.
+  // The files whose identifiers were set in the meantime are not in
+  // indexed_files_ anymore.
+  std::vector< std::string > stale_files;
+  for ( const auto& [ filepath, mtime ] : files_to_check ) {
+    if ( LastWriteTime( filepath ) != mtime ) {
+      stale_files.push_back( filepath );
+    }
+  }
+
+  std::lock_guard locker( indexed_files_mutex_ );
+  FiletypeIdentifierMap cleared_files;
+  for ( const auto& filepath : stale_files ) {
+    auto indexed_file = indexed_files_.find( filepath );
+    if ( indexed_file == indexed_files_.end() ) {
+      continue;
+    }
+    for ( const auto& filetype : indexed_file->second.filetypes ) {
+      cleared_files[ filetype ][ filepath ];
+    }
+  }
+  for ( const auto& [ filepath, _ ] : files_to_check ) {
+    indexed_files_.erase( filepath );
+  }
+
+  if ( !cleared_files.empty() ) {
+    auto usage_locker = RepositoryCollector::Instance().UsageLock();
+    identifier_database_.RecreateIdentifiers( std::move( cleared_files ) );
+  }
+}
+
+
+// Only the identifiers of the files whose tags changed are replaced in the
+// database. If tags were only appended to the tags file, only these tags are
+// parsed.
+//
+// WARNING: You need to hold the tags_files_mutex_ before calling this function.
+void IdentifierCompleter::AddIdentifiersFromTagsFileNoLock(
+  std::string&& path_to_tag_file ) {
+  const std::string contents = ReadTagsFile( path_to_tag_file );
+  if ( contents.empty() ) {
+    return;
+  }
+  const std::string_view tags( contents );
+  const fs::path tags_directory = fs::path( path_to_tag_file ).parent_path();
+  std::vector< size_t > block_hashes = BlockHashes( tags );
+
+  auto& state = tags_files_[ std::move( path_to_tag_file ) ];
+  if ( tags.size() == state.size && block_hashes == state.block_hashes ) {
+    return;
+  }
+
+  if ( TagsAppended( tags, block_hashes, state.size, state.block_hashes ) ) {
+    FiletypeIdentifierMap appended_identifiers = ExtractIdentifiersFromTags(
+      tags.substr( state.size ), tags_directory );
+    for ( const auto& [ filetype, paths_to_identifiers ] :
+          appended_identifiers ) {
+      auto& filetype_hashes = state.identifier_hashes[ filetype ];
+      for ( const auto& [ filepath, identifiers ] : paths_to_identifiers ) {
+        auto& identifier_hash = filetype_hashes[ filepath ];
+        for ( const auto& identifier : identifiers ) {
+          identifier_hash = CombineHash( identifier_hash, identifier );
+        }
+      }
+    }
+
+    auto locker = RepositoryCollector::Instance().UsageLock();
+    identifier_database_.AddIdentifiers( std::move( appended_identifiers ) );
+  } else {
+    FiletypeIdentifierMap identifiers = ExtractIdentifiersFromTags(
+      tags, tags_directory );
+    HashMap< std::string, HashMap< std::string, size_t > > identifier_hashes;
+    FiletypeIdentifierMap changed_identifiers;
+    for ( auto&& [ filetype, paths_to_identifiers ] : identifiers ) {
+      auto& filetype_hashes = identifier_hashes[ filetype ];
+      const auto& old_filetype_hashes = state.identifier_hashes[ filetype ];
+      for ( auto&& [ filepath, file_identifiers ] : paths_to_identifiers ) {
+        size_t identifier_hash = 0;
+        for ( const auto& identifier : file_identifiers ) {
+          identifier_hash = CombineHash( identifier_hash, identifier );
+        }
+        filetype_hashes[ filepath ] = identifier_hash;
+
+        auto old_hash = old_filetype_hashes.find( filepath );
+        if ( old_hash == old_filetype_hashes.end() ||
+             old_hash->second != identifier_hash ) {
+          changed_identifiers[ filetype ][ filepath ] =
+            std::move( file_identifiers );
+        }
+      }
+    }
+
+    // Clear the files that have no tags anymore.
+    for ( const auto& [ filetype, old_filetype_hashes ] :
+          state.identifier_hashes ) {
+      const auto& filetype_hashes = identifier_hashes[ filetype ];
+      for ( const auto& [ filepath, _ ] : old_filetype_hashes ) {
+        if ( !filetype_hashes.count( filepath ) ) {
+          changed_identifiers[ filetype ][ filepath ];
+        }
+      }
+    }
+    state.identifier_hashes = std::move( identifier_hashes );
+
+    auto locker = RepositoryCollector::Instance().UsageLock();
+    identifier_database_.RecreateIdentifiers( std::move( changed_identifiers ) );
+  }
+
+  state.size = tags.size();
+  state.block_hashes = std::move( block_hashes );
 }
 
 
@@ -81,7 +382,7 @@ std::vector< std::string > IdentifierCompleter::CandidatesForQueryAndType(
   std::string& query,
   const std::string &filetype,
   const size_t max_candidates ) const {
-
+  auto locker = RepositoryCollector::Instance().UsageLock();
   std::vector< Result > results =
     identifier_database_.ResultsForQueryAndType( std::move( query ),
                                                  filetype,
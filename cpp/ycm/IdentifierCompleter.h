@@ -19,7 +19,9 @@
 #define COMPLETER_H_7AR4UGXE
 
 #include "IdentifierDatabase.h"
+#include "IdentifierIndex.h"
 
+#include <mutex>
 #include <string>
 #include <vector>
 
@@ -43,21 +45,42 @@ public:
                        std::string&& filetype,
                        std::string&& filepath );
 
-  void AddSingleIdentifierToDatabase(
+  YCM_EXPORT void AddSingleIdentifierToDatabase(
     std::string& new_candidate,
     std::string& filetype,
     std::string& filepath );
 
   // Same as above, but clears all identifiers stored for the file before adding
   // new identifiers.
-  void ClearForFileAndAddIdentifiersToDatabase(
+  YCM_EXPORT void ClearForFileAndAddIdentifiersToDatabase(
     std::vector< std::string >& new_candidates,
     std::string& filetype,
     std::string& filepath );
 
+  // Same as above, but only adds |added_candidates| and removes one occurrence
+  // of each of |removed_candidates| from the identifiers stored for the file.
+  YCM_EXPORT void UpdateIdentifiersInDatabase(
+    std::vector< std::string >& added_candidates,
+    std::vector< std::string >& removed_candidates,
+    std::string& filetype,
+    std::string& filepath );
+
   YCM_EXPORT void AddIdentifiersToDatabaseFromTagFiles(
     std::vector< std::string >& absolute_paths_to_tag_files );
 
+  // Writes the identifiers of the database and the state of the tags files to
+  // the index file |path_to_index|. Returns false if it can't be written.
+  YCM_EXPORT bool SaveIndex( const std::string &path_to_index );
+
+  // Adds the identifiers of the index file |path_to_index| to the database for
+  // the files whose identifiers are not set yet and restores the state of the
+  // tags files. Returns false if the index can't be read.
+  YCM_EXPORT bool LoadIndex( const std::string &path_to_index );
+
+  // Removes the identifiers loaded from an index for the files modified since
+  // the index was saved, unless they were set again since.
+  YCM_EXPORT void RemoveStaleIndexedIdentifiers();
+
   // Only provided for tests!
   YCM_EXPORT std::vector< std::string > CandidatesForQuery(
     std::string&& query,
@@ -69,12 +92,29 @@ public:
     const size_t max_candidates = 0 ) const;
 
 private:
+  // A file whose identifiers were loaded from an index.
+  struct IndexedFile {
+    // Last modification time of the file when the index was saved.
+    int64_t mtime;
+
+    std::vector< std::string > filetypes;
+  };
+
+  void AddIdentifiersFromTagsFileNoLock( std::string&& path_to_tag_file );
 
   /////////////////////////////
   // PRIVATE MEMBER VARIABLES
   /////////////////////////////
 
   IdentifierDatabase identifier_database_;
+
+  // tags file path -> state
+  HashMap< std::string, TagsFileState > tags_files_;
+  std::mutex tags_files_mutex_;
+
+  // filepath -> file not validated since loaded from an index
+  HashMap< std::string, IndexedFile > indexed_files_;
+  std::mutex indexed_files_mutex_;
 };
 
 } // namespace YouCompleteMe
@@ -21,60 +21,102 @@
 #include "IdentifierUtils.h"
 #include "Repository.h"
 #include "Result.h"
+#include "ThreadPool.h"
 #include "Utils.h"
 
-#ifdef YCM_ABSEIL_SUPPORTED
-#include <absl/container/flat_hash_set.h>
-namespace YouCompleteMe {
-template< typename T, typename H, typename Eq >
-using HashSet = absl::flat_hash_set< T, H, Eq >;
-template< typename T > using Hash = absl::Hash< T >;
-} // namespace YouCompleteMe
-#else
-#include <unordered_set>
-namespace YouCompleteMe {
-template< typename T, typename H, typename Eq >
-using HashSet = std::unordered_set< T, H, Eq >;
-template< typename T >
-using Hash = std::hash< T >;
-} // namespace YouCompleteMe
-#endif
+#include <algorithm>
 #include <memory>
 
 namespace YouCompleteMe {
 
-namespace {
-struct CandidateHasher {
-  size_t operator() ( const Candidate* c ) const noexcept {
-    static Hash< std::string > h;
-    return h(c->Text());
-  }
-};
-struct CandidateCompareEq {
-  bool operator() ( const Candidate* a, const Candidate* b ) const noexcept {
-    return a->Text() == b->Text();
+IdentifierDatabase::IdentifierDatabase()
+  : candidate_repository_( Repository< Candidate >::Instance() ),
+    repository_root_( [ this ]( CandidateMarks &marks ) {
+      std::shared_lock locker( filetype_candidate_map_mutex_ );
+      for ( const auto& [ _, paths_to_candidates ] : filetype_candidate_map_ ) {
+        for ( const auto& [ _, candidates ] : paths_to_candidates ) {
+          marks.insert( candidates.begin(), candidates.end() );
+        }
+      }
+    } ) {
+}
+
+
+void IdentifierDatabase::RecreateIdentifiers(
+  FiletypeIdentifierMap&& filetype_identifier_map ) {
+  std::lock_guard locker( filetype_candidate_map_mutex_ );
+
+  for ( auto&& [ filetype, paths_to_candidates ] : filetype_identifier_map ) {
+    for ( auto&& [ filepath, identifiers ] : paths_to_candidates ) {
+      RecreateIdentifiersNoLock( std::move( identifiers ),
+                                 std::string( filetype ),
+                                 std::string( filepath ) );
+    }
   }
-};
-} // namespace
+}
 
 
+void IdentifierDatabase::AddIdentifiers(
+  FiletypeIdentifierMap&& filetype_identifier_map ) {
+  std::lock_guard locker( filetype_candidate_map_mutex_ );
 
-IdentifierDatabase::IdentifierDatabase()
-  : candidate_repository_( Repository< Candidate >::Instance() ) {
+  for ( auto&& [ filetype, paths_to_candidates ] : filetype_identifier_map ) {
+    auto& candidate_index = filetype_candidate_index_[ filetype ];
+    for ( auto&& [ filepath, identifiers ] : paths_to_candidates ) {
+      auto& current_identifier_set = GetCandidateSet( std::string( filetype ),
+                                                      std::string( filepath ) );
+      for ( const Candidate* candidate : candidate_repository_.GetElements(
+                                           std::move( identifiers ) ) ) {
+        current_identifier_set.push_back( candidate );
+        candidate_index.Add( candidate );
+      }
+    }
+  }
 }
 
 
-void IdentifierDatabase::RecreateIdentifiers(
+std::vector< std::pair< std::string, std::string > >
+IdentifierDatabase::AddIdentifiersOfNewFiles(
   FiletypeIdentifierMap&& filetype_identifier_map ) {
   std::lock_guard locker( filetype_candidate_map_mutex_ );
 
+  std::vector< std::pair< std::string, std::string > > new_files;
   for ( auto&& [ filetype, paths_to_candidates ] : filetype_identifier_map ) {
+    auto it = filetype_candidate_map_.find( filetype );
     for ( auto&& [ filepath, identifiers ] : paths_to_candidates ) {
+      if ( it != filetype_candidate_map_.end() &&
+           it->second.count( filepath ) ) {
+        continue;
+      }
+      new_files.emplace_back( filetype, filepath );
       RecreateIdentifiersNoLock( std::move( identifiers ),
                                  std::string( filetype ),
                                  std::string( filepath ) );
+      it = filetype_candidate_map_.find( filetype );
+    }
+  }
+  return new_files;
+}
+
+
+FiletypeIdentifierMap IdentifierDatabase::Identifiers() const {
+  std::shared_lock locker( filetype_candidate_map_mutex_ );
+
+  FiletypeIdentifierMap filetype_identifier_map;
+  for ( const auto& [ filetype, paths_to_candidates ] :
+        filetype_candidate_map_ ) {
+    for ( const auto& [ filepath, candidates ] : paths_to_candidates ) {
+      if ( candidates.empty() ) {
+        continue;
+      }
+      auto& identifiers = filetype_identifier_map[ filetype ][ filepath ];
+      identifiers.reserve( candidates.size() );
+      for ( const Candidate *candidate : candidates ) {
+        identifiers.push_back( candidate->Text() );
+      }
     }
   }
+  return filetype_identifier_map;
 }
 
 
@@ -86,15 +128,14 @@ void IdentifierDatabase::AddSingleIdentifier(
   std::vector< std::string > candidate_vector( 1 );
   auto candidate_pointer = candidate_repository_.GetElements(
          { new_candidate } )[ 0 ];
-  auto& current_identifier_set = GetCandidateSet( std::move( filetype ),
+  auto& current_identifier_set = GetCandidateSet( std::string( filetype ),
                                                   std::move( filepath ) );
-  auto it = std::find_if( current_identifier_set.begin(),
-                          current_identifier_set.end(),
-                          [ candidate_pointer ]( const Candidate& c ) {
-                                return c.Text() == candidate_pointer->Text();
-                          } );
+  auto it = std::find( current_identifier_set.begin(),
+                       current_identifier_set.end(),
+                       candidate_pointer );
   if ( it == current_identifier_set.end() ) {
-    current_identifier_set.push_back( candidate_pointer->clone() );
+    current_identifier_set.push_back( candidate_pointer );
+    filetype_candidate_index_[ filetype ].Add( candidate_pointer );
   }
 }
 
@@ -110,58 +151,90 @@ void IdentifierDatabase::RecreateIdentifiers(
 }
 
 
+void IdentifierDatabase::UpdateIdentifiers(
+  std::vector< std::string >&& added_candidates,
+  std::vector< std::string >&& removed_candidates,
+  std::string&& filetype,
+  std::string&& filepath ) {
+  std::lock_guard locker( filetype_candidate_map_mutex_ );
+
+  auto& current_identifier_set = GetCandidateSet( std::string( filetype ),
+                                                  std::move( filepath ) );
+  auto& candidate_index = filetype_candidate_index_[ std::move( filetype ) ];
+
+  if ( !removed_candidates.empty() ) {
+    // candidate -> number of occurrences to remove
+    HashMap< const Candidate *, size_t > removals;
+    for ( const Candidate* candidate : candidate_repository_.GetElements(
+                                         std::move( removed_candidates ) ) ) {
+      ++removals[ candidate ];
+    }
+
+    auto removed_begin = std::remove_if(
+      current_identifier_set.begin(),
+      current_identifier_set.end(),
+      [ &removals, &candidate_index ]( const Candidate *candidate ) {
+        auto it = removals.find( candidate );
+        if ( it == removals.end() || it->second == 0 ) {
+          return false;
+        }
+        --it->second;
+        candidate_index.Remove( candidate );
+        return true;
+      } );
+    current_identifier_set.erase( removed_begin, current_identifier_set.end() );
+  }
+
+  for ( const Candidate* candidate : candidate_repository_.GetElements(
+                                       std::move( added_candidates ) ) ) {
+    current_identifier_set.push_back( candidate );
+    candidate_index.Add( candidate );
+  }
+}
+
+
 std::vector< Result > IdentifierDatabase::ResultsForQueryAndType(
   std::string&& query,
   const std::string &filetype,
   const size_t max_results ) const {
-  FiletypeCandidateMap::const_iterator it;
-  {
-    std::shared_lock locker( filetype_candidate_map_mutex_ );
-    it = filetype_candidate_map_.find( filetype );
+  std::shared_lock locker( filetype_candidate_map_mutex_ );
+  auto it = filetype_candidate_index_.find( filetype );
 
-    if ( it == filetype_candidate_map_.end() ) {
-      return {};
-    }
+  if ( it == filetype_candidate_index_.end() ) {
+    return {};
   }
-  Word query_object( std::move( query ) );
 
-  HashSet< const Candidate *,
-           CandidateHasher,
-           CandidateCompareEq > seen_candidates;
-  seen_candidates.reserve( candidate_repository_.NumStoredElements() );
-  std::vector< Result > results;
-
-  {
-    std::lock_guard locker( filetype_candidate_map_mutex_ );
-    auto& paths_to_candidates = it->second;
-    for ( const auto& [ _, candidates ] : paths_to_candidates ) {
-      for ( const Candidate& candidate : candidates ) {
-        if ( !seen_candidates.insert( &candidate ).second ) {
-          continue;
-        }
+  const auto& candidates = it->second.Candidates();
+  Word query_object( std::move( query ) );
 
-        if ( candidate.IsEmpty() ||
-             !candidate.ContainsBytes( query_object ) ) {
-          continue;
-        }
+  auto filter_chunk = [ & ]( size_t, size_t begin, size_t end ) {
+    std::vector< Result > chunk_results;
+    for ( size_t i = begin; i < end; ++i ) {
+      const Candidate *candidate = candidates[ i ];
+      if ( !candidate->ContainsBytes( query_object ) ) {
+        continue;
+      }
 
-        Result result = candidate.QueryMatchResult( query_object );
+      Result result = candidate->QueryMatchResult( query_object );
 
-        if ( result.IsSubsequence() ) {
-          results.push_back( result );
-        }
+      if ( result.IsSubsequence() ) {
+        chunk_results.push_back( result );
       }
     }
-  }
+    return chunk_results;
+  };
 
-  PartialSort( results, max_results );
-  return results;
+  return FilterAndPartialSort< Result >(
+    candidates.size(),
+    ThreadPool::Instance().NumChunks( candidates.size() ),
+    filter_chunk,
+    max_results );
 }
 
 
 // WARNING: You need to hold the filetype_candidate_map_mutex_ before calling
 // this function and while using the returned set.
-std::vector< Candidate > &IdentifierDatabase::GetCandidateSet(
+std::vector< const Candidate * > &IdentifierDatabase::GetCandidateSet(
   std::string&& filetype,
   std::string&& filepath ) {
   return filetype_candidate_map_[ std::move( filetype ) ]
@@ -176,18 +249,50 @@ void IdentifierDatabase::RecreateIdentifiersNoLock(
   std::string&& filetype,
   std::string&& filepath ) {
 
-  auto& current_identifier_set = GetCandidateSet( std::move( filetype ),
+  auto& current_identifier_set = GetCandidateSet( std::string( filetype ),
                                                   std::move( filepath ) );
-  auto candidate_pointers = candidate_repository_.GetElements(
-                  std::move( new_candidates ) );
-  current_identifier_set.clear();
-  current_identifier_set.reserve( candidate_pointers.size() );
-  std::transform( candidate_pointers.begin(),
-                  candidate_pointers.end(),
-                  std::back_inserter( current_identifier_set ),
-                  []( const Candidate* candidate_ptr ) {
-                    return candidate_ptr->clone();
-                  } );
+  auto& candidate_index = filetype_candidate_index_[ std::move( filetype ) ];
+
+  for ( const Candidate* candidate : current_identifier_set ) {
+    candidate_index.Remove( candidate );
+  }
+
+  current_identifier_set = candidate_repository_.GetElements(
+                             std::move( new_candidates ) );
+  for ( const Candidate* candidate : current_identifier_set ) {
+    candidate_index.Add( candidate );
+  }
+}
+
+
+void IdentifierDatabase::CandidateIndex::Add( const Candidate *candidate ) {
+  if ( candidate->IsEmpty() ) {
+    return;
+  }
+
+  auto [ it, inserted ] = positions_and_counts_.try_emplace(
+                            candidate, candidates_.size(), 0 );
+  if ( inserted ) {
+    candidates_.push_back( candidate );
+  }
+  ++it->second.second;
+}
+
+
+void IdentifierDatabase::CandidateIndex::Remove( const Candidate *candidate ) {
+  auto it = positions_and_counts_.find( candidate );
+  if ( it == positions_and_counts_.end() || --it->second.second > 0 ) {
+    return;
+  }
+
+  // Move the last candidate into the position of the removed one.
+  size_t position = it->second.first;
+  positions_and_counts_.erase( it );
+  if ( position + 1 < candidates_.size() ) {
+    candidates_[ position ] = candidates_.back();
+    positions_and_counts_[ candidates_[ position ] ].first = position;
+  }
+  candidates_.pop_back();
 }
 
 } // namespace YouCompleteMe
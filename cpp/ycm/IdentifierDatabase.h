@@ -31,9 +31,12 @@ template< typename K, typename V >
 using HashMap = std::unordered_map< K, V >;
 } // namespace YouCompleteMe
 #endif
+#include "RepositoryCollector.h"
+
 #include <memory>
 #include <shared_mutex>
 #include <string>
+#include <utility>
 #include <vector>
 
 namespace YouCompleteMe {
@@ -59,6 +62,9 @@ using FiletypeIdentifierMap = HashMap< std::string, FilepathToIdentifiers >;
 // access to this internal data structure so that it's easier to confirm that
 // mutexes are used correctly to protect concurrent access.
 //
+// Callers must hold the usage lock of the RepositoryCollector while calling the
+// methods of this class and while using the returned results.
+//
 // This class is thread-safe.
 class IdentifierDatabase {
 public:
@@ -73,11 +79,31 @@ public:
 
   void RecreateIdentifiers( FiletypeIdentifierMap&& filetype_identifier_map );
 
+  // Same as above, but keeps the identifiers already stored for the files.
+  void AddIdentifiers( FiletypeIdentifierMap&& filetype_identifier_map );
+
+  // Same as RecreateIdentifiers, but skips the files whose identifiers were
+  // already set. Returns the filetypes and filepaths of the files that were
+  // not skipped.
+  std::vector< std::pair< std::string, std::string > >
+  AddIdentifiersOfNewFiles( FiletypeIdentifierMap&& filetype_identifier_map );
+
+  // Returns the identifiers stored for each file.
+  FiletypeIdentifierMap Identifiers() const;
+
   void RecreateIdentifiers(
     std::vector< std::string >&& new_candidates,
     std::string&& filetype,
     std::string&& filepath );
 
+  // Adds |added_candidates| to the identifiers stored for the file and removes
+  // one occurrence of each of |removed_candidates| from them.
+  void UpdateIdentifiers(
+    std::vector< std::string >&& added_candidates,
+    std::vector< std::string >&& removed_candidates,
+    std::string&& filetype,
+    std::string&& filepath );
+
   void ClearCandidatesStoredForFile( std::string&& filetype,
                                      std::string&& filepath );
 
@@ -87,7 +113,7 @@ public:
     const size_t max_results ) const;
 
 private:
-  std::vector< Candidate > &GetCandidateSet(
+  std::vector< const Candidate * > &GetCandidateSet(
     std::string&& filetype,
     std::string&& filepath );
 
@@ -96,18 +122,46 @@ private:
     std::string&& filetype,
     std::string&& filepath );
 
+  // The unique candidates of a filetype across all its files. Each candidate
+  // is counted once per occurrence in a file so that it's only removed when no
+  // file contains it anymore.
+  class CandidateIndex {
+  public:
+    void Add( const Candidate *candidate );
+    void Remove( const Candidate *candidate );
+
+    inline const std::vector< const Candidate * > &Candidates() const {
+      return candidates_;
+    }
+
+  private:
+    // candidate -> ( position in candidates_, number of occurrences )
+    HashMap< const Candidate *, std::pair< size_t, size_t > >
+      positions_and_counts_;
+    std::vector< const Candidate * > candidates_;
+  };
+
 
   // filepath -> ( candidate )
-  using FilepathToCandidates = HashMap< std::string, std::vector< Candidate > >;
+  using FilepathToCandidates = HashMap< std::string,
+                                        std::vector< const Candidate * > >;
 
   // filetype -> ( filepath -> ( candidate ) )
   using FiletypeCandidateMap = HashMap< std::string, FilepathToCandidates >;
 
+  // filetype -> ( unique candidates )
+  using FiletypeCandidateIndex = HashMap< std::string, CandidateIndex >;
+
 
   Repository< Candidate > &candidate_repository_;
 
   FiletypeCandidateMap filetype_candidate_map_;
+  FiletypeCandidateIndex filetype_candidate_index_;
+
+  // Protects filetype_candidate_map_ and filetype_candidate_index_.
   mutable std::shared_mutex filetype_candidate_map_mutex_;
+
+  RepositoryRoot repository_root_;
 };
 
 } // namespace YouCompleteMe
@@ -0,0 +1,319 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "IdentifierIndex.h"
+#include "Utils.h"
+
+#include <cstring>
+#include <fstream>
+#include <string_view>
+#include <system_error>
+
+namespace YouCompleteMe {
+
+namespace {
+
+// An index starts with this magic string followed by the format version. The
+// version must be increased whenever the format changes.
+//
+// Integers are written in the byte order of the machine, which is the one that
+// reads the index. All the strings are written once in a table at the beginning
+// of the index and are then referred to by their position in that table:
+//
+//   magic, version
+//   number of strings, ( length, bytes )...
+//   number of files, ( filetype, filepath, number of identifiers,
+//                      ( identifier )... )...
+//   number of modification times, ( filepath, modification time )...
+//   number of tags files, ( path, size, number of block hashes,
+//                           ( block hash )..., number of identifier hashes,
+//                           ( filetype, filepath, identifier hash )... )...
+constexpr std::string_view INDEX_MAGIC = "YCMIDX";
+constexpr uint32_t INDEX_VERSION = 1;
+
+
+class IndexWriter {
+public:
+  template< typename Integer >
+  void Write( Integer value ) {
+    body_.append( reinterpret_cast< const char * >( &value ), sizeof( value ) );
+  }
+
+  void WriteString( std::string_view text ) {
+    auto [ it, inserted ] = string_positions_.try_emplace(
+                              text, uint32_t( strings_.size() ) );
+    if ( inserted ) {
+      strings_.push_back( text );
+    }
+    Write( it->second );
+  }
+
+  // Returns the index made of the header, the string table, and what was
+  // written so far.
+  std::string Contents() const {
+    IndexWriter header;
+    header.body_.append( INDEX_MAGIC );
+    header.Write( INDEX_VERSION );
+    header.Write( uint32_t( strings_.size() ) );
+    for ( std::string_view text : strings_ ) {
+      header.Write( uint32_t( text.size() ) );
+      header.body_.append( text );
+    }
+    return header.body_ + body_;
+  }
+
+private:
+  std::string body_;
+  std::vector< std::string_view > strings_;
+  HashMap< std::string_view, uint32_t > string_positions_;
+};
+
+
+// Reads an index. Reading past its end or an invalid string position makes the
+// reader invalid; from then on, zeros and empty strings are read.
+class IndexReader {
+public:
+  explicit IndexReader( std::string_view contents )
+    : contents_( contents ),
+      valid_( true ) {
+  }
+
+  bool IsValid() const {
+    return valid_;
+  }
+
+  template< typename Integer >
+  Integer Read() {
+    Integer value = 0;
+    if ( !Consume( sizeof( value ) ) ) {
+      return value;
+    }
+    std::memcpy( &value, contents_.data() - sizeof( value ), sizeof( value ) );
+    return value;
+  }
+
+  // Reads a number of elements, each taking at least |min_element_size| bytes.
+  // This is checked against the remaining bytes so that an invalid index never
+  // makes the reader allocate more memory than the size of the index.
+  size_t ReadCount( size_t min_element_size ) {
+    auto count = Read< uint32_t >();
+    if ( count > contents_.size() / min_element_size ) {
+      valid_ = false;
+      return 0;
+    }
+    return count;
+  }
+
+  std::string_view ReadBytes( size_t size ) {
+    if ( !Consume( size ) ) {
+      return {};
+    }
+    return std::string_view( contents_.data() - size, size );
+  }
+
+  void ReadStringTable() {
+    size_t num_strings = ReadCount( sizeof( uint32_t ) );
+    strings_.reserve( num_strings );
+    for ( size_t i = 0; i < num_strings; ++i ) {
+      strings_.push_back( ReadBytes( Read< uint32_t >() ) );
+    }
+  }
+
+  std::string ReadString() {
+    auto position = Read< uint32_t >();
+    if ( position >= strings_.size() ) {
+      valid_ = false;
+      return {};
+    }
+    return std::string( strings_[ position ] );
+  }
+
+private:
+  bool Consume( size_t size ) {
+    if ( !valid_ || size > contents_.size() ) {
+      valid_ = false;
+      return false;
+    }
+    contents_.remove_prefix( size );
+    return true;
+  }
+
+  std::string_view contents_;
+  std::vector< std::string_view > strings_;
+  bool valid_;
+};
+
+
+std::string ReadIndexFile( const fs::path &path_to_index ) {
+  std::string contents;
+  try {
+    if ( fs::is_regular_file( path_to_index ) ) {
+      std::ifstream file( path_to_index, std::ios::in | std::ios::binary );
+      contents.resize( fs::file_size( path_to_index ) );
+      file.read( contents.data(), std::streamsize( contents.size() ) );
+      contents.resize( size_t( file.gcount() ) );
+    }
+  } catch ( ... ) {
+    contents.clear();
+  }
+  return contents;
+}
+
+} // unnamed namespace
+
+
+bool WriteIdentifierIndex( const fs::path &path_to_index,
+                           const IdentifierIndex &index ) {
+  IndexWriter writer;
+
+  size_t num_files = 0;
+  for ( const auto& [ _, paths_to_identifiers ] : index.identifiers ) {
+    num_files += paths_to_identifiers.size();
+  }
+  writer.Write( uint32_t( num_files ) );
+  for ( const auto& [ filetype, paths_to_identifiers ] : index.identifiers ) {
+    for ( const auto& [ filepath, identifiers ] : paths_to_identifiers ) {
+      writer.WriteString( filetype );
+      writer.WriteString( filepath );
+      writer.Write( uint32_t( identifiers.size() ) );
+      for ( const auto& identifier : identifiers ) {
+        writer.WriteString( identifier );
+      }
+    }
+  }
+
+  writer.Write( uint32_t( index.file_mtimes.size() ) );
+  for ( const auto& [ filepath, mtime ] : index.file_mtimes ) {
+    writer.WriteString( filepath );
+    writer.Write( int64_t( mtime ) );
+  }
+
+  writer.Write( uint32_t( index.tags_files.size() ) );
+  for ( const auto& [ path, state ] : index.tags_files ) {
+    writer.WriteString( path );
+    writer.Write( uint64_t( state.size ) );
+    writer.Write( uint32_t( state.block_hashes.size() ) );
+    for ( size_t block_hash : state.block_hashes ) {
+      writer.Write( uint64_t( block_hash ) );
+    }
+    size_t num_identifier_hashes = 0;
+    for ( const auto& [ _, filetype_hashes ] : state.identifier_hashes ) {
+      num_identifier_hashes += filetype_hashes.size();
+    }
+    writer.Write( uint32_t( num_identifier_hashes ) );
+    for ( const auto& [ filetype, filetype_hashes ] :
+          state.identifier_hashes ) {
+      for ( const auto& [ filepath, identifier_hash ] : filetype_hashes ) {
+        writer.WriteString( filetype );
+        writer.WriteString( filepath );
+        writer.Write( uint64_t( identifier_hash ) );
+      }
+    }
+  }
+
+  // Write to a temporary file first so that a partially written index is never
+  // read.
+  std::string contents = writer.Contents();
+  fs::path temporary_path = path_to_index;
+  temporary_path += ".tmp";
+  std::error_code error;
+  fs::create_directories( path_to_index.parent_path(), error );
+  {
+    std::ofstream file( temporary_path,
+                        std::ios::out | std::ios::binary | std::ios::trunc );
+    file.write( contents.data(), std::streamsize( contents.size() ) );
+    if ( !file ) {
+      return false;
+    }
+  }
+  fs::rename( temporary_path, path_to_index, error );
+  return !error;
+}
+
+
+std::optional< IdentifierIndex > ReadIdentifierIndex(
+  const fs::path &path_to_index ) {
+  const std::string contents = ReadIndexFile( path_to_index );
+  IndexReader reader( contents );
+  if ( reader.ReadBytes( INDEX_MAGIC.size() ) != INDEX_MAGIC ||
+       reader.Read< uint32_t >() != INDEX_VERSION ) {
+    return std::nullopt;
+  }
+  reader.ReadStringTable();
+
+  IdentifierIndex index;
+  size_t num_files = reader.ReadCount( 3 * sizeof( uint32_t ) );
+  for ( size_t i = 0; i < num_files; ++i ) {
+    std::string filetype = reader.ReadString();
+    std::string filepath = reader.ReadString();
+    auto& identifiers = index.identifiers[ std::move( filetype ) ]
+                                         [ std::move( filepath ) ];
+    size_t num_identifiers = reader.ReadCount( sizeof( uint32_t ) );
+    identifiers.reserve( num_identifiers );
+    for ( size_t j = 0; j < num_identifiers; ++j ) {
+      identifiers.push_back( reader.ReadString() );
+    }
+  }
+
+  size_t num_mtimes = reader.ReadCount( sizeof( uint32_t ) +
+                                        sizeof( int64_t ) );
+  for ( size_t i = 0; i < num_mtimes; ++i ) {
+    std::string filepath = reader.ReadString();
+    index.file_mtimes[ std::move( filepath ) ] = reader.Read< int64_t >();
+  }
+
+  size_t num_tags_files = reader.ReadCount( 2 * sizeof( uint32_t ) +
+                                            sizeof( uint64_t ) );
+  for ( size_t i = 0; i < num_tags_files; ++i ) {
+    auto& state = index.tags_files[ reader.ReadString() ];
+    state.size = size_t( reader.Read< uint64_t >() );
+    size_t num_block_hashes = reader.ReadCount( sizeof( uint64_t ) );
+    state.block_hashes.reserve( num_block_hashes );
+    for ( size_t j = 0; j < num_block_hashes; ++j ) {
+      state.block_hashes.push_back( size_t( reader.Read< uint64_t >() ) );
+    }
+    size_t num_identifier_hashes = reader.ReadCount( 2 * sizeof( uint32_t ) +
+                                                     sizeof( uint64_t ) );
+    for ( size_t j = 0; j < num_identifier_hashes; ++j ) {
+      std::string filetype = reader.ReadString();
+      std::string filepath = reader.ReadString();
+      state.identifier_hashes[ std::move( filetype ) ]
+                             [ std::move( filepath ) ] =
+        size_t( reader.Read< uint64_t >() );
+    }
+  }
+
+  if ( !reader.IsValid() ) {
+    return std::nullopt;
+  }
+  return index;
+}
+
+
+std::optional< int64_t > LastWriteTime( const fs::path &path ) {
+  std::error_code error;
+  if ( !fs::is_regular_file( path, error ) ) {
+    return std::nullopt;
+  }
+  auto mtime = fs::last_write_time( path, error );
+  if ( error ) {
+    return std::nullopt;
+  }
+  return int64_t( mtime.time_since_epoch().count() );
+}
+
+} // namespace YouCompleteMe
@@ -0,0 +1,75 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#ifndef IDENTIFIERINDEX_H_R4M8QXTZ
+#define IDENTIFIERINDEX_H_R4M8QXTZ
+
+#include "IdentifierDatabase.h"
+
+#include <cstdint>
+#include <filesystem>
+#include <optional>
+#include <string>
+#include <vector>
+
+namespace YouCompleteMe {
+
+// What is known about a tags file since it was last added to the database.
+struct TagsFileState {
+  size_t size = 0;
+
+  // Hashes of the contents in blocks of TAGS_FILE_BLOCK_SIZE bytes.
+  std::vector< size_t > block_hashes;
+
+  // filetype -> ( filepath -> hash of the identifiers in order )
+  HashMap< std::string, HashMap< std::string, size_t > > identifier_hashes;
+};
+
+
+// The contents of an identifier index, a file from which the identifier
+// completer is restored when ycmd is restarted.
+struct IdentifierIndex {
+  FiletypeIdentifierMap identifiers;
+
+  // filepath -> last modification time when the index was written. The
+  // identifiers of these files are stale if the files were modified since.
+  HashMap< std::string, int64_t > file_mtimes;
+
+  // tags file path -> state
+  HashMap< std::string, TagsFileState > tags_files;
+};
+
+
+// Writes |index| to |path_to_index|, creating its directory if needed. Returns
+// false if the index can't be written.
+YCM_EXPORT bool WriteIdentifierIndex(
+  const std::filesystem::path &path_to_index,
+  const IdentifierIndex &index );
+
+// Returns the index written to |path_to_index| or nothing if it can't be read
+// or is not a valid index.
+YCM_EXPORT std::optional< IdentifierIndex > ReadIdentifierIndex(
+  const std::filesystem::path &path_to_index );
+
+// Returns the last modification time of |path| as stored in an index or nothing
+// if it is not a regular file.
+YCM_EXPORT std::optional< int64_t > LastWriteTime(
+  const std::filesystem::path &path );
+
+} // namespace YouCompleteMe
+
+#endif /* end of include guard: IDENTIFIERINDEX_H_R4M8QXTZ */
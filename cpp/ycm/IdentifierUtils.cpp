@@ -16,11 +16,15 @@
 // along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 #include "IdentifierUtils.h"
+#include "ThreadPool.h"
 #include "Utils.h"
 
+#include <algorithm>
 #include <array>
 #include <filesystem>
+#include <fstream>
 #include <functional>
+#include <iterator>
 #include <string_view>
 #include <utility>
 
@@ -48,24 +52,65 @@ constexpr std::array LANG_TO_FILETYPE = {
   std::pair{ "SystemdUnit"sv      , "systemd"sv     },
 };
 
-}  // unnamed namespace
+// Only used to estimate the number of tags in a tags file.
+constexpr size_t AVERAGE_TAG_LINE_LENGTH = 64;
 
+// The comments and strings removed by RemoveIdentifierFreeText. At each
+// position, they are tried in this order.
+enum CommentOrString : unsigned {
+  C_STYLE_COMMENT               = 1 << 0, // /* ... */
+  CPP_STYLE_COMMENT             = 1 << 1, // // ...
+  PYTHON_STYLE_COMMENT          = 1 << 2, // # ...
+  MULTILINE_SINGLE_QUOTE_STRING = 1 << 3, // ''' ... '''
+  MULTILINE_DOUBLE_QUOTE_STRING = 1 << 4, // """ ... """
+  SINGLE_QUOTE_STRING           = 1 << 5, // '...'
+  DOUBLE_QUOTE_STRING           = 1 << 6, // "..."
+  BACK_QUOTE_STRING             = 1 << 7, // `...`
+};
 
-// For details on the tag format supported, see here for details:
-// http://ctags.sourceforge.net/FORMAT
-// TL;DR: The only supported format is the one Exuberant Ctags emits.
-FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
-  const fs::path &path_to_tag_file ) {
-  FiletypeIdentifierMap filetype_identifier_map;
-  const auto lines = [ &path_to_tag_file ]{
-    try {
-      return ReadUtf8File( path_to_tag_file );
-    } catch ( ... ) {
-      return std::vector< std::string >{};
-    }
-  }();
+constexpr unsigned DEFAULT_COMMENTS_AND_STRINGS =
+  C_STYLE_COMMENT | CPP_STYLE_COMMENT | PYTHON_STYLE_COMMENT |
+  MULTILINE_SINGLE_QUOTE_STRING | MULTILINE_DOUBLE_QUOTE_STRING |
+  SINGLE_QUOTE_STRING | DOUBLE_QUOTE_STRING;
+constexpr unsigned CPP_COMMENTS_AND_STRINGS =
+  C_STYLE_COMMENT | CPP_STYLE_COMMENT | SINGLE_QUOTE_STRING |
+  DOUBLE_QUOTE_STRING;
+
+// Same as FILETYPE_TO_COMMENT_AND_STRING_REGEX in identifier_utils.py.
+constexpr std::array FILETYPE_TO_COMMENTS_AND_STRINGS = {
+  std::pair{ "c"sv          , CPP_COMMENTS_AND_STRINGS },
+  std::pair{ "cpp"sv        , CPP_COMMENTS_AND_STRINGS },
+  std::pair{ "cuda"sv       , CPP_COMMENTS_AND_STRINGS },
+  std::pair{ "go"sv         , CPP_COMMENTS_AND_STRINGS | BACK_QUOTE_STRING },
+  std::pair{ "javascript"sv , CPP_COMMENTS_AND_STRINGS },
+  std::pair{ "objc"sv       , CPP_COMMENTS_AND_STRINGS },
+  std::pair{ "objcpp"sv     , CPP_COMMENTS_AND_STRINGS },
+  std::pair{ "python"sv     , unsigned( PYTHON_STYLE_COMMENT |
+                                        MULTILINE_SINGLE_QUOTE_STRING |
+                                        MULTILINE_DOUBLE_QUOTE_STRING |
+                                        SINGLE_QUOTE_STRING |
+                                        DOUBLE_QUOTE_STRING ) },
+  std::pair{ "rust"sv       , unsigned( CPP_STYLE_COMMENT |
+                                        SINGLE_QUOTE_STRING |
+                                        DOUBLE_QUOTE_STRING ) },
+  std::pair{ "typescript"sv , CPP_COMMENTS_AND_STRINGS },
+};
+
+
+// Adds the identifiers of the tag lines in |tags| to |filetype_identifier_map|.
+void AddIdentifiersFromTagLines(
+  std::string_view tags,
+  const fs::path &tags_directory,
+  FiletypeIdentifierMap &filetype_identifier_map ) {
+  // Most tags share a few thousand paths and a handful of languages.
+  HashMap< std::string_view, std::string > canonical_paths;
+  HashMap< std::string_view, std::string > filetypes;
+
+  while ( !tags.empty() ) {
+    const size_t line_end = std::min( tags.find( '\n' ), tags.size() );
+    const std::string_view line = tags.substr( 0, line_end );
+    tags.remove_prefix( std::min( line_end + 1, tags.size() ) );
 
-  for ( auto&& line : lines ) {
     // Identifier name is from the start of the line to the first \t.
     const auto id_end = std::find( line.cbegin(), line.cend(), '\t' );
     if ( id_end == line.cend() ) {
@@ -97,16 +142,276 @@ FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
       return end;
     }();
     std::string_view identifier( line.data(), id_end - line.cbegin() );
-    fs::path path( path_begin, path_end );
-    path = fs::weakly_canonical( path_to_tag_file.parent_path() / path );
+    std::string_view raw_path( &*path_begin, path_end - path_begin );
+    auto [ path_it, path_inserted ] = canonical_paths.try_emplace( raw_path );
+    if ( path_inserted ) {
+      path_it->second = fs::weakly_canonical(
+        tags_directory / fs::path( path_begin, path_end ) ).string();
+    }
     std::string_view language( &*lang_begin, lang_end - lang_begin );
-    std::string filetype( FindWithDefault( LANG_TO_FILETYPE,
-                                           language,
-                                           Lowercase( language ) ) );
-    filetype_identifier_map[ std::move( filetype ) ]
-                           [ std::move( path ).string() ]
+    auto [ filetype_it, filetype_inserted ] = filetypes.try_emplace( language );
+    if ( filetype_inserted ) {
+      filetype_it->second = FindWithDefault( LANG_TO_FILETYPE,
+                                             language,
+                                             Lowercase( language ) );
+    }
+    filetype_identifier_map[ filetype_it->second ][ path_it->second ]
       .emplace_back( identifier );
   }
+}
+
+
+// Returns the end of the line containing |position|.
+size_t LineEnd( std::string_view text, size_t position ) {
+  return std::min( text.find( '\n', position ), text.size() );
+}
+
+
+// Returns the end of the string opened by the quote at |begin| or npos if it
+// isn't closed on the same line. A backslash escapes a backslash or a quote
+// but, like the lazy (?:\\\\|\\'|.)*?' regex of identifier_utils.py that
+// backtracks, the last escaped quote closes the string if nothing else does.
+size_t StringEnd( std::string_view text, size_t begin ) {
+  const char quote = text[ begin ];
+  size_t last_escaped_quote = std::string_view::npos;
+  for ( size_t i = begin + 1; i < text.size() && text[ i ] != '\n'; ++i ) {
+    if ( text[ i ] == quote ) {
+      return i + 1;
+    }
+    if ( text[ i ] == '\\' && i + 1 < text.size() &&
+         ( text[ i + 1 ] == '\\' || text[ i + 1 ] == quote ) ) {
+      ++i;
+      if ( text[ i ] == quote ) {
+        last_escaped_quote = i;
+      }
+    }
+  }
+  return last_escaped_quote == std::string_view::npos ?
+         std::string_view::npos : last_escaped_quote + 1;
+}
+
+
+// Returns the end of the multiline comment or string opened by |opener| at
+// |begin| and closed by |closer|, or npos if it's never closed. |last_closer|
+// is the position of the last |closer| in |text| so that each unclosed opener
+// doesn't search the rest of the text.
+size_t MultilineEnd( std::string_view text,
+                     size_t begin,
+                     std::string_view opener,
+                     std::string_view closer,
+                     size_t last_closer ) {
+  if ( text.compare( begin, opener.size(), opener ) != 0 ||
+       last_closer == std::string_view::npos ||
+       last_closer < begin + opener.size() ) {
+    return std::string_view::npos;
+  }
+  return text.find( closer, begin + opener.size() ) + closer.size();
+}
+
+
+// Returns the size of the opener of a multiline comment or string at
+// |position| in |text|, or 0 if there is none.
+size_t MultilineOpenerSize( std::string_view text, size_t position ) {
+  const char first = text[ position ];
+  if ( first != '/' && first != '\'' && first != '"' ) {
+    return 0;
+  }
+  for ( std::string_view opener : { "/*"sv, "'''"sv, "\"\"\""sv } ) {
+    if ( text.compare( position, opener.size(), opener ) == 0 ) {
+      return opener.size();
+    }
+  }
+  return 0;
+}
+
+}  // unnamed namespace
+
+
+std::string RemoveIdentifierFreeText( std::string_view text,
+                                      std::string_view filetype ) {
+  return StripCommentsAndStrings( text, filetype ).text;
+}
+
+
+StrippedText StripCommentsAndStrings( std::string_view text,
+                                      std::string_view filetype ) {
+  const unsigned comments_and_strings = FindWithDefault(
+    FILETYPE_TO_COMMENTS_AND_STRINGS,
+    filetype,
+    unsigned( DEFAULT_COMMENTS_AND_STRINGS ) );
+  const size_t last_c_comment_closer = text.rfind( "*/" );
+  const size_t last_single_quotes_closer = text.rfind( "'''" );
+  const size_t last_double_quotes_closer = text.rfind( "\"\"\"" );
+  auto enabled = [ comments_and_strings ]( CommentOrString comment_or_string ) {
+    return ( comments_and_strings & comment_or_string ) != 0;
+  };
+
+  StrippedText stripped;
+  std::string &result = stripped.text;
+  result.reserve( text.size() );
+  // The line of |counted_end|. Lines are only counted up to the positions where
+  // they are needed.
+  size_t line = 0;
+  size_t counted_end = 0;
+  auto line_at = [ text, &line, &counted_end ]( size_t position ) {
+    line += size_t( std::count( text.begin() + counted_end,
+                                text.begin() + position,
+                                '\n' ) );
+    counted_end = position;
+    return line;
+  };
+  size_t copied_end = 0;
+  size_t position = 0;
+  while ( position < text.size() ) {
+    const bool escaped = position > 0 && text[ position - 1 ] == '\\';
+    size_t end = std::string_view::npos;
+    switch ( text[ position ] ) {
+      case '/':
+        if ( enabled( C_STYLE_COMMENT ) ) {
+          end = MultilineEnd( text, position, "/*", "*/",
+                              last_c_comment_closer );
+        }
+        if ( end == std::string_view::npos && enabled( CPP_STYLE_COMMENT ) &&
+             text.compare( position, 2, "//" ) == 0 ) {
+          end = LineEnd( text, position );
+        }
+        break;
+      case '#':
+        if ( enabled( PYTHON_STYLE_COMMENT ) ) {
+          end = LineEnd( text, position );
+        }
+        break;
+      case '\'':
+        if ( enabled( MULTILINE_SINGLE_QUOTE_STRING ) ) {
+          end = MultilineEnd( text, position, "'''", "'''",
+                              last_single_quotes_closer );
+        }
+        if ( end == std::string_view::npos && !escaped &&
+             enabled( SINGLE_QUOTE_STRING ) ) {
+          end = StringEnd( text, position );
+        }
+        break;
+      case '"':
+        if ( enabled( MULTILINE_DOUBLE_QUOTE_STRING ) ) {
+          end = MultilineEnd( text, position, "\"\"\"", "\"\"\"",
+                              last_double_quotes_closer );
+        }
+        if ( end == std::string_view::npos && !escaped &&
+             enabled( DOUBLE_QUOTE_STRING ) ) {
+          end = StringEnd( text, position );
+        }
+        break;
+      case '`':
+        if ( !escaped && enabled( BACK_QUOTE_STRING ) ) {
+          end = StringEnd( text, position );
+        }
+        break;
+    }
+
+    // Multiline openers are looked for whatever the filetype, like
+    // MULTILINE_OPENER_REGEX in identifier_completer.py.
+    const size_t opener_size = MultilineOpenerSize( text, position );
+    if ( opener_size != 0 &&
+         ( end == std::string_view::npos || end - position < opener_size ) ) {
+      const size_t opener_line = line_at( position );
+      if ( stripped.unclosed_lines.empty() ||
+           stripped.unclosed_lines.back() != opener_line ) {
+        stripped.unclosed_lines.push_back( opener_line );
+      }
+    }
+
+    if ( end == std::string_view::npos ) {
+      ++position;
+      continue;
+    }
+    // Comments and strings are replaced by their newlines so that the lines of
+    // the text don't move.
+    const size_t num_newlines = size_t( std::count( text.begin() + position,
+                                                    text.begin() + end,
+                                                    '\n' ) );
+    if ( num_newlines != 0 ) {
+      const size_t first_line = line_at( position ) + 1;
+      for ( size_t i = 0; i < num_newlines; ++i ) {
+        stripped.lines_in_comment_or_string.push_back( first_line + i );
+      }
+      line += num_newlines;
+      counted_end = end;
+    }
+    result.append( text, copied_end, position - copied_end );
+    result.append( num_newlines, '\n' );
+    position = copied_end = end;
+  }
+  result.append( text, copied_end );
+  return stripped;
+}
+
+
+std::string ReadTagsFile( const fs::path &path_to_tag_file ) {
+  std::string contents;
+  try {
+    if ( fs::is_regular_file( path_to_tag_file ) ) {
+      std::ifstream file( path_to_tag_file, std::ios::in | std::ios::binary );
+      contents.resize( fs::file_size( path_to_tag_file ) );
+      file.read( contents.data(), std::streamsize( contents.size() ) );
+      contents.resize( size_t( file.gcount() ) );
+    }
+  } catch ( ... ) {
+    contents.clear();
+  }
+  return contents;
+}
+
+
+// For details on the tag format supported, see here for details:
+// http://ctags.sourceforge.net/FORMAT
+// TL;DR: The only supported format is the one Exuberant Ctags emits.
+FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
+  const fs::path &path_to_tag_file ) {
+  return ExtractIdentifiersFromTags( ReadTagsFile( path_to_tag_file ),
+                                     path_to_tag_file.parent_path() );
+}
+
+
+FiletypeIdentifierMap ExtractIdentifiersFromTags(
+  std::string_view tags,
+  const fs::path &tags_directory ) {
+
+  // Split the tags into chunks of whole lines that are parsed in parallel.
+  size_t num_chunks = ThreadPool::Instance().NumChunks(
+                        tags.size() / AVERAGE_TAG_LINE_LENGTH );
+  std::vector< size_t > chunk_begins( num_chunks + 1, tags.size() );
+  chunk_begins[ 0 ] = 0;
+  for ( size_t chunk = 1; chunk < num_chunks; ++chunk ) {
+    size_t line_end = tags.find( '\n',
+                                 std::max( tags.size() * chunk / num_chunks,
+                                           chunk_begins[ chunk - 1 ] ) );
+    chunk_begins[ chunk ] = line_end == std::string_view::npos ?
+                            tags.size() : line_end + 1;
+  }
+
+  std::vector< FiletypeIdentifierMap > chunk_maps( num_chunks );
+  ThreadPool::Instance().Run( num_chunks, [ & ]( size_t chunk ) {
+    AddIdentifiersFromTagLines( tags.substr( chunk_begins[ chunk ],
+                                             chunk_begins[ chunk + 1 ] -
+                                             chunk_begins[ chunk ] ),
+                                tags_directory,
+                                chunk_maps[ chunk ] );
+  } );
+
+  // Merge the chunks in order so that the identifiers of each file stay in the
+  // order of the tags file.
+  FiletypeIdentifierMap filetype_identifier_map = std::move( chunk_maps[ 0 ] );
+  for ( size_t chunk = 1; chunk < num_chunks; ++chunk ) {
+    for ( auto&& [ filetype, paths_to_identifiers ] : chunk_maps[ chunk ] ) {
+      auto& filetype_paths = filetype_identifier_map[ filetype ];
+      for ( auto&& [ path, identifiers ] : paths_to_identifiers ) {
+        auto& path_identifiers = filetype_paths[ path ];
+        path_identifiers.insert( path_identifiers.end(),
+                                 std::make_move_iterator( identifiers.begin() ),
+                                 std::make_move_iterator( identifiers.end() ) );
+      }
+    }
+  }
   return filetype_identifier_map;
 }
 
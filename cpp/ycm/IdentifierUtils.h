@@ -21,12 +21,48 @@
 #include "IdentifierDatabase.h"
 
 #include <filesystem>
+#include <string>
+#include <string_view>
+#include <vector>
 
 namespace YouCompleteMe {
 
 YCM_EXPORT FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
   const std::filesystem::path &path_to_tag_file );
 
+// Returns the contents of a tags file or an empty string if it can't be read.
+YCM_EXPORT std::string ReadTagsFile(
+  const std::filesystem::path &path_to_tag_file );
+
+// Same as ExtractIdentifiersFromTagsFile but on the |tags| lines of a tags file
+// in |tags_directory|.
+YCM_EXPORT FiletypeIdentifierMap ExtractIdentifiersFromTags(
+  std::string_view tags,
+  const std::filesystem::path &tags_directory );
+
+// Removes the comments and strings of |text| for the given |filetype| like
+// RemoveIdentifierFreeText in identifier_utils.py, but in linear time.
+YCM_EXPORT std::string RemoveIdentifierFreeText( std::string_view text,
+                                                 std::string_view filetype );
+
+struct StrippedText {
+  // The text without its comments and strings, as returned by
+  // RemoveIdentifierFreeText.
+  std::string text;
+  // The lines starting inside a comment or a string, in increasing order.
+  std::vector< size_t > lines_in_comment_or_string;
+  // The lines containing an opener of a multiline comment or string, i.e. /*,
+  // ''' or """, that is neither inside a comment or a string nor starts one of
+  // its own, in increasing order.
+  std::vector< size_t > unclosed_lines;
+};
+
+// Same as RemoveIdentifierFreeText but also returns the lines of |text| that
+// are affected by the comments and strings spanning several lines, as needed to
+// strip them again from a line other than the first one.
+YCM_EXPORT StrippedText StripCommentsAndStrings( std::string_view text,
+                                                 std::string_view filetype );
+
 } // namespace YouCompleteMe
 
 #endif /* end of include guard: IDENTIFIERUTILS_CPP_WFFUZNET */
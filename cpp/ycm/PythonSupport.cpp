@@ -19,6 +19,7 @@
 #include "Candidate.h"
 #include "Repository.h"
 #include "Result.h"
+#include "ThreadPool.h"
 #include "Utils.h"
 
 #include <utility>
@@ -28,7 +29,7 @@ namespace YouCompleteMe {
 
 namespace {
 
-std::vector< const Candidate * > CandidatesFromObjectList(
+std::vector< std::string > CandidateStringsFromObjectList(
   const pybind11::list& candidates,
   pybind11::str candidate_property,
   size_t num_candidates ) {
@@ -47,52 +48,110 @@ std::vector< const Candidate * > CandidatesFromObjectList(
     }
   }
 
-  return Repository< Candidate >::Instance().GetElements(
-           std::move( candidate_strings ) );
+  return candidate_strings;
 }
 
-} // unnamed namespace
 
+// Returns true if any candidate matching |query| also matches |last_query|.
+// This is the case when |query| starts with |last_query|, unless the characters
+// at the junction could be combined into a single character. Only ASCII
+// characters are considered safe for that purpose.
+bool QueryExtends( const std::string &query, const std::string &last_query ) {
+  if ( query.compare( 0, last_query.size(), last_query ) != 0 ) {
+    return false;
+  }
+  if ( query.size() == last_query.size() || last_query.empty() ) {
+    return true;
+  }
+  return IsAscii( last_query.back() ) && IsAscii( query[ last_query.size() ] );
+}
+
+} // unnamed namespace
 
-pybind11::list FilterAndSortCandidates(
-  const pybind11::list& candidates,
-  pybind11::str candidate_property,
-  std::string& query,
-  const size_t max_candidates ) {
 
+CandidateSet::CandidateSet( const pybind11::list& candidates,
+                            pybind11::str candidate_property )
+  : has_last_query_( false ),
+    repository_root_( [ this ]( CandidateMarks &marks ) {
+      marks.insert( candidates_.begin(), candidates_.end() );
+    } ) {
   auto num_candidates = size_t( PyList_GET_SIZE( candidates.ptr() ) );
-  std::vector< const Candidate * > repository_candidates =
-    CandidatesFromObjectList( candidates,
-                              std::move( candidate_property ),
-                              num_candidates );
+  auto candidate_strings = CandidateStringsFromObjectList(
+                             candidates,
+                             std::move( candidate_property ),
+                             num_candidates );
+  {
+    auto locker = RepositoryCollector::Instance().UsageLock();
+    candidates_ = Repository< Candidate >::Instance().GetElements(
+                    std::move( candidate_strings ) );
+  }
+
+  objects_.reserve( num_candidates );
+  for ( size_t i = 0; i < num_candidates; ++i ) {
+    objects_.push_back( pybind11::reinterpret_borrow< pybind11::object >(
+      PyList_GET_ITEM( candidates.ptr(), i ) ) );
+  }
+
+  pybind11::gil_scoped_release unlock;
+  RepositoryCollector::Instance().CollectIfOverBudget();
+}
 
+
+pybind11::list CandidateSet::FilterAndSort( std::string query,
+                                            const size_t max_candidates ) {
   std::vector< ResultAnd< size_t > > result_and_objects;
   {
     pybind11::gil_scoped_release unlock;
-    Word query_object( std::move( query ) );
-
-    for ( size_t i = 0; i < num_candidates; ++i ) {
-      const Candidate *candidate = repository_candidates[ i ];
+    auto usage_lock = RepositoryCollector::Instance().UsageLock();
+    std::lock_guard< std::mutex > lock( filter_mutex_ );
 
-      if ( candidate->IsEmpty() || !candidate->ContainsBytes( query_object ) ) {
-        continue;
-      }
+    bool narrow = has_last_query_ && QueryExtends( query, last_query_ );
+    size_t num_candidates = narrow ? matching_indices_.size()
+                                   : candidates_.size();
 
-      Result result = candidate->QueryMatchResult( query_object );
+    last_query_ = query;
+    has_last_query_ = true;
+    Word query_object( std::move( query ) );
 
-      if ( result.IsSubsequence() ) {
-        result_and_objects.emplace_back( result, i );
+    size_t num_chunks = ThreadPool::Instance().NumChunks( num_candidates );
+    std::vector< std::vector< size_t > > chunk_indices( num_chunks );
+    auto filter_chunk = [ & ]( size_t chunk, size_t begin, size_t end ) {
+      std::vector< ResultAnd< size_t > > chunk_results;
+      for ( size_t i = begin; i < end; ++i ) {
+        size_t index = narrow ? matching_indices_[ i ] : i;
+        const Candidate *candidate = candidates_[ index ];
+
+        if ( candidate->IsEmpty() ||
+             !candidate->ContainsBytes( query_object ) ) {
+          continue;
+        }
+
+        Result result = candidate->QueryMatchResult( query_object );
+
+        if ( result.IsSubsequence() ) {
+          chunk_results.emplace_back( result, index );
+          chunk_indices[ chunk ].push_back( index );
+        }
       }
+      return chunk_results;
+    };
+
+    result_and_objects = FilterAndPartialSort< ResultAnd< size_t > >(
+      num_candidates, num_chunks, filter_chunk, max_candidates );
+
+    // Keep the matching indices in increasing order for the next query.
+    matching_indices_.clear();
+    for ( const auto& indices : chunk_indices ) {
+      matching_indices_.insert( matching_indices_.end(),
+                                indices.begin(),
+                                indices.end() );
     }
-
-    PartialSort( result_and_objects, max_candidates );
   }
 
   pybind11::list filtered_candidates( result_and_objects.size() );
   for ( size_t i = 0; i < result_and_objects.size(); ++i ) {
-    auto new_candidate = PyList_GET_ITEM(
-        candidates.ptr(),
-        result_and_objects[ i ].extra_object_ );
+    auto new_candidate =
+      objects_[ result_and_objects[ i ].extra_object_ ].ptr();
     Py_INCREF( new_candidate );
     PyList_SET_ITEM( filtered_candidates.ptr(), i, new_candidate );
   }
@@ -101,6 +160,17 @@ pybind11::list FilterAndSortCandidates(
 }
 
 
+pybind11::list FilterAndSortCandidates(
+  const pybind11::list& candidates,
+  pybind11::str candidate_property,
+  std::string& query,
+  const size_t max_candidates ) {
+
+  CandidateSet candidate_set( candidates, std::move( candidate_property ) );
+  return candidate_set.FilterAndSort( std::move( query ), max_candidates );
+}
+
+
 std::string GetUtf8String( pybind11::handle value ) {
   // If already a unicode or string (or something derived from it)
   // pybind will already convert to utf8 when converting to std::string.
@@ -18,10 +18,18 @@
 #ifndef PYTHONSUPPORT_H_KWGFEX0V
 #define PYTHONSUPPORT_H_KWGFEX0V
 
+#include "RepositoryCollector.h"
+
+#include <mutex>
+#include <string>
+#include <vector>
+
 #include <pybind11/pybind11.h>
 
 namespace YouCompleteMe {
 
+class Candidate;
+
 /// Given a list of python objects (that represent completion candidates) in a
 /// python list |candidates|, a |candidate_property| on which to filter and sort
 /// the candidates and a user query, returns a new sorted python list with the
@@ -34,6 +42,42 @@ YCM_EXPORT pybind11::list FilterAndSortCandidates(
   std::string& query,
   const size_t max_candidates = 0 );
 
+/// A list of python objects (that represent completion candidates) converted
+/// once to Candidate objects, so that filtering and sorting them again on
+/// another query does not need to access the python objects. The last query
+/// and the candidates that matched it are remembered: since a candidate can
+/// only match a query if it matches all the prefixes of that query, only those
+/// candidates are considered when the next query extends the last one.
+class CandidateSet {
+public:
+  /// Takes the same |candidates| and |candidate_property| arguments as
+  /// FilterAndSortCandidates.
+  YCM_EXPORT CandidateSet( const pybind11::list& candidates,
+                           pybind11::str candidate_property );
+  CandidateSet( const CandidateSet& ) = delete;
+  CandidateSet& operator=( const CandidateSet& ) = delete;
+
+  /// Same as FilterAndSortCandidates on the candidates of this set.
+  YCM_EXPORT pybind11::list FilterAndSort( std::string query,
+                                           const size_t max_candidates = 0 );
+
+  inline size_t Size() const {
+    return objects_.size();
+  }
+
+private:
+  std::vector< pybind11::object > objects_;
+  std::vector< const Candidate * > candidates_;
+
+  // Protects last_query_ and matching_indices_.
+  std::mutex filter_mutex_;
+  bool has_last_query_;
+  std::string last_query_;
+  std::vector< size_t > matching_indices_;
+
+  RepositoryRoot repository_root_;
+};
+
 /// Given a Python object that's supposed to be "string-like", returns a UTF-8
 /// encoded std::string. Raises an exception if the object can't be converted to
 /// a string.
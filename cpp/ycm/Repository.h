@@ -43,6 +43,31 @@ using HashMap = std::unordered_map< K, V >;
 
 namespace YouCompleteMe {
 
+// Approximate number of bytes allocated on the heap by the members of these
+// objects. Used to report and bound the memory used by the repositories.
+inline size_t HeapBytes( const CodePoint &code_point ) {
+  return code_point.Normal().capacity() +
+         code_point.FoldedCase().capacity() +
+         code_point.SwappedCase().capacity();
+}
+
+
+inline size_t HeapBytes( const Character &character ) {
+  return character.Normal().capacity() +
+         character.Base().capacity() +
+         character.FoldedCase().capacity() +
+         character.SwappedCase().capacity();
+}
+
+
+inline size_t HeapBytes( const Candidate &candidate ) {
+  return candidate.Text().capacity() +
+         candidate.Characters().capacity() * sizeof( const Character * ) +
+         candidate.CaseSwappedText().capacity() +
+         candidate.WordBoundaryChars().capacity() * sizeof( const Character * );
+}
+
+
 // This singleton stores already built T objects. If Ts are requested for
 // previously unseen strings, new T objects are built.
 //
@@ -65,6 +90,12 @@ public:
     return element_holder_.size();
   }
 
+  // Approximate number of bytes used by the stored elements.
+  size_t NumStoredBytes() const {
+    std::shared_lock locker( element_holder_mutex_ );
+    return stored_bytes_;
+  }
+
   Sequence GetElements(
     std::vector< std::string >&& elements ) {
     Sequence element_objects( elements.size() );
@@ -79,13 +110,13 @@ public:
             element = "";
           }
         }
-        std::unique_ptr< T > &element_object = GetValueElseInsert(
-                                                           element_holder_,
-                                                           element,
-                                                           nullptr );
+        auto [ holder_it, inserted ] = element_holder_.try_emplace( element,
+                                                                    nullptr );
+        std::unique_ptr< T > &element_object = holder_it->second;
   
-        if ( !element_object ) {
+        if ( inserted ) {
           element_object = std::make_unique< T >( std::move( element ) );
+          stored_bytes_ += ElementBytes( holder_it->first, *element_object );
         }
   
         *it++ = element_object.get();
@@ -95,17 +126,52 @@ public:
     return element_objects;
   }
 
+  // Calls |function| on each stored element.
+  template< typename Function >
+  void ForEachElement( Function function ) const {
+    std::shared_lock locker( element_holder_mutex_ );
+    for ( const auto& [ _, element_object ] : element_holder_ ) {
+      function( element_object.get() );
+    }
+  }
+
+  // Removes the stored elements for which |predicate| returns true and returns
+  // their number. The caller must ensure that none of these elements is used
+  // anymore. See RepositoryCollector.
+  template< typename Predicate >
+  size_t RemoveElementsIf( Predicate predicate ) {
+    std::lock_guard locker( element_holder_mutex_ );
+    size_t num_removed = 0;
+    for ( auto it = element_holder_.begin(); it != element_holder_.end(); ) {
+      if ( predicate( it->second.get() ) ) {
+        stored_bytes_ -= ElementBytes( it->first, *it->second );
+        element_holder_.erase( it++ );
+        ++num_removed;
+      } else {
+        ++it;
+      }
+    }
+    return num_removed;
+  }
+
   // This should only be used to isolate tests and benchmarks.
   void ClearElements() {
     element_holder_.clear();
+    stored_bytes_ = 0;
   }
 
 private:
   Repository() = default;
   ~Repository() = default;
 
+  static size_t ElementBytes( const std::string &key, const T &element ) {
+    return sizeof( typename Holder::value_type ) + key.capacity() +
+           sizeof( T ) + HeapBytes( element );
+  }
+
   // This data structure owns all the T pointers
   Holder element_holder_;
+  size_t stored_bytes_ = 0;
   mutable std::shared_mutex element_holder_mutex_;
 };
 
@@ -0,0 +1,138 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "RepositoryCollector.h"
+#include "Repository.h"
+
+#include <algorithm>
+
+namespace YouCompleteMe {
+
+RepositoryRoot::RepositoryRoot(
+  std::function< void( CandidateMarks& ) > mark_candidates )
+  : mark_candidates_( std::move( mark_candidates ) ) {
+  auto &collector = RepositoryCollector::Instance();
+  std::lock_guard locker( collector.roots_mutex_ );
+  collector.roots_.insert( this );
+}
+
+
+RepositoryRoot::~RepositoryRoot() {
+  auto &collector = RepositoryCollector::Instance();
+  std::lock_guard locker( collector.roots_mutex_ );
+  collector.roots_.erase( this );
+}
+
+
+RepositoryCollector &RepositoryCollector::Instance() {
+  static RepositoryCollector collector;
+  return collector;
+}
+
+
+RepositoryCollector::RepositoryCollector()
+  : memory_budget_( 0 ),
+    collection_threshold_( 0 ),
+    num_collections_( 0 ) {
+}
+
+
+void RepositoryCollector::SetMemoryBudget( size_t memory_budget ) {
+  memory_budget_ = memory_budget;
+  collection_threshold_ = memory_budget;
+}
+
+
+void RepositoryCollector::CollectIfOverBudget() {
+  size_t memory_budget = memory_budget_;
+  if ( memory_budget == 0 || StoredBytes() <= collection_threshold_ ) {
+    return;
+  }
+
+  std::unique_lock locker( usage_mutex_ );
+  // Another thread may have run a collection while we were waiting.
+  if ( StoredBytes() <= collection_threshold_ ) {
+    return;
+  }
+  CollectNoLock();
+  collection_threshold_ = std::max( memory_budget, 2 * StoredBytes() );
+}
+
+
+void RepositoryCollector::Collect() {
+  std::unique_lock locker( usage_mutex_ );
+  CollectNoLock();
+}
+
+
+RepositoryStats RepositoryCollector::Stats() const {
+  const auto &candidates = Repository< Candidate >::Instance();
+  const auto &characters = Repository< Character >::Instance();
+  const auto &code_points = Repository< CodePoint >::Instance();
+  return { candidates.NumStoredElements(),
+           candidates.NumStoredBytes(),
+           characters.NumStoredElements(),
+           characters.NumStoredBytes(),
+           code_points.NumStoredElements(),
+           code_points.NumStoredBytes(),
+           memory_budget_,
+           num_collections_ };
+}
+
+
+// WARNING: You need to hold the usage_mutex_ in exclusive mode before calling
+// this function.
+void RepositoryCollector::CollectNoLock() {
+  CandidateMarks used_candidates;
+  {
+    std::lock_guard locker( roots_mutex_ );
+    for ( const RepositoryRoot *root : roots_ ) {
+      root->mark_candidates_( used_candidates );
+    }
+  }
+
+  auto &candidates = Repository< Candidate >::Instance();
+  candidates.RemoveElementsIf(
+    [ &used_candidates ]( const Candidate *candidate ) {
+      return !used_candidates.count( candidate );
+    } );
+
+  // Word boundary characters are a subset of the characters.
+  HashSet< const Character * > used_characters;
+  candidates.ForEachElement( [ &used_characters ]( const Candidate *candidate ) {
+    used_characters.insert( candidate->Characters().begin(),
+                            candidate->Characters().end() );
+  } );
+  Repository< Character >::Instance().RemoveElementsIf(
+    [ &used_characters ]( const Character *character ) {
+      return !used_characters.count( character );
+    } );
+
+  Repository< CodePoint >::Instance().RemoveElementsIf(
+    []( const CodePoint* ) { return true; } );
+
+  ++num_collections_;
+}
+
+
+size_t RepositoryCollector::StoredBytes() const {
+  return Repository< Candidate >::Instance().NumStoredBytes() +
+         Repository< Character >::Instance().NumStoredBytes() +
+         Repository< CodePoint >::Instance().NumStoredBytes();
+}
+
+} // namespace YouCompleteMe
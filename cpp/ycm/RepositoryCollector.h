@@ -0,0 +1,138 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#ifndef REPOSITORYCOLLECTOR_H_J3LW9QXE
+#define REPOSITORYCOLLECTOR_H_J3LW9QXE
+
+#ifdef YCM_ABSEIL_SUPPORTED
+#include <absl/container/flat_hash_set.h>
+namespace YouCompleteMe {
+template< typename T >
+using HashSet = absl::flat_hash_set< T >;
+} // namespace YouCompleteMe
+#else
+#include <unordered_set>
+namespace YouCompleteMe {
+template< typename T >
+using HashSet = std::unordered_set< T >;
+} // namespace YouCompleteMe
+#endif
+#include <atomic>
+#include <functional>
+#include <mutex>
+#include <shared_mutex>
+
+namespace YouCompleteMe {
+
+class Candidate;
+
+// The candidates that are still used. See RepositoryRoot.
+using CandidateMarks = HashSet< const Candidate * >;
+
+
+struct RepositoryStats {
+  size_t num_candidates;
+  size_t candidate_bytes;
+  size_t num_characters;
+  size_t character_bytes;
+  size_t num_code_points;
+  size_t code_point_bytes;
+  size_t memory_budget;
+  size_t num_collections;
+};
+
+
+// Registers an object that keeps pointers to candidates from the repository
+// between calls, like an IdentifierDatabase or a CandidateSet. |mark_candidates|
+// must add these candidates to the marks it's given. It's called while the
+// usage lock is held exclusively.
+//
+// The root should be declared as the last member of the object that owns it so
+// that it's unregistered before the other members are destroyed.
+class RepositoryRoot {
+public:
+  YCM_EXPORT explicit RepositoryRoot(
+    std::function< void( CandidateMarks& ) > mark_candidates );
+  YCM_EXPORT ~RepositoryRoot();
+  RepositoryRoot( const RepositoryRoot& ) = delete;
+  RepositoryRoot& operator=( const RepositoryRoot& ) = delete;
+
+private:
+  friend class RepositoryCollector;
+
+  std::function< void( CandidateMarks& ) > mark_candidates_;
+};
+
+
+// Frees the elements of the Candidate, Character and CodePoint repositories
+// that are not used anymore. Candidates are kept if a RepositoryRoot marks
+// them, characters if a kept candidate contains them. Code points are only
+// used while creating characters so they are all freed.
+//
+// Code that gets or uses elements from the repositories must hold the usage
+// lock in shared mode while doing so. A collection holds it exclusively.
+//
+// This class is thread-safe.
+class RepositoryCollector {
+public:
+  YCM_EXPORT static RepositoryCollector &Instance();
+  RepositoryCollector( const RepositoryCollector& ) = delete;
+  RepositoryCollector& operator=( const RepositoryCollector& ) = delete;
+
+  inline std::shared_lock< std::shared_mutex > UsageLock() {
+    return std::shared_lock( usage_mutex_ );
+  }
+
+  // A |memory_budget| of 0 disables the collections triggered by
+  // CollectIfOverBudget.
+  YCM_EXPORT void SetMemoryBudget( size_t memory_budget );
+
+  // Runs a collection if the repositories use more bytes than the memory
+  // budget. If they still do after the collection, the next one only happens
+  // once they use twice as many bytes so that a budget too small for the
+  // elements in use doesn't trigger a collection on each call. Must not be
+  // called while holding the usage lock.
+  YCM_EXPORT void CollectIfOverBudget();
+
+  // Must not be called while holding the usage lock.
+  YCM_EXPORT void Collect();
+
+  YCM_EXPORT RepositoryStats Stats() const;
+
+private:
+  friend class RepositoryRoot;
+
+  RepositoryCollector();
+  ~RepositoryCollector() = default;
+
+  void CollectNoLock();
+  size_t StoredBytes() const;
+
+  std::shared_mutex usage_mutex_;
+
+  // Protects roots_.
+  std::mutex roots_mutex_;
+  HashSet< const RepositoryRoot * > roots_;
+
+  std::atomic< size_t > memory_budget_;
+  std::atomic< size_t > collection_threshold_;
+  std::atomic< size_t > num_collections_;
+};
+
+} // namespace YouCompleteMe
+
+#endif /* end of include guard: REPOSITORYCOLLECTOR_H_J3LW9QXE */
@@ -51,6 +51,47 @@ size_t LongestCommonSubsequenceLength( const CharacterSequence &first,
 }
 
 
+// Appends values to an integer key, most significant value first.
+class SortKeyBuilder {
+public:
+  // Append |value|, which must fit on |num_bits| bits.
+  void Append( uint64_t value, int num_bits ) {
+    key_ = ( key_ << num_bits ) | ( saturated_ ? 0 : value );
+    num_bits_ += num_bits;
+  }
+
+  // Append |value| on |num_bits| bits. The largest value on these bits stands
+  // for all the values that don't fit; when appended, all the following values
+  // are zero.
+  void AppendSaturated( uint64_t value, int num_bits ) {
+    uint64_t max_value = ( uint64_t{ 1 } << num_bits ) - 1;
+    if ( !saturated_ && value >= max_value ) {
+      Append( max_value, num_bits );
+      saturated_ = true;
+      return;
+    }
+    Append( value, num_bits );
+  }
+
+  int NumBits() const {
+    return num_bits_;
+  }
+
+  uint64_t Key() const {
+    return key_;
+  }
+
+  bool Saturated() const {
+    return saturated_;
+  }
+
+private:
+  uint64_t key_ = 0;
+  int num_bits_ = 0;
+  bool saturated_ = false;
+};
+
+
 } // unnamed namespace
 
 Result::Result( const Candidate *candidate,
@@ -65,14 +106,22 @@ Result::Result( const Candidate *candidate,
     candidate_( candidate ),
     query_( query ) {
   SetResultFeaturesFromQuery();
+  SetSortKey();
 }
 
 
-bool Result::operator< ( const Result &other ) const {
-  // Yes, this is ugly but it also needs to be fast.  Since this is called a
-  // bazillion times, we have to make sure only the required comparisons are
-  // made, and no more.
+bool Result::LessThanWithSameKey( const Result &other ) const {
+  // Results with the same key either have the same features or both have a
+  // saturated feature.
+  if ( sort_key_saturated_ ) {
+    return LessThanByFeatures( other );
+  }
 
+  return candidate_->CaseSwappedText() < other.candidate_->CaseSwappedText();
+}
+
+
+bool Result::LessThanByFeatures( const Result &other ) const {
   if ( !query_->IsEmpty() ) {
     // This is the core of the ranking system. A result has more weight than
     // another if one of these conditions is satisfied, in that order:
@@ -152,4 +201,41 @@ void Result::SetResultFeaturesFromQuery() {
     query_->Characters(), candidate_->WordBoundaryChars() );
 }
 
+
+void Result::SetSortKey() {
+  // The values are appended in the order of the comparisons made by
+  // LessThanByFeatures, with smaller values for results of more weight. The
+  // word boundary characters are only compared there when one of the results
+  // has all of them matched, so they are only part of the key in that case.
+  // The widths are enough for the candidates stored in the repository, which
+  // are at most 80 bytes long.
+  SortKeyBuilder builder;
+  if ( !query_->IsEmpty() ) {
+    bool all_wb_matched = num_wb_matches_ == query_->Length();
+    builder.Append( !first_char_same_in_query_and_text_, 1 );
+    builder.Append( !all_wb_matched, 1 );
+    builder.AppendSaturated( all_wb_matched ? NumWordBoundaryChars() : 0, 7 );
+    builder.Append( !query_is_candidate_prefix_, 1 );
+    builder.AppendSaturated( query_->Length() - num_wb_matches_, 7 );
+    builder.AppendSaturated( NumWordBoundaryChars(), 7 );
+    builder.AppendSaturated( char_match_index_sum_, 12 );
+    builder.AppendSaturated( candidate_->Length(), 7 );
+    builder.Append( !candidate_->TextIsLowercase(), 1 );
+  }
+
+  // Fill the remaining bits with the first bytes of the text. Strings are
+  // compared as unsigned chars.
+  const std::string &text = candidate_->CaseSwappedText();
+  for ( size_t i = 0; builder.NumBits() + 8 <= 64; ++i ) {
+    builder.Append( i < text.size() ? static_cast< uint8_t >( text[ i ] ) : 0,
+                    8 );
+  }
+  if ( builder.NumBits() < 64 ) {
+    builder.Append( 0, 64 - builder.NumBits() );
+  }
+
+  sort_key_ = builder.Key();
+  sort_key_saturated_ = builder.Saturated();
+}
+
 } // namespace YouCompleteMe
@@ -20,6 +20,7 @@
 
 #include "Candidate.h"
 
+#include <cstdint>
 #include <string>
 
 namespace YouCompleteMe {
@@ -30,8 +31,10 @@ public:
   : is_subsequence_( false ),
     first_char_same_in_query_and_text_( false ),
     query_is_candidate_prefix_( false ),
+    sort_key_saturated_( false ),
     char_match_index_sum_( 0 ),
     num_wb_matches_( 0 ),
+    sort_key_( 0 ),
     candidate_( nullptr ),
     query_( nullptr ) {}
 
@@ -40,7 +43,15 @@ public:
           size_t char_match_index_sum,
           bool query_is_candidate_prefix );
 
-  bool operator< ( const Result &other ) const;
+  // Since this is called a bazillion times, compare the precomputed keys first
+  // and only compare the results further when they are equal.
+  inline bool operator< ( const Result &other ) const {
+    if ( sort_key_ != other.sort_key_ ) {
+      return sort_key_ < other.sort_key_;
+    }
+
+    return LessThanWithSameKey( other );
+  }
 
   inline const std::string &Text() const {
     return candidate_->Text();
@@ -57,6 +68,12 @@ public:
 private:
   void SetResultFeaturesFromQuery();
 
+  void SetSortKey();
+
+  YCM_EXPORT bool LessThanWithSameKey( const Result &other ) const;
+
+  bool LessThanByFeatures( const Result &other ) const;
+
   // true when the characters of the query are a subsequence of the characters
   // in the candidate text, e.g. the characters "abc" are a subsequence for
   // "xxaygbefc" but not for "axxcb" since they occur in the correct order ('a'
@@ -70,6 +87,9 @@ private:
   // for "foobar" candidate.
   bool query_is_candidate_prefix_;
 
+  // true when a feature saturated in sort_key_.
+  bool sort_key_saturated_;
+
   // The sum of the indexes of all the letters the query "hit" in the candidate
   // text. For instance, the result for the query "abc" in the candidate
   // "012a45bc8" has char_match_index_sum of 3 + 6 + 7 = 16 because those are
@@ -86,6 +106,13 @@ private:
   //  - the character is a letter and the previous one is a punctuation.
   size_t num_wb_matches_;
 
+  // The features above followed by the first bytes of the case-swapped
+  // candidate text, packed into an integer so that comparing the keys of two
+  // results orders them like comparing the results does. Values too large to
+  // fit in their bits saturate; when this happens, the remaining bits are zero
+  // so that the results are compared on their features instead.
+  uint64_t sort_key_;
+
   // NOTE: we don't use references for the query and the candidate because we
   // are sorting results through std::sort or std::partial_sort and these
   // functions require move assignments which is not possible with reference
@@ -0,0 +1,177 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "ThreadPool.h"
+
+#include <algorithm>
+
+namespace YouCompleteMe {
+
+namespace {
+
+size_t ResolveNumThreads( size_t num_threads ) {
+  if ( num_threads == 0 ) {
+    return std::max( std::thread::hardware_concurrency(), 1u );
+  }
+  return num_threads;
+}
+
+} // unnamed namespace
+
+
+ThreadPool &ThreadPool::Instance() {
+  static ThreadPool thread_pool;
+  return thread_pool;
+}
+
+
+ThreadPool::ThreadPool( size_t num_threads, size_t parallel_threshold )
+  : stopping_( false ),
+    parallel_threshold_( parallel_threshold ) {
+  StartWorkers( num_threads );
+}
+
+
+ThreadPool::~ThreadPool() {
+  StopWorkers();
+}
+
+
+void ThreadPool::SetNumThreads( size_t num_threads ) {
+  std::unique_lock lock( workers_mutex_ );
+  num_threads = ResolveNumThreads( num_threads );
+  // Restarting the workers waits for the running tasks, so don't do it when
+  // the options are reapplied without changing the number of threads.
+  if ( num_threads == workers_.size() + 1 ) {
+    return;
+  }
+  StopWorkers();
+  StartWorkers( num_threads );
+}
+
+
+void ThreadPool::SetParallelThreshold( size_t parallel_threshold ) {
+  parallel_threshold_ = parallel_threshold;
+}
+
+
+size_t ThreadPool::NumThreads() const {
+  std::shared_lock lock( workers_mutex_ );
+  return workers_.size() + 1;
+}
+
+
+size_t ThreadPool::NumChunks( size_t num_items ) const {
+  if ( num_items < std::max( parallel_threshold_.load(), size_t( 2 ) ) ) {
+    return 1;
+  }
+  return std::min( NumThreads(), num_items );
+}
+
+
+void ThreadPool::Run( size_t num_tasks,
+                      const std::function< void( size_t ) > &task ) {
+  std::shared_lock workers_lock( workers_mutex_ );
+
+  size_t num_helpers = std::min( workers_.size(),
+                                 num_tasks > 0 ? num_tasks - 1 : 0 );
+  std::atomic< size_t > next_task( 0 );
+  auto run_tasks = [ & ] {
+    for ( size_t index = next_task++; index < num_tasks; index = next_task++ ) {
+      task( index );
+    }
+  };
+
+  std::mutex done_mutex;
+  std::condition_variable helper_done;
+  size_t num_helpers_done = 0;
+  {
+    std::lock_guard lock( tasks_mutex_ );
+    for ( size_t i = 0; i < num_helpers; ++i ) {
+      tasks_.emplace_back( [ & ] {
+        run_tasks();
+        std::lock_guard done_lock( done_mutex );
+        ++num_helpers_done;
+        helper_done.notify_one();
+      } );
+    }
+  }
+  task_available_.notify_all();
+
+  run_tasks();
+
+  // The helpers refer to variables on this stack frame so they must all have
+  // returned, not only the tasks.
+  std::unique_lock done_lock( done_mutex );
+  helper_done.wait( done_lock, [ & ] {
+    return num_helpers_done == num_helpers;
+  } );
+}
+
+
+// WARNING: You need to hold the workers_mutex_ in exclusive mode (or be in the
+// constructor) before calling this function.
+void ThreadPool::StartWorkers( size_t num_threads ) {
+  num_threads = ResolveNumThreads( num_threads );
+
+  {
+    std::lock_guard lock( tasks_mutex_ );
+    stopping_ = false;
+  }
+
+  workers_.reserve( num_threads - 1 );
+  for ( size_t i = 1; i < num_threads; ++i ) {
+    workers_.emplace_back( &ThreadPool::WorkerLoop, this );
+  }
+}
+
+
+// WARNING: You need to hold the workers_mutex_ in exclusive mode (or be in the
+// destructor) before calling this function.
+void ThreadPool::StopWorkers() {
+  {
+    std::lock_guard lock( tasks_mutex_ );
+    stopping_ = true;
+  }
+  task_available_.notify_all();
+
+  for ( auto &worker : workers_ ) {
+    worker.join();
+  }
+  workers_.clear();
+}
+
+
+void ThreadPool::WorkerLoop() {
+  while ( true ) {
+    std::function< void() > task;
+    {
+      std::unique_lock lock( tasks_mutex_ );
+      task_available_.wait( lock, [ this ] {
+        return stopping_ || !tasks_.empty();
+      } );
+      if ( tasks_.empty() ) {
+        return;
+      }
+      task = std::move( tasks_.front() );
+      tasks_.pop_front();
+    }
+    task();
+  }
+}
+
+} // namespace YouCompleteMe
@@ -0,0 +1,159 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#ifndef THREADPOOL_H_QO2VNB7D
+#define THREADPOOL_H_QO2VNB7D
+
+#include "Utils.h"
+
+#include <atomic>
+#include <condition_variable>
+#include <deque>
+#include <functional>
+#include <mutex>
+#include <queue>
+#include <shared_mutex>
+#include <thread>
+#include <utility>
+#include <vector>
+
+namespace YouCompleteMe {
+
+// A fixed set of worker threads used to split the matching of large sets of
+// candidates. The calling thread always takes part in the work, so a pool of N
+// threads has N - 1 workers.
+//
+// This class is thread-safe.
+class ThreadPool {
+public:
+  // Sets below this size are processed on the calling thread only.
+  static constexpr size_t DEFAULT_PARALLEL_THRESHOLD = 16384;
+
+  YCM_EXPORT static ThreadPool &Instance();
+
+  // A |num_threads| of 0 means one thread per hardware thread.
+  YCM_EXPORT explicit ThreadPool(
+    size_t num_threads = 0,
+    size_t parallel_threshold = DEFAULT_PARALLEL_THRESHOLD );
+  YCM_EXPORT ~ThreadPool();
+  ThreadPool( const ThreadPool& ) = delete;
+  ThreadPool& operator=( const ThreadPool& ) = delete;
+
+  YCM_EXPORT void SetNumThreads( size_t num_threads );
+
+  YCM_EXPORT void SetParallelThreshold( size_t parallel_threshold );
+
+  YCM_EXPORT size_t NumThreads() const;
+
+  // Returns the number of chunks a set of |num_items| items should be split
+  // into. This is 1 if the set is too small to be worth splitting.
+  YCM_EXPORT size_t NumChunks( size_t num_items ) const;
+
+  // Calls |task| with each index in [0, num_tasks) on the workers and the
+  // calling thread, and returns when all the calls have returned. |task| must
+  // not throw.
+  YCM_EXPORT void Run( size_t num_tasks,
+                       const std::function< void( size_t ) > &task );
+
+private:
+  void StartWorkers( size_t num_threads );
+  void StopWorkers();
+  void WorkerLoop();
+
+  // Held in shared mode while running tasks and in exclusive mode while
+  // replacing the workers.
+  mutable std::shared_mutex workers_mutex_;
+  std::vector< std::thread > workers_;
+
+  // Protects tasks_ and stopping_.
+  std::mutex tasks_mutex_;
+  std::condition_variable task_available_;
+  std::deque< std::function< void() > > tasks_;
+  bool stopping_;
+
+  std::atomic< size_t > parallel_threshold_;
+};
+
+
+// Calls |filter_chunk( chunk, begin, end )| for each of the |num_chunks| chunks
+// [begin, end) of the items in [0, num_items) on the thread pool. Each call
+// returns the elements kept for the items of its chunk. Returns the same
+// elements as PartialSort would on all these elements, merged from the sorted
+// chunks.
+template< typename Element, typename FilterChunk >
+std::vector< Element > FilterAndPartialSort( size_t num_items,
+                                             size_t num_chunks,
+                                             const FilterChunk &filter_chunk,
+                                             const size_t max_elements ) {
+  if ( num_chunks <= 1 ) {
+    std::vector< Element > elements = filter_chunk( 0, 0, num_items );
+    PartialSort( elements, max_elements );
+    return elements;
+  }
+
+  std::vector< std::vector< Element > > chunks( num_chunks );
+  ThreadPool::Instance().Run( num_chunks, [ & ]( size_t chunk ) {
+    size_t begin = num_items * chunk / num_chunks;
+    size_t end = num_items * ( chunk + 1 ) / num_chunks;
+    chunks[ chunk ] = filter_chunk( chunk, begin, end );
+    PartialSort( chunks[ chunk ], max_elements );
+  } );
+
+  // Merge the sorted chunks. Equivalent elements are taken in chunk order.
+  using Position = std::pair< size_t, size_t >;
+  auto greater = [ &chunks ]( const Position &left, const Position &right ) {
+    const Element &left_element = chunks[ left.first ][ left.second ];
+    const Element &right_element = chunks[ right.first ][ right.second ];
+    if ( right_element < left_element ) {
+      return true;
+    }
+    if ( left_element < right_element ) {
+      return false;
+    }
+    return left.first > right.first;
+  };
+  std::priority_queue< Position,
+                       std::vector< Position >,
+                       decltype( greater ) > heads( greater );
+
+  size_t num_elements = 0;
+  for ( size_t chunk = 0; chunk < num_chunks; ++chunk ) {
+    num_elements += chunks[ chunk ].size();
+    if ( !chunks[ chunk ].empty() ) {
+      heads.emplace( chunk, 0 );
+    }
+  }
+  if ( max_elements > 0 && max_elements < num_elements ) {
+    num_elements = max_elements;
+  }
+
+  std::vector< Element > elements;
+  elements.reserve( num_elements );
+  while ( elements.size() < num_elements ) {
+    auto [ chunk, position ] = heads.top();
+    heads.pop();
+    elements.push_back( std::move( chunks[ chunk ][ position ] ) );
+    if ( position + 1 < chunks[ chunk ].size() ) {
+      heads.emplace( chunk, position + 1 );
+    }
+  }
+  return elements;
+}
+
+} // namespace YouCompleteMe
+
+#endif /* end of include guard: THREADPOOL_H_QO2VNB7D */
@@ -31,6 +31,11 @@ namespace fs = std::filesystem;
 
 namespace YouCompleteMe {
 
+YCM_EXPORT inline bool IsAscii( uint8_t character ) {
+  return character < 0x80;
+}
+
+
 YCM_EXPORT inline bool IsUppercase( uint8_t ascii_character ) {
   return 'A' <= ascii_character && ascii_character <= 'Z';
 }
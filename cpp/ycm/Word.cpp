@@ -17,9 +17,12 @@
 
 #include "Repository.h"
 #include "CodePoint.h"
+#include "Utils.h"
 #include "Word.h"
 
+#include <algorithm>
 #include <string>
+#include <vector>
 
 namespace YouCompleteMe {
 
@@ -329,17 +332,80 @@ std::vector< std::string > BreakCodePointsIntoCharacters(
   return characters;
 }
 
+
+// ASCII characters are already normalized and, apart from CR LF, each of them
+// is a grapheme cluster on its own.
+bool IsAsciiWord( std::string_view text ) {
+  return std::all_of( text.begin(), text.end(), []( char byte ) {
+           return IsAscii( static_cast< uint8_t >( byte ) );
+         } ) &&
+         text.find( "\r\n" ) == std::string_view::npos;
+}
+
+
+// ASCII characters are not stored in the repository. Words point to these ones
+// instead, which are built once and never collected.
+const Character *AsciiCharacter( char byte ) {
+  static const std::vector< Character > ascii_characters = [] {
+    std::vector< Character > characters;
+    characters.reserve( 0x80 );
+    for ( int byte = 0; byte < 0x80; ++byte ) {
+      char character = static_cast< char >( byte );
+      characters.emplace_back( std::string_view( &character, 1 ) );
+    }
+    return characters;
+  }();
+  return &ascii_characters[ static_cast< uint8_t >( byte ) ];
+}
+
 } // unnamed namespace
 
 void Word::BreakIntoCharacters() {
+  if ( is_ascii_ ) {
+    characters_.reserve( text_.size() );
+    for ( char byte : text_ ) {
+      characters_.push_back( AsciiCharacter( byte ) );
+    }
+    return;
+  }
+
   const CodePointSequence &code_points = BreakIntoCodePoints( text_ );
+  std::vector< std::string > characters =
+    BreakCodePointsIntoCharacters( code_points );
+
+  // Only the non-ASCII characters are stored in the repository so that equal
+  // characters are always the same object.
+  std::vector< size_t > stored_positions;
+  std::vector< std::string > stored_characters;
+  characters_.resize( characters.size() );
+  for ( size_t position = 0; position < characters.size(); ++position ) {
+    std::string &character = characters[ position ];
+    if ( character.size() == 1 &&
+         YouCompleteMe::IsAscii( static_cast< uint8_t >( character[ 0 ] ) ) ) {
+      characters_[ position ] = AsciiCharacter( character[ 0 ] );
+    } else {
+      stored_positions.push_back( position );
+      stored_characters.push_back( std::move( character ) );
+    }
+  }
 
-  characters_ = Repository< Character >::Instance().GetElements(
-    BreakCodePointsIntoCharacters( code_points ) );
+  CharacterSequence stored = Repository< Character >::Instance().GetElements(
+    std::move( stored_characters ) );
+  for ( size_t index = 0; index < stored.size(); ++index ) {
+    characters_[ stored_positions[ index ] ] = stored[ index ];
+  }
 }
 
 
 void Word::ComputeBytesPresent() {
+  if ( is_ascii_ ) {
+    for ( char byte : text_ ) {
+      bytes_present_.set(
+        static_cast< uint8_t >( Lowercase( static_cast< uint8_t >( byte ) ) ) );
+    }
+    return;
+  }
+
   for ( const auto &character : characters_ ) {
     for ( auto byte : character->Base() ) {
       bytes_present_.set( static_cast< uint8_t >( byte ) );
@@ -349,7 +415,8 @@ void Word::ComputeBytesPresent() {
 
 
 Word::Word( std::string&& text )
-  : text_( std::move( text ) ) {
+  : text_( std::move( text ) ),
+    is_ascii_( IsAsciiWord( text_ ) ) {
   BreakIntoCharacters();
   ComputeBytesPresent();
 }
@@ -67,11 +67,18 @@ public:
     return characters_.empty();
   }
 
+  // Returns true if each byte of the text is an ASCII character. Such words
+  // skip the grapheme segmentation and can be matched byte by byte.
+  inline bool IsAscii() const {
+    return is_ascii_;
+  }
+
 private:
   void BreakIntoCharacters();
   void ComputeBytesPresent();
 
   std::string text_;
+  bool is_ascii_;
   CharacterSequence characters_;
   Bitset bytes_present_;
 };
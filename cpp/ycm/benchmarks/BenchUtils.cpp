@@ -17,6 +17,11 @@
 
 #include "BenchUtils.h"
 
+#include <fstream>
+#ifdef __GLIBC__
+#include <malloc.h>
+#endif
+
 namespace YouCompleteMe {
 
 std::vector< std::string > GenerateCandidatesWithCommonPrefix(
@@ -37,4 +42,39 @@ std::vector< std::string > GenerateCandidatesWithCommonPrefix(
   return candidates;
 }
 
+
+void WriteTagsFile( const std::filesystem::path &path,
+                    int num_files,
+                    int tags_per_file,
+                    int num_identifiers ) {
+  std::vector< std::string > identifiers =
+    GenerateCandidatesWithCommonPrefix( "id_", num_identifiers );
+
+  std::ofstream tags_file( path, std::ios::binary );
+  tags_file << "!_TAG_FILE_FORMAT\t2\t/extended format/\n";
+  unsigned int state = 1;
+  for ( int file = 0; file < num_files; ++file ) {
+    std::string filepath = "src/dir" + std::to_string( file % 256 ) +
+                           "/file" + std::to_string( file ) + ".c";
+    for ( int tag = 0; tag < tags_per_file; ++tag ) {
+      // Linear congruential generator, so that the output is reproducible.
+      state = state * 1103515245u + 12345u;
+      const std::string &identifier =
+        identifiers[ ( state >> 8 ) % identifiers.size() ];
+      tags_file << identifier << '\t' << filepath << "\t/^" << identifier
+                << "$/;\"\tkind:f\tlanguage:C\n";
+    }
+  }
+}
+
+
+size_t AllocatedBytes() {
+#if defined( __GLIBC__ ) && \
+    ( __GLIBC__ > 2 || ( __GLIBC__ == 2 && __GLIBC_MINOR__ >= 33 ) )
+  return mallinfo2().uordblks;
+#else
+  return 0;
+#endif
+}
+
 } // namespace YouCompleteMe
@@ -18,6 +18,7 @@
 #ifndef BENCHUTILS_H_7UY2GEP1
 #define BENCHUTILS_H_7UY2GEP1
 
+#include <filesystem>
 #include <string>
 #include <vector>
 
@@ -27,6 +28,18 @@ namespace YouCompleteMe {
 std::vector< std::string > GenerateCandidatesWithCommonPrefix(
   const std::string prefix, int number );
 
+// Write a tags file at |path| with |tags_per_file| tags in each of |num_files|
+// C files. The tags are picked from a set of |num_identifiers| identifiers so
+// that the same identifiers appear in several files.
+void WriteTagsFile( const std::filesystem::path &path,
+                    int num_files,
+                    int tags_per_file,
+                    int num_identifiers );
+
+// Return the number of bytes currently allocated on the heap or 0 if this is
+// not supported on the platform.
+size_t AllocatedBytes();
+
 } // namespace YouCompleteMe
 
 #endif /* end of include guard: BENCHUTILS_H_7UY2GEP1 */
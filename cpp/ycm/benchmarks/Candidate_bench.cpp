@@ -0,0 +1,155 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "BenchUtils.h"
+#include "Candidate.h"
+#include "Repository.h"
+#include "Result.h"
+#include "Utils.h"
+
+#include <benchmark/benchmark.h>
+
+namespace YouCompleteMe {
+
+namespace {
+
+void BuildCandidatesBenchmark( benchmark::State& state,
+                               const std::string &prefix ) {
+  Repository< Character >::Instance().ClearElements();
+  Repository< CodePoint >::Instance().ClearElements();
+  std::vector< std::string > candidates =
+    GenerateCandidatesWithCommonPrefix( prefix, state.range( 0 ) );
+
+  for ( auto _ : state ) {
+    for ( const std::string &candidate : candidates ) {
+      benchmark::DoNotOptimize( Candidate( std::string( candidate ) ) );
+    }
+  }
+
+  state.SetItemsProcessed( state.iterations() * state.range( 0 ) );
+}
+
+
+void QueryMatchResultBenchmark( benchmark::State& state,
+                                const std::string &prefix,
+                                std::string&& query ) {
+  Repository< Character >::Instance().ClearElements();
+  Repository< CodePoint >::Instance().ClearElements();
+  std::vector< Candidate > candidates;
+  for ( auto&& candidate : GenerateCandidatesWithCommonPrefix(
+                             prefix, state.range( 0 ) ) ) {
+    candidates.emplace_back( std::move( candidate ) );
+  }
+  Word query_word( std::move( query ) );
+
+  for ( auto _ : state ) {
+    for ( const Candidate &candidate : candidates ) {
+      benchmark::DoNotOptimize( candidate.QueryMatchResult( query_word ) );
+    }
+  }
+
+  state.SetItemsProcessed( state.iterations() * state.range( 0 ) );
+}
+
+
+void PartialSortResultsBenchmark( benchmark::State& state,
+                                  const std::string &prefix,
+                                  std::string&& query ) {
+  Repository< Character >::Instance().ClearElements();
+  Repository< CodePoint >::Instance().ClearElements();
+  std::vector< Candidate > candidates;
+  for ( auto&& candidate : GenerateCandidatesWithCommonPrefix(
+                             prefix, state.range( 0 ) ) ) {
+    candidates.emplace_back( std::move( candidate ) );
+  }
+  Word query_word( std::move( query ) );
+  std::vector< Result > results;
+  for ( const Candidate &candidate : candidates ) {
+    Result result = candidate.QueryMatchResult( query_word );
+    if ( result.IsSubsequence() ) {
+      results.push_back( result );
+    }
+  }
+
+  for ( auto _ : state ) {
+    std::vector< Result > sorted_results( results );
+    PartialSort( sorted_results, state.range( 1 ) );
+    benchmark::DoNotOptimize( sorted_results );
+  }
+
+  state.SetItemsProcessed( state.iterations() * results.size() );
+}
+
+} // unnamed namespace
+
+
+void BuildCandidates_Ascii( benchmark::State& state ) {
+  BuildCandidatesBenchmark( state, "a_A_a_" );
+}
+
+
+void BuildCandidates_NonAscii( benchmark::State& state ) {
+  BuildCandidatesBenchmark( state, "ä_Ä_ä_" );
+}
+
+
+void QueryMatchResult_Ascii( benchmark::State& state ) {
+  QueryMatchResultBenchmark( state, "a_A_a_", "aAz" );
+}
+
+
+void QueryMatchResult_NonAscii( benchmark::State& state ) {
+  QueryMatchResultBenchmark( state, "ä_Ä_ä_", "äÄz" );
+}
+
+
+void PartialSortResults_Ascii( benchmark::State& state ) {
+  PartialSortResultsBenchmark( state, "a_A_a_", "aA" );
+}
+
+
+void PartialSortResults_NonAscii( benchmark::State& state ) {
+  PartialSortResultsBenchmark( state, "ä_Ä_ä_", "äÄ" );
+}
+
+
+// Unlike the candidates above, the ones matching the query differ in the sum
+// of the indexes of their matched characters.
+void PartialSortResults_DifferentFeatures( benchmark::State& state ) {
+  PartialSortResultsBenchmark( state, "a", "ab" );
+}
+
+
+BENCHMARK( BuildCandidates_Ascii )
+    ->Arg( 1 << 12 );
+BENCHMARK( BuildCandidates_NonAscii )
+    ->Arg( 1 << 12 );
+BENCHMARK( QueryMatchResult_Ascii )
+    ->Arg( 1 << 12 );
+BENCHMARK( QueryMatchResult_NonAscii )
+    ->Arg( 1 << 12 );
+BENCHMARK( PartialSortResults_Ascii )
+    ->Args( { 1 << 17, 0 } )
+    ->Args( { 1 << 17, 50 } );
+BENCHMARK( PartialSortResults_NonAscii )
+    ->Args( { 1 << 17, 0 } )
+    ->Args( { 1 << 17, 50 } );
+BENCHMARK( PartialSortResults_DifferentFeatures )
+    ->Args( { 1 << 17, 0 } )
+    ->Args( { 1 << 17, 50 } );
+
+} // namespace YouCompleteMe
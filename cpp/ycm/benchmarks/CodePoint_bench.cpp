@@ -0,0 +1,46 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "CodePoint.h"
+
+#include <benchmark/benchmark.h>
+#include <string>
+#include <vector>
+
+namespace YouCompleteMe {
+
+void CreateCodePoints( benchmark::State& state ) {
+  // Greek, Cyrillic, and CJK letters. They are their own normal form.
+  std::vector< std::string > code_points;
+  for ( const CodePoint *code_point : BreakIntoCodePoints(
+          "αβγδεζηθικλμνξοπρστυφχψωАБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+          "一二三四五六七八九十百千万上下左右中大小人口日月火水木金土" ) ) {
+    code_points.push_back( code_point->Normal() );
+  }
+
+  for ( auto _ : state ) {
+    for ( const std::string &code_point : code_points ) {
+      benchmark::DoNotOptimize( CodePoint( code_point ) );
+    }
+  }
+
+  state.SetItemsProcessed( state.iterations() * code_points.size() );
+}
+
+BENCHMARK( CreateCodePoints );
+
+} // namespace YouCompleteMe
@@ -18,8 +18,10 @@
 #include "BenchUtils.h"
 #include "Repository.h"
 #include "IdentifierCompleter.h"
+#include "ThreadPool.h"
 
 #include <benchmark/benchmark.h>
+#include <memory>
 
 namespace YouCompleteMe {
 
@@ -58,4 +60,166 @@ BENCHMARK_REGISTER_F( IdentifierCompleterFixture, CandidatesWithCommonPrefix )
     ->Ranges( { { 1, 1 << 16 }, { 10, 10 } } )
     ->Complexity();
 
+
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture,
+                    CandidatesWithCommonPrefixInManyFiles )(
+    benchmark::State& state ) {
+
+  // Each file contains a different half of the candidates.
+  std::vector< std::string > candidates =
+    GenerateCandidatesWithCommonPrefix( "a_A_a_", state.range( 0 ) );
+  IdentifierCompleter completer;
+  for ( int64_t file = 0; file < state.range( 1 ); ++file ) {
+    std::vector< std::string > file_candidates(
+      candidates.begin() + file % 2 * candidates.size() / 2,
+      candidates.begin() + ( file % 2 + 1 ) * candidates.size() / 2 );
+    std::string filetype = "c";
+    std::string filepath = std::to_string( file );
+    completer.ClearForFileAndAddIdentifiersToDatabase( file_candidates,
+                                                       filetype,
+                                                       filepath );
+  }
+
+  for ( auto _ : state ) {
+    std::string query = "aA";
+    completer.CandidatesForQueryAndType( query, "c", 10 );
+  }
+
+  state.SetComplexityN( state.range( 1 ) );
+}
+
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture,
+                      CandidatesWithCommonPrefixInManyFiles )
+    ->ArgsProduct( { { 1 << 12 }, { 1, 4, 16, 64 } } )
+    ->Complexity();
+
+
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, LoadTagsFile )(
+    benchmark::State& state ) {
+
+  fs::path tags_path = fs::temp_directory_path() / "ycm_core_bench_tags";
+  WriteTagsFile( tags_path,
+                 state.range( 0 ),
+                 state.range( 1 ),
+                 state.range( 2 ) );
+  double num_tags = double( state.range( 0 ) ) * state.range( 1 );
+
+  size_t allocated_bytes = 0;
+  for ( auto _ : state ) {
+    state.PauseTiming();
+    Repository< Candidate >::Instance().ClearElements();
+    Repository< Character >::Instance().ClearElements();
+    Repository< CodePoint >::Instance().ClearElements();
+    auto completer = std::make_unique< IdentifierCompleter >();
+    std::vector< std::string > tag_files = { tags_path.string() };
+    size_t bytes_before = AllocatedBytes();
+    state.ResumeTiming();
+
+    completer->AddIdentifiersToDatabaseFromTagFiles( tag_files );
+
+    state.PauseTiming();
+    allocated_bytes = AllocatedBytes() - bytes_before;
+    completer.reset();
+    state.ResumeTiming();
+  }
+
+  fs::remove( tags_path );
+  state.counters[ "bytes_per_tag" ] = allocated_bytes / num_tags;
+}
+
+
+// Roughly the number of files and tags of a Linux kernel tree.
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, LoadTagsFile )
+    ->Args( { 1 << 16, 1 << 6, 1 << 18 } )
+    ->Unit( benchmark::kMillisecond )
+    ->Iterations( 1 );
+
+
+// Time from the start of ycmd to the first completion from the identifiers of
+// a tags file, either read from the tags file itself or from an index.
+void FirstCompletion( benchmark::State& state, bool from_index ) {
+  fs::path tags_path = fs::temp_directory_path() / "ycm_core_bench_tags";
+  fs::path index_path = fs::temp_directory_path() / "ycm_core_bench_index";
+  WriteTagsFile( tags_path,
+                 state.range( 0 ),
+                 state.range( 1 ),
+                 state.range( 2 ) );
+  if ( from_index ) {
+    IdentifierCompleter completer;
+    std::vector< std::string > tag_files = { tags_path.string() };
+    completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+    completer.SaveIndex( index_path.string() );
+  }
+
+  for ( auto _ : state ) {
+    state.PauseTiming();
+    Repository< Candidate >::Instance().ClearElements();
+    Repository< Character >::Instance().ClearElements();
+    Repository< CodePoint >::Instance().ClearElements();
+    auto completer = std::make_unique< IdentifierCompleter >();
+    std::vector< std::string > tag_files = { tags_path.string() };
+    state.ResumeTiming();
+
+    if ( from_index ) {
+      completer->LoadIndex( index_path.string() );
+    } else {
+      completer->AddIdentifiersToDatabaseFromTagFiles( tag_files );
+    }
+    std::string query = "iA";
+    completer->CandidatesForQueryAndType( query, "c", 10 );
+
+    state.PauseTiming();
+    completer.reset();
+    state.ResumeTiming();
+  }
+
+  fs::remove( tags_path );
+  fs::remove( index_path );
+}
+
+
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, FirstCompletionFromTagsFile )(
+    benchmark::State& state ) {
+  FirstCompletion( state, false );
+}
+
+
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, FirstCompletionFromIndex )(
+    benchmark::State& state ) {
+  FirstCompletion( state, true );
+}
+
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, FirstCompletionFromTagsFile )
+    ->Args( { 1 << 12, 1 << 6, 1 << 16 } )
+    ->Unit( benchmark::kMillisecond );
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, FirstCompletionFromIndex )
+    ->Args( { 1 << 12, 1 << 6, 1 << 16 } )
+    ->Unit( benchmark::kMillisecond );
+
+
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture,
+                    CandidatesWithCommonPrefixOnThreads )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > candidates =
+    GenerateCandidatesWithCommonPrefix( "a_A_a_", state.range( 0 ) );
+  IdentifierCompleter completer( std::move( candidates ) );
+  ThreadPool::Instance().SetNumThreads( state.range( 1 ) );
+
+  for ( auto _ : state ) {
+    completer.CandidatesForQuery( "aA", 10 );
+  }
+
+  ThreadPool::Instance().SetNumThreads( 0 );
+}
+
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture,
+                      CandidatesWithCommonPrefixOnThreads )
+    ->ArgsProduct( { { 1 << 16 }, { 1, 2, 4, 8 } } )
+    ->UseRealTime();
+
 } // namespace YouCompleteMe
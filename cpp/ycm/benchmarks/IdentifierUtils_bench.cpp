@@ -0,0 +1,179 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "BenchUtils.h"
+#include "IdentifierCompleter.h"
+#include "IdentifierUtils.h"
+
+#include <benchmark/benchmark.h>
+#include <fstream>
+
+namespace YouCompleteMe {
+
+class TagsFileFixture : public benchmark::Fixture {
+public:
+  void SetUp( const benchmark::State& state ) {
+    tags_path_ = std::filesystem::temp_directory_path() /
+                 "ycm_core_bench_extract_tags";
+    WriteTagsFile( tags_path_, state.range( 0 ), state.range( 1 ), 1 << 18 );
+  }
+
+  void TearDown( const benchmark::State& ) {
+    std::filesystem::remove( tags_path_ );
+  }
+
+protected:
+  std::filesystem::path tags_path_;
+};
+
+
+BENCHMARK_DEFINE_F( TagsFileFixture, ExtractIdentifiersFromTagsFile )(
+    benchmark::State& state ) {
+  for ( auto _ : state ) {
+    benchmark::DoNotOptimize( ExtractIdentifiersFromTagsFile( tags_path_ ) );
+  }
+
+  state.SetBytesProcessed( state.iterations() *
+                           std::filesystem::file_size( tags_path_ ) );
+}
+
+
+BENCHMARK_DEFINE_F( TagsFileFixture, ReloadUnchangedTagsFile )(
+    benchmark::State& state ) {
+  IdentifierCompleter completer;
+  std::vector< std::string > tag_files = { tags_path_.string() };
+  completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+
+  for ( auto _ : state ) {
+    tag_files = { tags_path_.string() };
+    completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+  }
+}
+
+
+BENCHMARK_DEFINE_F( TagsFileFixture, ReloadAppendedTagsFile )(
+    benchmark::State& state ) {
+  IdentifierCompleter completer;
+  std::vector< std::string > tag_files = { tags_path_.string() };
+  completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+
+  size_t iteration = 0;
+  for ( auto _ : state ) {
+    state.PauseTiming();
+    std::ofstream( tags_path_, std::ios_base::app )
+      << "appended_" << iteration++ << "\tappended.c\tlanguage:C\n";
+    tag_files = { tags_path_.string() };
+    state.ResumeTiming();
+
+    completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+  }
+}
+
+
+std::string RepeatToSize( std::string_view pattern, size_t size ) {
+  std::string text;
+  text.reserve( size + pattern.size() );
+  while ( text.size() < size ) {
+    text.append( pattern );
+  }
+  return text;
+}
+
+
+void RemoveIdentifierFreeTextBenchmark( benchmark::State& state,
+                                        const std::string &text,
+                                        std::string_view filetype ) {
+  for ( auto _ : state ) {
+    benchmark::DoNotOptimize( RemoveIdentifierFreeText( text, filetype ) );
+  }
+
+  state.SetBytesProcessed( state.iterations() * text.size() );
+}
+
+
+void RemoveIdentifierFreeText_SourceCode( benchmark::State& state ) {
+  RemoveIdentifierFreeTextBenchmark(
+    state,
+    RepeatToSize( "int foo = bar( 'a', \"b\\\"c\" ); // Comment\n"
+                  "/* Multiline\n"
+                  " * comment. */\n", state.range( 0 ) ),
+    "cpp" );
+}
+
+
+void RemoveIdentifierFreeText_MinifiedCode( benchmark::State& state ) {
+  RemoveIdentifierFreeTextBenchmark(
+    state,
+    RepeatToSize( "var a=\"b\",c='d';/*e*/f(a,c);", state.range( 0 ) ),
+    "javascript" );
+}
+
+
+// The regex of identifier_utils.py backtracks exponentially on escaped
+// characters of strings that are not closed.
+void RemoveIdentifierFreeText_UnclosedString( benchmark::State& state ) {
+  RemoveIdentifierFreeTextBenchmark(
+    state,
+    "\"" + std::string( size_t( state.range( 0 ) ), '\\' ),
+    "cpp" );
+}
+
+
+// Each unclosed comment opener looks for a closer in the rest of the text.
+void RemoveIdentifierFreeText_UnclosedComments( benchmark::State& state ) {
+  RemoveIdentifierFreeTextBenchmark(
+    state,
+    RepeatToSize( "/* \"\"\" ", state.range( 0 ) ),
+    "" );
+}
+
+
+BENCHMARK( RemoveIdentifierFreeText_SourceCode )
+    ->RangeMultiplier( 16 )
+    ->Range( 1 << 10, 1 << 22 );
+BENCHMARK( RemoveIdentifierFreeText_MinifiedCode )
+    ->RangeMultiplier( 16 )
+    ->Range( 1 << 10, 1 << 22 );
+BENCHMARK( RemoveIdentifierFreeText_UnclosedString )
+    ->RangeMultiplier( 16 )
+    ->Range( 1 << 4, 1 << 20 );
+BENCHMARK( RemoveIdentifierFreeText_UnclosedComments )
+    ->RangeMultiplier( 16 )
+    ->Range( 1 << 10, 1 << 20 );
+
+
+// The last arguments are roughly the number of files and tags of a Linux
+// kernel tree, that is a tags file of about 350 MB.
+BENCHMARK_REGISTER_F( TagsFileFixture, ExtractIdentifiersFromTagsFile )
+    ->Args( { 1 << 10, 1 << 6 } )
+    ->Args( { 1 << 16, 1 << 6 } )
+    ->Unit( benchmark::kMillisecond )
+    ->UseRealTime();
+
+
+BENCHMARK_REGISTER_F( TagsFileFixture, ReloadUnchangedTagsFile )
+    ->Args( { 1 << 16, 1 << 6 } )
+    ->Unit( benchmark::kMillisecond )
+    ->UseRealTime();
+
+
+BENCHMARK_REGISTER_F( TagsFileFixture, ReloadAppendedTagsFile )
+    ->Args( { 1 << 16, 1 << 6 } )
+    ->Unit( benchmark::kMillisecond )
+    ->UseRealTime();
+
+} // namespace YouCompleteMe
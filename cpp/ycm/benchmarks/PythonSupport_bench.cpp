@@ -94,6 +94,96 @@ BENCHMARK_DEFINE_F( PythonSupportFixture,
 }
 
 
+BENCHMARK_DEFINE_F( PythonSupportFixture,
+                    FilterAndSortStoredCandidatesOnExtendedQueries )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > raw_candidates;
+  raw_candidates = GenerateCandidatesWithCommonPrefix( "a_A_a_",
+                                                       state.range( 0 ) );
+
+  pybind11::list candidates;
+  for ( auto insertion_text : raw_candidates ) {
+    pybind11::dict candidate;
+    candidate[ "insertion_text" ] = insertion_text;
+    candidates.append( candidate );
+  }
+
+  pybind11::str candidate_property("insertion_text");
+  // Store the candidates in the repository.
+  std::string query = "a";
+  FilterAndSortCandidates( candidates, candidate_property, query,
+                           state.range( 1 ) );
+
+  // Type the query one character at a time.
+  for ( auto _ : state ) {
+    for ( size_t length = 1; length <= 5; ++length ) {
+      std::string query = std::string( "abcde" ).substr( 0, length );
+      FilterAndSortCandidates( candidates, candidate_property, query,
+                               state.range( 1 ) );
+    }
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+BENCHMARK_DEFINE_F( PythonSupportFixture,
+                    CandidateSetFilterAndSortWithCommonPrefix )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > raw_candidates;
+  raw_candidates = GenerateCandidatesWithCommonPrefix( "a_A_a_",
+                                                       state.range( 0 ) );
+
+  pybind11::list candidates;
+  for ( auto insertion_text : raw_candidates ) {
+    pybind11::dict candidate;
+    candidate[ "insertion_text" ] = insertion_text;
+    candidates.append( candidate );
+  }
+
+  CandidateSet candidate_set( candidates, "insertion_text" );
+
+  // All the candidates match the query so they are all filtered again on each
+  // iteration.
+  for ( auto _ : state ) {
+    candidate_set.FilterAndSort( "aA", state.range( 1 ) );
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+BENCHMARK_DEFINE_F( PythonSupportFixture,
+                    CandidateSetFilterAndSortOnExtendedQueries )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > raw_candidates;
+  raw_candidates = GenerateCandidatesWithCommonPrefix( "a_A_a_",
+                                                       state.range( 0 ) );
+
+  pybind11::list candidates;
+  for ( auto insertion_text : raw_candidates ) {
+    pybind11::dict candidate;
+    candidate[ "insertion_text" ] = insertion_text;
+    candidates.append( candidate );
+  }
+
+  CandidateSet candidate_set( candidates, "insertion_text" );
+
+  // Type the query one character at a time.
+  for ( auto _ : state ) {
+    for ( size_t length = 1; length <= 5; ++length ) {
+      candidate_set.FilterAndSort( std::string( "abcde" ).substr( 0, length ),
+                                   state.range( 1 ) );
+    }
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
 BENCHMARK_REGISTER_F( PythonSupportFixture,
                       FilterAndSortUnstoredCandidatesWithCommonPrefix )
     ->RangeMultiplier( 1 << 4 )
@@ -119,4 +209,28 @@ BENCHMARK_REGISTER_F( PythonSupportFixture,
     ->Ranges( { { 1, 1 << 16 }, { 50, 50 } } )
     ->Complexity();
 
+BENCHMARK_REGISTER_F( PythonSupportFixture,
+                      FilterAndSortStoredCandidatesOnExtendedQueries )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1, 1 << 16 }, { 50, 50 } } )
+    ->Complexity();
+
+BENCHMARK_REGISTER_F( PythonSupportFixture,
+                      CandidateSetFilterAndSortWithCommonPrefix )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1, 1 << 16 }, { 0, 0 } } )
+    ->Complexity();
+
+BENCHMARK_REGISTER_F( PythonSupportFixture,
+                      CandidateSetFilterAndSortWithCommonPrefix )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1, 1 << 16 }, { 50, 50 } } )
+    ->Complexity();
+
+BENCHMARK_REGISTER_F( PythonSupportFixture,
+                      CandidateSetFilterAndSortOnExtendedQueries )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1, 1 << 16 }, { 50, 50 } } )
+    ->Complexity();
+
 } // namespace YouCompleteMe
@@ -198,4 +198,37 @@ TEST( CandidateTest, QueryMatchResultIsNotSubsequence ) {
   EXPECT_THAT( "f𐍈oβaåaR", Not( IsSubsequence( "F𐍈oβaÅAr" ) ) );
 }
 
+TEST( CandidateTest, QueryMatchResultsWithSameTextPrefixAreSorted ) {
+  Word query( "f" );
+  Candidate first( "foobarbaza" );
+  Candidate second( "foobarbazb" );
+
+  EXPECT_LT( first.QueryMatchResult( query ),
+             second.QueryMatchResult( query ) );
+  EXPECT_FALSE( second.QueryMatchResult( query ) <
+                first.QueryMatchResult( query ) );
+}
+
+TEST( CandidateTest, QueryMatchResultsWithLargeFeaturesAreSorted ) {
+  // Both candidates have more word boundary characters than what fits in the
+  // sort key. The one with less of them must still come first even if it is
+  // longer.
+  std::string first_text = "a";
+  std::string second_text = "a";
+  for ( int i = 0; i < 300; ++i ) {
+    first_text += "_a";
+    second_text += "_a";
+  }
+  first_text += "xxxxxxxxxx";
+  second_text += "_a";
+  Word query( "a" );
+  Candidate first( std::move( first_text ) );
+  Candidate second( std::move( second_text ) );
+
+  EXPECT_LT( first.QueryMatchResult( query ),
+             second.QueryMatchResult( query ) );
+  EXPECT_FALSE( second.QueryMatchResult( query ) <
+                first.QueryMatchResult( query ) );
+}
+
 } // namespace YouCompleteMe
@@ -19,6 +19,7 @@
 #include "Repository.h"
 #include "TestUtils.h"
 
+#include <algorithm>
 #include <array>
 #include <gtest/gtest.h>
 #include <gmock/gmock.h>
@@ -207,4 +208,108 @@ const TextCodePointPair tests[] = {
 
 INSTANTIATE_TEST_SUITE_P( UnicodeTest, CodePointTest, ValuesIn( tests ) );
 
+
+namespace {
+
+std::string EncodeCodePoint( uint32_t scalar_value ) {
+  std::string text;
+  if ( scalar_value < 0x80 ) {
+    text += static_cast< char >( scalar_value );
+  } else if ( scalar_value < 0x800 ) {
+    text += static_cast< char >( 0xc0 | ( scalar_value >> 6 ) );
+    text += static_cast< char >( 0x80 | ( scalar_value & 0x3f ) );
+  } else if ( scalar_value < 0x10000 ) {
+    text += static_cast< char >( 0xe0 | ( scalar_value >> 12 ) );
+    text += static_cast< char >( 0x80 | ( ( scalar_value >> 6 ) & 0x3f ) );
+    text += static_cast< char >( 0x80 | ( scalar_value & 0x3f ) );
+  } else {
+    text += static_cast< char >( 0xf0 | ( scalar_value >> 18 ) );
+    text += static_cast< char >( 0x80 | ( ( scalar_value >> 12 ) & 0x3f ) );
+    text += static_cast< char >( 0x80 | ( ( scalar_value >> 6 ) & 0x3f ) );
+    text += static_cast< char >( 0x80 | ( scalar_value & 0x3f ) );
+  }
+  return text;
+}
+
+
+// Look up the properties of a code point with a binary search on its UTF-8
+// representation. This is how code points were looked up before the two-stage
+// table was generated.
+void ExpectSameAsBinarySearch( const std::string &text ) {
+#include "UnicodeTable.inc"
+
+  const auto& original = code_points.original;
+  CodePoint code_point( text );
+
+  auto it = std::lower_bound( original.begin(), original.end(), text,
+                              []( const char *element,
+                                  const std::string &value ) {
+                                return element < value;
+                              } );
+  if ( !text.empty() && it != original.end() && text == *it ) {
+    auto index = static_cast< size_t >( std::distance( original.begin(), it ) );
+    ASSERT_EQ( code_point.Normal(), code_points.normal[ index ] ) << text;
+    ASSERT_EQ( code_point.FoldedCase(),
+               code_points.folded_case[ index ] ) << text;
+    ASSERT_EQ( code_point.SwappedCase(),
+               code_points.swapped_case[ index ] ) << text;
+    ASSERT_EQ( code_point.IsLetter(), code_points.is_letter[ index ] ) << text;
+    ASSERT_EQ( code_point.IsPunctuation(),
+               code_points.is_punctuation[ index ] ) << text;
+    ASSERT_EQ( code_point.IsUppercase(),
+               code_points.is_uppercase[ index ] ) << text;
+    ASSERT_EQ( static_cast< uint8_t >( code_point.GetGraphemeBreakProperty() ),
+               code_points.break_property[ index ] ) << text;
+    ASSERT_EQ( code_point.CombiningClass(),
+               code_points.combining_class[ index ] ) << text;
+    ASSERT_EQ(
+      static_cast< uint8_t >( code_point.GetIndicConjunctBreakProperty() ),
+      code_points.indic_conjunct_break[ index ] ) << text;
+    return;
+  }
+
+  ASSERT_EQ( code_point.Normal(), text );
+  ASSERT_EQ( code_point.FoldedCase(), text );
+  ASSERT_EQ( code_point.SwappedCase(), text );
+  ASSERT_FALSE( code_point.IsLetter() ) << text;
+  ASSERT_FALSE( code_point.IsPunctuation() ) << text;
+  ASSERT_FALSE( code_point.IsUppercase() ) << text;
+  ASSERT_EQ( code_point.GetGraphemeBreakProperty(),
+             GraphemeBreakProperty::OTHER ) << text;
+  ASSERT_EQ( code_point.CombiningClass(), 0 ) << text;
+  ASSERT_EQ( code_point.GetIndicConjunctBreakProperty(),
+             IndicConjunctBreakProperty::None ) << text;
+}
+
+} // unnamed namespace
+
+
+TEST( CodePointTableTest, AllCodePointsMatchBinarySearch ) {
+  for ( uint32_t scalar_value = 1; scalar_value <= 0x10ffff; ++scalar_value ) {
+    ASSERT_NO_FATAL_FAILURE(
+      ExpectSameAsBinarySearch( EncodeCodePoint( scalar_value ) ) );
+  }
+}
+
+
+TEST( CodePointTableTest, InvalidCodePointsHaveDefaultProperties ) {
+  for ( const char *text : {
+          // Overlong encodings of "/"
+          "\xc0\xaf",
+          "\xe0\x80\xaf",
+          "\xf0\x80\x80\xaf",
+          // Above U+10FFFF
+          "\xf4\x90\x80\x80",
+          // Missing continuation bytes
+          "\xc3",
+          "\xe2\x80",
+          // Invalid continuation byte
+          "\xc3\x28",
+          // More than one code point
+          "ab",
+          "\xc3\xa9a" } ) {
+    ASSERT_NO_FATAL_FAILURE( ExpectSameAsBinarySearch( text ) );
+  }
+}
+
 } // namespace YouCompleteMe
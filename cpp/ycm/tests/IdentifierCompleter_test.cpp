@@ -22,6 +22,8 @@
 #include "Utils.h"
 #include "TestUtils.h"
 
+#include <fstream>
+
 using ::testing::ElementsAre;
 using ::testing::IsEmpty;
 using ::testing::WhenSorted;
@@ -331,5 +333,276 @@ TEST( IdentifierCompleterTest, ManyCandidateSimpleWrongFileType ) {
                IsEmpty() );
 }
 
-} // namespace YouCompleteMe
 
+TEST( IdentifierCompleterTest, SameCandidateInSeveralFiles ) {
+  IdentifierCompleter completer;
+  auto recreate = [ &completer ]( std::vector< std::string > candidates,
+                                  std::string filepath ) {
+    std::string filetype = "c";
+    completer.ClearForFileAndAddIdentifiersToDatabase( candidates,
+                                                       filetype,
+                                                       filepath );
+  };
+  auto add = [ &completer ]( std::string candidate, std::string filepath ) {
+    std::string filetype = "c";
+    completer.AddSingleIdentifierToDatabase( candidate, filetype, filepath );
+  };
+  auto query = [ &completer ]() {
+    std::string query = "fo";
+    return completer.CandidatesForQueryAndType( query, "c" );
+  };
+
+  recreate( { "foobar", "foo", "foo" }, "foo" );
+  recreate( { "foobar", "barfoo" }, "bar" );
+  EXPECT_THAT( query(), ElementsAre( "foo", "foobar", "barfoo" ) );
+
+  recreate( { "foo" }, "foo" );
+  EXPECT_THAT( query(), ElementsAre( "foo", "foobar", "barfoo" ) );
+
+  recreate( {}, "bar" );
+  EXPECT_THAT( query(), ElementsAre( "foo" ) );
+
+  add( "foobaz", "bar" );
+  add( "foobaz", "bar" );
+  EXPECT_THAT( query(), ElementsAre( "foo", "foobaz" ) );
+
+  recreate( {}, "foo" );
+  EXPECT_THAT( query(), ElementsAre( "foobaz" ) );
+}
+
+
+TEST( IdentifierCompleterTest, UpdateIdentifiersInDatabase ) {
+  IdentifierCompleter completer;
+  auto update = [ &completer ]( std::vector< std::string > added,
+                                std::vector< std::string > removed ) {
+    std::string filetype = "c";
+    std::string filepath = "foo";
+    completer.UpdateIdentifiersInDatabase( added, removed, filetype, filepath );
+  };
+  auto query = [ &completer ]() {
+    std::string query = "fo";
+    return completer.CandidatesForQueryAndType( query, "c" );
+  };
+
+  update( { "foo", "foo", "foobar" }, {} );
+  EXPECT_THAT( query(), ElementsAre( "foo", "foobar" ) );
+
+  // Only one occurrence of foo is removed.
+  update( { "fooqux" }, { "foo", "foobar" } );
+  EXPECT_THAT( query(), ElementsAre( "foo", "fooqux" ) );
+
+  // Identifiers not stored for the file are ignored.
+  update( {}, { "foo", "foozoo" } );
+  EXPECT_THAT( query(), ElementsAre( "fooqux" ) );
+}
+
+
+TEST( IdentifierCompleterTest, TagsFileReloadedIncrementally ) {
+  fs::path tags_directory = fs::temp_directory_path() /
+                            "ycm_incremental_tags_test";
+  fs::create_directories( tags_directory );
+  fs::path tags_file = tags_directory / "tags";
+
+  IdentifierCompleter completer;
+  auto write_tags = [ &tags_file ]( const std::string &tags,
+                                    std::ios_base::openmode mode ) {
+    std::ofstream( tags_file, std::ios_base::binary | mode ) << tags;
+  };
+  auto reload = [ &completer, &tags_file ]() {
+    std::vector< std::string > tag_files = { tags_file.string() };
+    completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+  };
+  auto query = [ &completer ]() {
+    std::string query = "fo";
+    return completer.CandidatesForQueryAndType( query, "c" );
+  };
+
+  write_tags( "foo\ta\tlanguage:C\n"
+              "foobar\tb\tlanguage:C\n", std::ios_base::trunc );
+  reload();
+  EXPECT_THAT( query(), ElementsAre( "foo", "foobar" ) );
+
+  write_tags( "fooqux\ta\tlanguage:C\n", std::ios_base::app );
+  reload();
+  EXPECT_THAT( query(), ElementsAre( "foo", "foobar", "fooqux" ) );
+
+  // Only the identifiers of the files whose tags changed are replaced.
+  std::string identifier = "foozoo";
+  std::string filetype = "c";
+  std::string filepath = fs::weakly_canonical( tags_directory / "b" ).string();
+  completer.AddSingleIdentifierToDatabase( identifier, filetype, filepath );
+  write_tags( "foo\ta\tlanguage:C\n"
+              "foobar\tb\tlanguage:C\n", std::ios_base::trunc );
+  reload();
+  EXPECT_THAT( query(), ElementsAre( "foo", "foobar", "foozoo" ) );
+
+  write_tags( "foo\ta\tlanguage:C\n", std::ios_base::trunc );
+  reload();
+  EXPECT_THAT( query(), ElementsAre( "foo" ) );
+
+  fs::remove_all( tags_directory );
+}
+
+TEST( IdentifierCompleterTest, IndexSavedAndLoaded ) {
+  fs::path index_directory = fs::temp_directory_path() / "ycm_index_test";
+  fs::remove_all( index_directory );
+  fs::path index_file = index_directory / "index";
+  fs::path tags_file = index_directory / "tags";
+  fs::create_directories( index_directory );
+  std::ofstream( tags_file, std::ios_base::binary )
+    << "foo\ta\tlanguage:C\n"
+       "foobar\tb\tlanguage:C\n";
+  std::vector< std::string > tag_files = { tags_file.string() };
+  auto query = []( IdentifierCompleter &completer,
+                   const std::string &filetype ) {
+    std::string query = "fo";
+    return completer.CandidatesForQueryAndType( query, filetype );
+  };
+
+  {
+    IdentifierCompleter completer;
+    std::vector< std::string > identifiers = { "foozoo", "fooqux", "foozoo" };
+    std::string filetype = "python";
+    std::string filepath = "/foo.py";
+    completer.ClearForFileAndAddIdentifiersToDatabase( identifiers,
+                                                       filetype,
+                                                       filepath );
+    completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+    EXPECT_TRUE( completer.SaveIndex( index_file.string() ) );
+  }
+
+  IdentifierCompleter completer;
+  EXPECT_TRUE( completer.LoadIndex( index_file.string() ) );
+  EXPECT_THAT( query( completer, "c" ), ElementsAre( "foo", "foobar" ) );
+  EXPECT_THAT( query( completer, "python" ),
+               ElementsAre( "fooqux", "foozoo" ) );
+
+  // The state of the tags file is restored so its identifiers are not replaced
+  // when the tags file is added again unchanged.
+  std::string identifier = "foozoo";
+  std::string filetype = "c";
+  std::string filepath = fs::weakly_canonical( index_directory / "b" ).string();
+  completer.AddSingleIdentifierToDatabase( identifier, filetype, filepath );
+  completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+  EXPECT_THAT( query( completer, "c" ),
+               ElementsAre( "foo", "foobar", "foozoo" ) );
+
+  fs::remove_all( index_directory );
+}
+
+
+TEST( IdentifierCompleterTest, IndexDoesNotReplaceIdentifiers ) {
+  fs::path index_file = fs::temp_directory_path() / "ycm_index_test_replace";
+
+  {
+    std::vector< std::string > identifiers = { "foozoo", "fooqux" };
+    std::string filetype = "python";
+    std::string filepath = "/foo.py";
+    IdentifierCompleter completer;
+    completer.ClearForFileAndAddIdentifiersToDatabase( identifiers,
+                                                       filetype,
+                                                       filepath );
+    EXPECT_TRUE( completer.SaveIndex( index_file.string() ) );
+  }
+
+  std::vector< std::string > identifiers = { "foobar" };
+  std::string filetype = "python";
+  std::string filepath = "/foo.py";
+  IdentifierCompleter completer;
+  completer.ClearForFileAndAddIdentifiersToDatabase( identifiers,
+                                                     filetype,
+                                                     filepath );
+  EXPECT_TRUE( completer.LoadIndex( index_file.string() ) );
+  std::string query = "fo";
+  EXPECT_THAT( completer.CandidatesForQueryAndType( query, "python" ),
+               ElementsAre( "foobar" ) );
+
+  fs::remove( index_file );
+}
+
+
+TEST( IdentifierCompleterTest, InvalidIndexNotLoaded ) {
+  fs::path index_file = fs::temp_directory_path() / "ycm_index_test_invalid";
+  fs::remove( index_file );
+  IdentifierCompleter completer;
+  EXPECT_FALSE( completer.LoadIndex( index_file.string() ) );
+
+  {
+    std::vector< std::string > identifiers = { "foozoo", "fooqux" };
+    std::string filetype = "python";
+    std::string filepath = "/foo.py";
+    IdentifierCompleter saved_completer;
+    saved_completer.ClearForFileAndAddIdentifiersToDatabase( identifiers,
+                                                             filetype,
+                                                             filepath );
+    EXPECT_TRUE( saved_completer.SaveIndex( index_file.string() ) );
+  }
+
+  // Truncate the index.
+  fs::resize_file( index_file, fs::file_size( index_file ) - 1 );
+  EXPECT_FALSE( completer.LoadIndex( index_file.string() ) );
+  EXPECT_THAT( completer.CandidatesForQuery( "fo" ), IsEmpty() );
+
+  std::ofstream( index_file, std::ios_base::binary ) << "not an index";
+  EXPECT_FALSE( completer.LoadIndex( index_file.string() ) );
+
+  fs::remove( index_file );
+}
+
+
+TEST( IdentifierCompleterTest, StaleIndexedIdentifiersRemoved ) {
+  fs::path index_directory = fs::temp_directory_path() / "ycm_index_test_stale";
+  fs::remove_all( index_directory );
+  fs::create_directories( index_directory );
+  fs::path index_file = index_directory / "index";
+  fs::path modified_file = index_directory / "modified.py";
+  fs::path unmodified_file = index_directory / "unmodified.py";
+  fs::path removed_file = index_directory / "removed.py";
+  fs::path reparsed_file = index_directory / "reparsed.py";
+  auto add_identifier = []( IdentifierCompleter &completer,
+                            const std::string &identifier,
+                            const fs::path &filepath ) {
+    std::vector< std::string > identifiers = { identifier };
+    std::string filetype = "python";
+    std::string path = filepath.string();
+    completer.ClearForFileAndAddIdentifiersToDatabase( identifiers,
+                                                       filetype,
+                                                       path );
+  };
+
+  {
+    IdentifierCompleter completer;
+    for ( const auto& [ identifier, filepath ] :
+          { std::pair( "foomod", modified_file ),
+            std::pair( "foounmod", unmodified_file ),
+            std::pair( "foorem", removed_file ),
+            std::pair( "foorep", reparsed_file ) } ) {
+      std::ofstream( filepath ) << identifier;
+      add_identifier( completer, identifier, filepath );
+    }
+    EXPECT_TRUE( completer.SaveIndex( index_file.string() ) );
+  }
+
+  fs::last_write_time( modified_file, fs::last_write_time( modified_file ) +
+                                      std::chrono::seconds( 1 ) );
+  fs::last_write_time( reparsed_file, fs::last_write_time( reparsed_file ) +
+                                      std::chrono::seconds( 1 ) );
+  fs::remove( removed_file );
+
+  IdentifierCompleter completer;
+  EXPECT_TRUE( completer.LoadIndex( index_file.string() ) );
+  add_identifier( completer, "foonew", reparsed_file );
+  auto query = [ &completer ]() {
+    std::string query = "fo";
+    return completer.CandidatesForQueryAndType( query, "python" );
+  };
+  EXPECT_THAT( query(),
+               ElementsAre( "foomod", "foonew", "foorem", "foounmod" ) );
+
+  completer.RemoveStaleIndexedIdentifiers();
+  EXPECT_THAT( query(), ElementsAre( "foonew", "foounmod" ) );
+
+  fs::remove_all( index_directory );
+}
+
+} // namespace YouCompleteMe
@@ -18,6 +18,7 @@
 #include "IdentifierUtils.h"
 #include "TestUtils.h"
 #include "IdentifierDatabase.h"
+#include "ThreadPool.h"
 
 #include <gtest/gtest.h>
 #include <gmock/gmock.h>
@@ -64,6 +65,23 @@ TEST( IdentifierUtilsTest, ExtractIdentifiersFromTagsFileWorks ) {
 }
 
 
+TEST( IdentifierUtilsTest, ExtractIdentifiersFromTagsFileInParallel ) {
+  fs::path testfile = PathToTestFile( "basic.tags" );
+  FiletypeIdentifierMap expected = ExtractIdentifiersFromTagsFile( testfile );
+
+  ThreadPool::Instance().SetParallelThreshold( 0 );
+  for ( size_t num_threads : { 2, 3, 8 } ) {
+    ThreadPool::Instance().SetNumThreads( num_threads );
+    EXPECT_THAT( ExtractIdentifiersFromTagsFile( testfile ),
+                 ContainerEq( expected ) );
+  }
+
+  ThreadPool::Instance().SetNumThreads( 0 );
+  ThreadPool::Instance().SetParallelThreshold(
+    ThreadPool::DEFAULT_PARALLEL_THRESHOLD );
+}
+
+
 TEST( IdentifierUtilsTest, TagFileIsDirectory ) {
   fs::path testfile = PathToTestFile( "directory.tags" );
 
@@ -91,5 +109,56 @@ TEST( IdentifierUtilsTest, TagFileInvalidPath ) {
   EXPECT_THAT( ExtractIdentifiersFromTagsFile( testfile ), IsEmpty() );
 }
 
-} // namespace YouCompleteMe
+TEST( IdentifierUtilsTest, RemoveIdentifierFreeTextForFiletype ) {
+  std::string text = "foo /* bar\n*/ // baz\n# qux\n'a' \"b\" `c` '''d'''";
+
+  EXPECT_EQ( "foo \n \n# qux\n  `c` ",
+             RemoveIdentifierFreeText( text, "cpp" ) );
+  EXPECT_EQ( "foo \n \n# qux\n   ",
+             RemoveIdentifierFreeText( text, "go" ) );
+  EXPECT_EQ( "foo /* bar\n*/ // baz\n\n  `c` ",
+             RemoveIdentifierFreeText( text, "python" ) );
+  EXPECT_EQ( "foo \n \n\n  `c` ",
+             RemoveIdentifierFreeText( text, "unknown" ) );
+}
+
+
+TEST( IdentifierUtilsTest, RemoveIdentifierFreeTextEscapes ) {
+  // Escaped quotes don't open strings.
+  EXPECT_EQ( "\\'foo\\'", RemoveIdentifierFreeText( "\\'foo\\'", "cpp" ) );
+  // Escaped quotes and backslashes don't close strings...
+  EXPECT_EQ( " bar", RemoveIdentifierFreeText( "'foo\\'\\\\' bar", "cpp" ) );
+  // ...unless nothing else does.
+  EXPECT_EQ( " bar", RemoveIdentifierFreeText( "'foo\\' bar", "cpp" ) );
+  EXPECT_EQ( "'foo\\\\\nbar'",
+             RemoveIdentifierFreeText( "'foo\\\\\nbar'", "cpp" ) );
+}
 
+
+TEST( IdentifierUtilsTest, RemoveIdentifierFreeTextUnclosed ) {
+  EXPECT_EQ( "foo /* bar", RemoveIdentifierFreeText( "foo /* bar", "cpp" ) );
+  // Only the empty string of the unclosed multiline string is removed.
+  EXPECT_EQ( "foo \" bar\n",
+             RemoveIdentifierFreeText( "foo \"\"\" bar\n", "python" ) );
+
+  std::string backslashes = "\"" + std::string( 100000, '\\' );
+  EXPECT_EQ( backslashes, RemoveIdentifierFreeText( backslashes, "cpp" ) );
+}
+
+
+TEST( IdentifierUtilsTest, StripCommentsAndStrings ) {
+  StrippedText stripped = StripCommentsAndStrings(
+    "a /* b\nc\nd */ e // f /*\ng \"/*\"\nh /* i\n\"\"\" j\n", "cpp" );
+  EXPECT_EQ( "a \n\n e \ng \nh /* i\n\" j\n", stripped.text );
+  EXPECT_THAT( stripped.lines_in_comment_or_string, ElementsAre( 1, 2 ) );
+  // The openers in comments and strings are ignored, but not the unclosed
+  // comment nor the empty string followed by a quote.
+  EXPECT_THAT( stripped.unclosed_lines, ElementsAre( 4, 5 ) );
+
+  stripped = StripCommentsAndStrings( "'''a\nb''' '''c\nd\n", "python" );
+  EXPECT_EQ( "\n 'c\nd\n", stripped.text );
+  EXPECT_THAT( stripped.lines_in_comment_or_string, ElementsAre( 1 ) );
+  EXPECT_THAT( stripped.unclosed_lines, ElementsAre( 1 ) );
+}
+
+} // namespace YouCompleteMe
@@ -0,0 +1,122 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include <gtest/gtest.h>
+#include <gmock/gmock.h>
+#include "IdentifierCompleter.h"
+#include "Repository.h"
+#include "RepositoryCollector.h"
+#include "TestUtils.h"
+
+#include <memory>
+
+using ::testing::ElementsAre;
+using ::testing::Gt;
+
+namespace YouCompleteMe {
+
+class RepositoryCollectorTest : public ::testing::Test {
+protected:
+  void SetUp() override {
+    Repository< Candidate >::Instance().ClearElements();
+    Repository< Character >::Instance().ClearElements();
+    Repository< CodePoint >::Instance().ClearElements();
+  }
+
+  void TearDown() override {
+    RepositoryCollector::Instance().SetMemoryBudget( 0 );
+  }
+};
+
+
+TEST_F( RepositoryCollectorTest, CollectUnusedElements ) {
+  auto completer = std::make_unique< IdentifierCompleter >(
+    std::vector< std::string >{ "föo", "bär" } );
+  Repository< Candidate >::Instance().GetElements( { "bäz", "qüx" } );
+
+  RepositoryStats stats = RepositoryCollector::Instance().Stats();
+  EXPECT_EQ( 4, stats.num_candidates );
+  // ASCII characters are not stored.
+  EXPECT_EQ( 3, stats.num_characters );
+  EXPECT_THAT( stats.num_code_points, Gt( 0 ) );
+  size_t candidate_bytes = stats.candidate_bytes;
+
+  RepositoryCollector::Instance().Collect();
+
+  stats = RepositoryCollector::Instance().Stats();
+  EXPECT_EQ( 2, stats.num_candidates );
+  EXPECT_THAT( stats.candidate_bytes, Gt( 0 ) );
+  EXPECT_LT( stats.candidate_bytes, candidate_bytes );
+  // ö and ä.
+  EXPECT_EQ( 2, stats.num_characters );
+  EXPECT_EQ( 0, stats.num_code_points );
+  EXPECT_EQ( 0, stats.code_point_bytes );
+  EXPECT_THAT( completer->CandidatesForQuery( "o" ), ElementsAre( "föo" ) );
+
+  completer.reset();
+  RepositoryCollector::Instance().Collect();
+
+  stats = RepositoryCollector::Instance().Stats();
+  EXPECT_EQ( 0, stats.num_candidates );
+  EXPECT_EQ( 0, stats.candidate_bytes );
+  EXPECT_EQ( 0, stats.num_characters );
+  EXPECT_EQ( 0, stats.character_bytes );
+}
+
+
+TEST_F( RepositoryCollectorTest, CollectIfOverBudget ) {
+  IdentifierCompleter completer;
+  size_t num_collections = RepositoryCollector::Instance().Stats()
+                                                          .num_collections;
+
+  std::string filetype = "c";
+  std::string filepath = "foo";
+  std::vector< std::string > candidates = { "foo", "bar" };
+  completer.ClearForFileAndAddIdentifiersToDatabase( candidates,
+                                                     filetype,
+                                                     filepath );
+  EXPECT_EQ( num_collections,
+             RepositoryCollector::Instance().Stats().num_collections );
+
+  RepositoryCollector::Instance().SetMemoryBudget( 1 );
+  filetype = "c";
+  filepath = "foo";
+  candidates = { "baz" };
+  completer.ClearForFileAndAddIdentifiersToDatabase( candidates,
+                                                     filetype,
+                                                     filepath );
+  RepositoryStats stats = RepositoryCollector::Instance().Stats();
+  EXPECT_EQ( num_collections + 1, stats.num_collections );
+  EXPECT_EQ( 1, stats.num_candidates );
+
+  // The elements in use are over the budget but did not double since the last
+  // collection.
+  filetype = "c";
+  filepath = "foo";
+  candidates = { "baz" };
+  completer.ClearForFileAndAddIdentifiersToDatabase( candidates,
+                                                     filetype,
+                                                     filepath );
+  EXPECT_EQ( num_collections + 1,
+             RepositoryCollector::Instance().Stats().num_collections );
+
+  std::string query = "b";
+  EXPECT_THAT( completer.CandidatesForQueryAndType( query, "c" ),
+               ElementsAre( "baz" ) );
+}
+
+} // namespace YouCompleteMe
@@ -0,0 +1,169 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include <gtest/gtest.h>
+#include <gmock/gmock.h>
+#include "Candidate.h"
+#include "IdentifierCompleter.h"
+#include "ThreadPool.h"
+#include "TestUtils.h"
+
+#include <atomic>
+
+using ::testing::ElementsAreArray;
+
+namespace YouCompleteMe {
+
+class ThreadPoolTest : public ::testing::Test {
+protected:
+  void TearDown() override {
+    ThreadPool::Instance().SetNumThreads( 0 );
+    ThreadPool::Instance().SetParallelThreshold(
+      ThreadPool::DEFAULT_PARALLEL_THRESHOLD );
+  }
+};
+
+
+TEST_F( ThreadPoolTest, RunCallsEachTaskOnce ) {
+  ThreadPool thread_pool( 4 );
+  EXPECT_EQ( 4, thread_pool.NumThreads() );
+
+  std::vector< std::atomic< int > > calls( 1000 );
+  thread_pool.Run( calls.size(), [ &calls ]( size_t task ) {
+    ++calls[ task ];
+  } );
+
+  for ( const auto& call : calls ) {
+    EXPECT_EQ( 1, call.load() );
+  }
+}
+
+
+TEST_F( ThreadPoolTest, RunWithoutTasks ) {
+  ThreadPool thread_pool( 4 );
+  size_t num_calls = 0;
+  thread_pool.Run( 0, [ &num_calls ]( size_t ) { ++num_calls; } );
+  EXPECT_EQ( 0, num_calls );
+}
+
+
+TEST_F( ThreadPoolTest, NumChunks ) {
+  ThreadPool thread_pool( 4, 100 );
+  EXPECT_EQ( 1, thread_pool.NumChunks( 0 ) );
+  EXPECT_EQ( 1, thread_pool.NumChunks( 99 ) );
+  EXPECT_EQ( 4, thread_pool.NumChunks( 100 ) );
+
+  thread_pool.SetParallelThreshold( 0 );
+  EXPECT_EQ( 1, thread_pool.NumChunks( 1 ) );
+  EXPECT_EQ( 3, thread_pool.NumChunks( 3 ) );
+
+  thread_pool.SetNumThreads( 1 );
+  EXPECT_EQ( 1, thread_pool.NumThreads() );
+  EXPECT_EQ( 1, thread_pool.NumChunks( 1000 ) );
+}
+
+
+TEST_F( ThreadPoolTest, SetNumThreads ) {
+  ThreadPool thread_pool( 4 );
+  thread_pool.SetNumThreads( 2 );
+  EXPECT_EQ( 2, thread_pool.NumThreads() );
+
+  thread_pool.SetNumThreads( 2 );
+  EXPECT_EQ( 2, thread_pool.NumThreads() );
+
+  thread_pool.SetNumThreads( 0 );
+  EXPECT_EQ( std::max( std::thread::hardware_concurrency(), 1u ),
+             thread_pool.NumThreads() );
+}
+
+
+TEST_F( ThreadPoolTest, FilterAndPartialSortSameAsPartialSort ) {
+  ThreadPool::Instance().SetNumThreads( 3 );
+
+  std::vector< int > items;
+  for ( int i = 0; i < 1000; ++i ) {
+    items.push_back( ( i * 7919 ) % 1009 );
+  }
+  auto filter_chunk = [ &items ]( size_t, size_t begin, size_t end ) {
+    std::vector< int > elements;
+    for ( size_t i = begin; i < end; ++i ) {
+      if ( items[ i ] % 3 != 0 ) {
+        elements.push_back( items[ i ] );
+      }
+    }
+    return elements;
+  };
+
+  for ( size_t max_elements : { 0, 1, 10, 500, 2000 } ) {
+    std::vector< int > expected = filter_chunk( 0, 0, items.size() );
+    PartialSort( expected, max_elements );
+
+    for ( size_t num_chunks : { 1, 2, 3, 7, 1000 } ) {
+      EXPECT_THAT( FilterAndPartialSort< int >( items.size(),
+                                                num_chunks,
+                                                filter_chunk,
+                                                max_elements ),
+                   ElementsAreArray( expected ) )
+        << "max_elements: " << max_elements
+        << ", num_chunks: " << num_chunks;
+    }
+  }
+}
+
+
+TEST_F( ThreadPoolTest, FilterAndPartialSortPassesChunkIndex ) {
+  ThreadPool::Instance().SetNumThreads( 2 );
+
+  std::vector< size_t > chunk_sizes( 4 );
+  FilterAndPartialSort< int >(
+    10,
+    4,
+    [ &chunk_sizes ]( size_t chunk, size_t begin, size_t end ) {
+      chunk_sizes[ chunk ] = end - begin;
+      return std::vector< int >();
+    },
+    0 );
+
+  EXPECT_THAT( chunk_sizes, ElementsAreArray( { 2, 3, 2, 3 } ) );
+}
+
+
+TEST_F( ThreadPoolTest, IdentifierCompleterSameResultsInParallel ) {
+  std::vector< std::string > candidates;
+  for ( size_t i = 0; i < 500; ++i ) {
+    candidates.push_back( "a_A_a_" + std::to_string( i * 37 % 500 ) );
+    candidates.push_back( "foo_bar_" + std::to_string( i ) );
+  }
+  IdentifierCompleter completer( std::move( candidates ) );
+
+  std::vector< std::string > expected = completer.CandidatesForQuery( "aA1" );
+  std::vector< std::string > expected_top = completer.CandidatesForQuery(
+                                              "fb", 10 );
+  EXPECT_FALSE( expected.empty() );
+  EXPECT_EQ( 10, expected_top.size() );
+
+  ThreadPool::Instance().SetParallelThreshold( 0 );
+  for ( size_t num_threads : { 2, 3, 8 } ) {
+    ThreadPool::Instance().SetNumThreads( num_threads );
+    EXPECT_THAT( completer.CandidatesForQuery( "aA1" ),
+                 ElementsAreArray( expected ) );
+    EXPECT_THAT( completer.CandidatesForQuery( "fb", 10 ),
+                 ElementsAreArray( expected_top ) );
+  }
+}
+
+} // namespace YouCompleteMe
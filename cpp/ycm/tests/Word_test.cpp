@@ -98,4 +98,18 @@ TEST( WordTest, DoesntMatchBytes ) {
   EXPECT_FALSE( word.ContainsBytes( Word( "Fβrmmm"  ) ) );
 }
 
+
+TEST( WordTest, AsciiWords ) {
+  EXPECT_TRUE( Word( "fo_O1" ).IsAscii() );
+  EXPECT_TRUE( Word( "" ).IsAscii() );
+  EXPECT_TRUE( Word( "\r \n" ).IsAscii() );
+  // CR LF is a single character.
+  EXPECT_FALSE( Word( "\r\n" ).IsAscii() );
+  EXPECT_FALSE( Word( "föo" ).IsAscii() );
+
+  // ASCII characters are the same objects in all words.
+  EXPECT_EQ( Word( "foo" ).Characters()[ 1 ],
+             Word( "föo" ).Characters()[ 2 ] );
+}
+
 } // namespace YouCompleteMe
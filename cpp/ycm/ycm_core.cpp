@@ -18,7 +18,10 @@
 #include "Candidate.h"
 #include "CodePoint.h"
 #include "IdentifierCompleter.h"
+#include "IdentifierUtils.h"
 #include "PythonSupport.h"
+#include "RepositoryCollector.h"
+#include "ThreadPool.h"
 #include "versioning.h"
 
 #ifdef USE_CLANG_COMPLETER
@@ -67,8 +70,86 @@ PYBIND11_MODULE( ycm_core, mod )
            py::arg("query"),
            py::arg("max_candidates") = 0 );
 
+  py::class_< CandidateSet >( mod, "CandidateSet" )
+    .def( py::init< const py::list&, py::str >(),
+          py::arg("candidates"),
+          py::arg("candidate_property") )
+    .def( "FilterAndSort",
+          &CandidateSet::FilterAndSort,
+          py::arg("query"),
+          py::arg("max_candidates") = 0 )
+    .def( "__len__", &CandidateSet::Size );
+
+  mod.def( "RemoveIdentifierFreeText",
+           &RemoveIdentifierFreeText,
+           py::call_guard< py::gil_scoped_release >(),
+           py::arg( "text" ),
+           py::arg( "filetype" ) );
+
+  mod.def( "StripCommentsAndStrings", []( std::string_view text,
+                                          std::string_view filetype ) {
+             StrippedText stripped;
+             {
+               py::gil_scoped_release unlock;
+               stripped = StripCommentsAndStrings( text, filetype );
+             }
+             py::list lines_in_comment_or_string;
+             for ( size_t line : stripped.lines_in_comment_or_string ) {
+               lines_in_comment_or_string.append( line );
+             }
+             py::list unclosed_lines;
+             for ( size_t line : stripped.unclosed_lines ) {
+               unclosed_lines.append( line );
+             }
+             return py::make_tuple( stripped.text,
+                                    lines_in_comment_or_string,
+                                    unclosed_lines );
+           },
+           py::arg( "text" ),
+           py::arg( "filetype" ) );
+
   mod.def( "YcmCoreVersion", &YcmCoreVersion );
 
+  mod.def( "SetRepositoryMemoryBudget", []( size_t memory_budget ) {
+             RepositoryCollector::Instance().SetMemoryBudget( memory_budget );
+           },
+           py::arg( "memory_budget" ) );
+
+  mod.def( "SetNumThreads", []( size_t num_threads ) {
+             ThreadPool::Instance().SetNumThreads( num_threads );
+           },
+           py::call_guard< py::gil_scoped_release >(),
+           py::arg( "num_threads" ) );
+
+  mod.def( "NumThreads", []() {
+             return ThreadPool::Instance().NumThreads();
+           } );
+
+  mod.def( "CollectRepositories", []() {
+             RepositoryCollector::Instance().Collect();
+           },
+           py::call_guard< py::gil_scoped_release >() );
+
+  mod.def( "RepositoryDebugInfo", []() {
+    RepositoryStats stats = RepositoryCollector::Instance().Stats();
+    py::dict candidates;
+    candidates[ "count" ] = stats.num_candidates;
+    candidates[ "bytes" ] = stats.candidate_bytes;
+    py::dict characters;
+    characters[ "count" ] = stats.num_characters;
+    characters[ "bytes" ] = stats.character_bytes;
+    py::dict code_points;
+    code_points[ "count" ] = stats.num_code_points;
+    code_points[ "bytes" ] = stats.code_point_bytes;
+    py::dict debug_info;
+    debug_info[ "candidates" ] = candidates;
+    debug_info[ "characters" ] = characters;
+    debug_info[ "code_points" ] = code_points;
+    debug_info[ "memory_budget" ] = stats.memory_budget;
+    debug_info[ "collections" ] = stats.num_collections;
+    return debug_info;
+  } );
+
   // This is exposed so that we can test it.
   mod.def( "GetUtf8String", []( py::object o ) -> py::bytes {
                                   return GetUtf8String( o ); } );
@@ -81,9 +162,21 @@ PYBIND11_MODULE( ycm_core, mod )
     .def( "ClearForFileAndAddIdentifiersToDatabase",
           &IdentifierCompleter::ClearForFileAndAddIdentifiersToDatabase,
           py::call_guard< py::gil_scoped_release >() )
+    .def( "UpdateIdentifiersInDatabase",
+          &IdentifierCompleter::UpdateIdentifiersInDatabase,
+          py::call_guard< py::gil_scoped_release >() )
     .def( "AddIdentifiersToDatabaseFromTagFiles",
           &IdentifierCompleter::AddIdentifiersToDatabaseFromTagFiles,
           py::call_guard< py::gil_scoped_release >() )
+    .def( "SaveIndex",
+          &IdentifierCompleter::SaveIndex,
+          py::call_guard< py::gil_scoped_release >() )
+    .def( "LoadIndex",
+          &IdentifierCompleter::LoadIndex,
+          py::call_guard< py::gil_scoped_release >() )
+    .def( "RemoveStaleIndexedIdentifiers",
+          &IdentifierCompleter::RemoveStaleIndexedIdentifiers,
+          py::call_guard< py::gil_scoped_release >() )
     .def( "CandidatesForQueryAndType",
           &IdentifierCompleter::CandidatesForQueryAndType,
           py::call_guard< py::gil_scoped_release >(),
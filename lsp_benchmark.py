@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+# Measures the parts of the language server client that run for every message
+# or request, without starting a language server:
+#  - the throughput of the thread reading the messages of the server: header
+#    parsing, payload reads, JSON decoding and dispatch. The messages are read
+#    from in-memory streams so that the results do not depend on the scheduling
+#    of a server process. Streams recorded from a language server, e.g. by
+#    redirecting its stdout to a file with tee, can be replayed with --stream.
+#  - the check of the saved files open in the server done before each request.
+
+import argparse
+import io
+import json
+import os
+import os.path as p
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+DIR_OF_THIS_SCRIPT = p.dirname( p.abspath( __file__ ) )
+DIR_OF_THIRD_PARTY = p.join( DIR_OF_THIS_SCRIPT, 'third_party' )
+sys.path[ 0:0 ] = [
+  DIR_OF_THIS_SCRIPT,
+  p.join( DIR_OF_THIRD_PARTY, 'regex-build' ) ]
+
+
+def ParseArguments():
+  parser = argparse.ArgumentParser()
+  parser.add_argument( '--runs', type = int, default = 20,
+                       help = 'Number of times each measurement is run '
+                              '(default: %(default)s).' )
+  parser.add_argument( '--messages', type = int, default = 200,
+                       help = 'Number of messages in each generated stream '
+                              '(default: %(default)s).' )
+  parser.add_argument( '--stream', action = 'append', default = [],
+                       help = 'Read the messages recorded in this file '
+                              'instead of the generated streams. Can be given '
+                              'several times.' )
+  parser.add_argument( '--saved_files', type = int, nargs = '+',
+                       default = [ 10, 50, 200 ],
+                       help = 'Numbers of saved files open in the server '
+                              '(default: %(default)s).' )
+  parser.add_argument( '--saved_file_lines', type = int, default = 5000,
+                       help = 'Number of lines of each saved file '
+                              '(default: %(default)s).' )
+  return parser.parse_args()
+
+
+def BuildMessage( message ):
+  content = json.dumps( message, separators = ( ',', ':' ) ).encode()
+  return b'Content-Length: %d\r\n\r\n' % len( content ) + content
+
+
+def BuildCompletionResponse( message_id ):
+  return {
+    'jsonrpc': '2.0',
+    'id': message_id,
+    'result': {
+      'isIncomplete': False,
+      'items': [ {
+        'label': f' identifier_{ item }',
+        'kind': 6,
+        'detail': 'int',
+        'sortText': f'{ item:08x}identifier_{ item }',
+        'filterText': f'identifier_{ item }',
+        'insertTextFormat': 1,
+        'textEdit': {
+          'range': { 'start': { 'line': 10, 'character': 2 },
+                     'end': { 'line': 10, 'character': 7 } },
+          'newText': f'identifier_{ item }'
+        }
+      } for item in range( 500 ) ]
+    }
+  }
+
+
+def BuildDiagnosticsNotification( message_id ):
+  return {
+    'jsonrpc': '2.0',
+    'method': 'textDocument/publishDiagnostics',
+    'params': {
+      'uri': f'file:///project/file_{ message_id }.cpp',
+      'diagnostics': [ {
+        'range': { 'start': { 'line': line, 'character': 4 },
+                   'end': { 'line': line, 'character': 18 } },
+        'severity': 2,
+        'code': 'unused-variable',
+        'source': 'clang',
+        'message': f"Unused variable 'identifier_{ line }'"
+      } for line in range( 100 ) ]
+    }
+  }
+
+
+def BuildSemanticTokensResponse( message_id ):
+  return {
+    'jsonrpc': '2.0',
+    'id': message_id,
+    'result': { 'data': [ value % 17 for value in range( 25000 ) ] }
+  }
+
+
+def BuildProgressNotification( message_id ):
+  return {
+    'jsonrpc': '2.0',
+    'method': '$/progress',
+    'params': {
+      'token': 'indexing',
+      'value': { 'kind': 'report',
+                 'message': f'{ message_id }/1000',
+                 'percentage': message_id % 100 }
+    }
+  }
+
+
+def BuildStream( build_message, num_messages ):
+  return b''.join( BuildMessage( build_message( message_id ) )
+                   for message_id in range( 1, num_messages + 1 ) )
+
+
+def GeneratedStreams( num_messages ):
+  """Returns ( name, stream ) pairs modelled after the traffic of a language
+  server: large completion and semantic tokens responses, diagnostics and
+  small progress notifications."""
+  streams = [ ( 'completions', BuildCompletionResponse ),
+              ( 'diagnostics', BuildDiagnosticsNotification ),
+              ( 'semantic tokens', BuildSemanticTokensResponse ),
+              ( 'progress', BuildProgressNotification ) ]
+  return [ ( name, BuildStream( build_message, num_messages ) )
+           for name, build_message in streams ]
+
+
+def RecordedStreams( paths ):
+  streams = []
+  for path in paths:
+    with open( path, 'rb' ) as stream:
+      streams.append( ( p.basename( path ), stream.read() ) )
+  return streams
+
+
+class PendingResponses( dict ):
+  """Stands for the requests the client sent before the server replied: every
+  response read from the stream finds one."""
+
+  def __contains__( self, message_id ):
+    return True
+
+
+  def __getitem__( self, message_id ):
+    from ycmd.completers.language_server.language_server_completer import (
+      Response )
+    return Response()
+
+
+  def __delitem__( self, message_id ):
+    pass
+
+
+def CreateConnection( stream ):
+  from ycmd.completers.language_server.language_server_completer import (
+    StandardIOLanguageServerConnection )
+
+  class ReplayConnection( StandardIOLanguageServerConnection ):
+    def _ServerToClientRequest( self, request ):
+      pass
+
+  connection = ReplayConnection( DIR_OF_THIS_SCRIPT,
+                                 None,
+                                 io.BytesIO(),
+                                 io.BufferedReader( io.BytesIO( stream ) ),
+                                 None )
+  connection._responses = PendingResponses()
+  # The end of the stream stops the reader instead of raising an error.
+  connection.Stop()
+  return connection
+
+
+def MeasureReadTimes( stream, num_runs ):
+  """Returns the sorted times in milliseconds taken to read and dispatch all
+  the messages of |stream|."""
+  from ycmd.completers.language_server.language_server_completer import (
+    LanguageServerConnectionStopped )
+  times = []
+  for _ in range( num_runs ):
+    connection = CreateConnection( stream )
+    start = time.perf_counter()
+    try:
+      connection._ReadMessages()
+    except LanguageServerConnectionStopped:
+      pass
+    times.append( ( time.perf_counter() - start ) * 1000 )
+  return sorted( times )
+
+
+def Percentile( sorted_values, percentile ):
+  index = min( len( sorted_values ) - 1,
+               int( len( sorted_values ) * percentile / 100 ) )
+  return sorted_values[ index ]
+
+
+def PrintThroughput( name, stream, times ):
+  num_messages = stream.count( b'Content-Length' )
+  size = len( stream ) / 1e6
+  median = Percentile( times, 50 )
+  print( f'{ name:<24} { num_messages:6} messages { size:8.2f} MB  '
+         f'p50 { median:8.3f} ms  { size / median * 1000:8.1f} MB/s  '
+         f'{ num_messages / median * 1000:10.0f} messages/s' )
+
+
+def BenchmarkReadMessages( args ):
+  streams = ( RecordedStreams( args.stream ) if args.stream else
+              GeneratedStreams( args.messages ) )
+  for name, stream in streams:
+    PrintThroughput( name, stream, MeasureReadTimes( stream, args.runs ) )
+
+
+def PrintLatencies( name, latencies ):
+  print( f'{ name:<56} '
+         f'p50 { Percentile( latencies, 50 ):8.3f} ms  '
+         f'p99 { Percentile( latencies, 99 ):8.3f} ms' )
+
+
+def OpenSavedFiles( directory, num_files, num_lines ):
+  """Writes |num_files| files of |num_lines| lines in |directory| and returns
+  the state of the server in which they are open and up to date."""
+  from ycmd.completers.language_server import language_server_protocol as lsp
+  contents = '\n'.join( f'int identifier_{ line } = identifier_{ line // 2 };'
+                         for line in range( num_lines ) )
+  # Files modified recently have no signature and are always read.
+  mtime = time.time() - 10
+  server_file_state = lsp.ServerFileStateStore()
+  for index in range( num_files ):
+    filepath = p.join( directory, f'file_{ index }.cpp' )
+    with open( filepath, 'w' ) as f:
+      f.write( contents )
+    os.utime( filepath, ( mtime, mtime ) )
+    server_file_state[ filepath ].GetDirtyFileAction( contents )
+  return server_file_state
+
+
+def MeasureSavedFilesUpdateTimes( server_file_state, num_runs, forget ):
+  """Returns the sorted times in milliseconds taken to check that the saved
+  files of |server_file_state| are up to date in the server. If |forget| is
+  True, the signatures of the files are forgotten before each check, so that
+  the files are read and hashed as before signatures were recorded."""
+  from ycmd.completers.language_server.language_server_completer import (
+    LanguageServerCompleter )
+  # The check only needs the state of the server; none of the files changed,
+  # so nothing is sent to it.
+  completer = SimpleNamespace( _server_file_state = server_file_state )
+  request_data = { 'file_data': {} }
+  LanguageServerCompleter._UpdateSavedFilesUnderLock( completer, request_data )
+  times = []
+  for _ in range( num_runs ):
+    if forget:
+      for file_state in server_file_state.values():
+        file_state.file_signature = None
+    start = time.perf_counter()
+    LanguageServerCompleter._UpdateSavedFilesUnderLock( completer,
+                                                        request_data )
+    times.append( ( time.perf_counter() - start ) * 1000 )
+  return sorted( times )
+
+
+def BenchmarkSavedFiles( args ):
+  for num_files in args.saved_files:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      server_file_state = OpenSavedFiles( tmp_dir,
+                                          num_files,
+                                          args.saved_file_lines )
+      for name, forget in [ ( 'read and hash', True ),
+                            ( 'stat', False ) ]:
+        PrintLatencies(
+          f'{ num_files } saved files, { args.saved_file_lines } lines, '
+          f'{ name }',
+          MeasureSavedFilesUpdateTimes( server_file_state, args.runs, forget ) )
+
+
+def Main():
+  args = ParseArguments()
+  BenchmarkReadMessages( args )
+  BenchmarkSavedFiles( args )
+
+
+if __name__ == "__main__":
+  Main()
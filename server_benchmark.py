@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+
+# Measures the latency of requests to a ycmd server running in this process.
+# The server logs each request on stderr, which can be redirected to /dev/null.
+
+import argparse
+import hashlib
+import json
+import os
+import os.path as p
+import socket
+import sys
+import tempfile
+import time
+from base64 import b64encode
+from http.client import HTTPConnection
+
+DIR_OF_THIS_SCRIPT = p.dirname( p.abspath( __file__ ) )
+DIR_OF_THIRD_PARTY = p.join( DIR_OF_THIS_SCRIPT, 'third_party' )
+sys.path[ 0:0 ] = [
+  DIR_OF_THIS_SCRIPT,
+  p.join( DIR_OF_THIRD_PARTY, 'regex-build' ) ]
+
+HMAC_HEADER = 'x-ycm-hmac'
+HMAC_SECRET = os.urandom( 16 )
+
+
+def ParseArguments():
+  parser = argparse.ArgumentParser()
+  parser.add_argument( '--requests', type = int, default = 1000,
+                       help = 'Number of requests to measure '
+                              '(default: %(default)s).' )
+  parser.add_argument( '--buffer_lines', type = int, default = 100,
+                       help = 'Number of lines of the buffer sent with each '
+                              'request (default: %(default)s).' )
+  parser.add_argument( '--large_buffer_lines', type = int, default = 10000,
+                       help = 'Number of lines of the large buffers sent when '
+                              'comparing transports and file_data '
+                              '(default: %(default)s).' )
+  parser.add_argument( '--large_buffers', type = int, default = 3,
+                       help = 'Number of large buffers sent when comparing '
+                              'file_data (default: %(default)s).' )
+  parser.add_argument( '--cache_check_lines', type = int, default = 100000,
+                       help = 'Number of lines of the buffer of the requests '
+                              'compared to the cached completion request '
+                              '(default: %(default)s).' )
+  parser.add_argument( '--identifier_lines', type = int, nargs = '+',
+                       default = [ 1000, 10000, 100000 ],
+                       help = 'Numbers of lines of the buffers parsed for '
+                              'identifiers (default: %(default)s).' )
+  return parser.parse_args()
+
+
+def StartServer( **kwargs ):
+  from ycmd import handlers
+  from ycmd.utils import StartThread
+  from ycmd.wsgi_server import StoppableWSGIServer
+  server = StoppableWSGIServer( handlers.app, '127.0.0.1', 0, **kwargs )
+  StartThread( server.serve_forever )
+  return server
+
+
+def StopServer( server ):
+  server.shutdown()
+  server.server_close()
+
+
+def SetUpHandlers():
+  from ycmd import handlers, user_options_store
+  from ycmd.hmac_plugin import HmacPlugin
+  options = user_options_store.DefaultOptions()
+  handlers.UpdateUserOptions( options )
+  handlers.SetHmacSecret( HMAC_SECRET )
+  handlers.app.install( HmacPlugin( HMAC_SECRET ) )
+
+
+def BuildCompletionRequest( num_lines, num_other_buffers = 0 ):
+  """Returns a request to complete at the end of a buffer of |num_lines| lines,
+  with as many lines in each of |num_other_buffers| other dirty buffers."""
+  lines = [ f'int identifier_{ line } = identifier_{ line // 2 };'
+            for line in range( num_lines ) ]
+  file_data = {}
+  for buffer in range( num_other_buffers ):
+    file_data[ p.join( DIR_OF_THIS_SCRIPT, f'buffer{ buffer }.txt' ) ] = {
+      'filetypes': [ 'text' ],
+      'contents': '\n'.join( lines )
+    }
+  filepath = p.join( DIR_OF_THIS_SCRIPT, 'buffer.txt' )
+  lines.append( 'ident' )
+  file_data[ filepath ] = {
+    'filetypes': [ 'text' ],
+    'contents': '\n'.join( lines )
+  }
+  return {
+    'filepath': filepath,
+    'filetype': 'text',
+    'line_num': len( lines ),
+    'column_num': 6,
+    'file_data': file_data
+  }
+
+
+def ByHash( request ):
+  """Returns |request| with the contents of the buffers other than the current
+  one replaced by their hash, as sent once they are stored by the server."""
+  request = dict( request, file_data = dict( request[ 'file_data' ] ) )
+  for filepath, data in request[ 'file_data' ].items():
+    if filepath != request[ 'filepath' ]:
+      request[ 'file_data' ][ filepath ] = {
+        'filetypes': data[ 'filetypes' ],
+        'contents_hash': hashlib.sha256(
+          data[ 'contents' ].encode() ).hexdigest()
+      }
+  return request
+
+
+def WithHash( request ):
+  """Returns |request| with the hash of the contents of each buffer."""
+  request = dict( request, file_data = dict( request[ 'file_data' ] ) )
+  for filepath, data in request[ 'file_data' ].items():
+    request[ 'file_data' ][ filepath ] = dict(
+      data,
+      contents_hash = hashlib.sha256(
+        data[ 'contents' ].encode() ).hexdigest() )
+  return request
+
+
+class UnixHTTPConnection( HTTPConnection ):
+  def __init__( self, path ):
+    super().__init__( 'localhost' )
+    self._path = path
+
+
+  def connect( self ):
+    self.sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+    self.sock.connect( self._path )
+
+
+def Connect( server ):
+  """Returns a connection to |server|. It is opened again when the server
+  closes it."""
+  if server.IsUnixSocket():
+    return UnixHTTPConnection( server.server_address )
+  return HTTPConnection( '127.0.0.1', server.server_port )
+
+
+def PostRequest( connection, handler, data ):
+  from ycmd.hmac_utils import CreateRequestHmac
+  from ycmd.utils import ToBytes
+  path = '/' + handler
+  body = ToBytes( json.dumps( data ) )
+  headers = {
+    'content-type': 'application/json',
+    HMAC_HEADER: b64encode( CreateRequestHmac( b'POST',
+                                               ToBytes( path ),
+                                               body,
+                                               HMAC_SECRET ) )
+  }
+  connection.request( 'POST', path, body, headers )
+  response = connection.getresponse()
+  response_body = response.read()
+  if response.status != 200:
+    raise RuntimeError( f'{ handler } failed with status { response.status }: '
+                        f'{ response_body }' )
+  return response_body
+
+
+def Percentile( sorted_values, percentile ):
+  index = min( len( sorted_values ) - 1,
+               int( len( sorted_values ) * percentile / 100 ) )
+  return sorted_values[ index ]
+
+
+def MeasureLatencies( server, handler, request, num_requests ):
+  """Returns the sorted latencies in milliseconds of |num_requests| requests,
+  sent in sequence from a single client."""
+  connection = Connect( server )
+  try:
+    # Warm up the server, e.g. parse the buffer for identifiers.
+    PostRequest( connection,
+                 'event_notification',
+                 dict( request, event_name = 'FileReadyToParse' ) )
+    latencies = []
+    for _ in range( num_requests ):
+      start = time.perf_counter()
+      PostRequest( connection, handler, request )
+      latencies.append( ( time.perf_counter() - start ) * 1000 )
+  finally:
+    connection.close()
+  return sorted( latencies )
+
+
+def PrintLatencies( name, latencies ):
+  print( f'{ name:<56} '
+         f'p50 { Percentile( latencies, 50 ):8.3f} ms  '
+         f'p99 { Percentile( latencies, 99 ):8.3f} ms' )
+
+
+def BenchmarkKeepAlive( args ):
+  request = BuildCompletionRequest( args.buffer_lines )
+  for keep_alive in [ False, True ]:
+    server = StartServer( keep_alive = keep_alive )
+    try:
+      latencies = MeasureLatencies( server,
+                                    'completions',
+                                    request,
+                                    args.requests )
+    finally:
+      StopServer( server )
+    PrintLatencies( f'completions, keep_alive={ keep_alive }', latencies )
+
+
+def BenchmarkTransports( args ):
+  if not hasattr( socket, 'AF_UNIX' ):
+    return
+  with tempfile.TemporaryDirectory() as tmp_dir:
+    unix_socket = p.join( tmp_dir, 'ycmd.sock' )
+    for num_lines in [ args.buffer_lines, args.large_buffer_lines ]:
+      request = BuildCompletionRequest( num_lines )
+      for transport, kwargs in [ ( 'tcp', {} ),
+                                 ( 'unix', { 'unix_socket': unix_socket } ) ]:
+        server = StartServer( **kwargs )
+        try:
+          latencies = MeasureLatencies( server,
+                                        'completions',
+                                        request,
+                                        args.requests )
+        finally:
+          StopServer( server )
+        PrintLatencies( f'completions, { num_lines } lines, { transport }',
+                        latencies )
+
+
+def MeasureParseTimes( request, num_requests ):
+  """Returns the sorted times in milliseconds taken by the server to read
+  |request| before handling it: HMAC check, JSON parsing and RequestWrap
+  validation and fingerprinting."""
+  from ycmd import handlers
+  from ycmd.hmac_plugin import RequestAuthenticated
+  from ycmd.hmac_utils import CreateRequestHmac
+  from ycmd.request_wrap import RequestWrap
+  body = json.dumps( request ).encode()
+  headers = { HMAC_HEADER: b64encode(
+    CreateRequestHmac( b'POST', b'/completions', body, HMAC_SECRET ) ) }
+  buffer_store = handlers._server_state.GetBufferStore()
+  times = []
+  for _ in range( num_requests ):
+    start = time.perf_counter()
+    RequestAuthenticated( 'POST', '/completions', body, headers, HMAC_SECRET )
+    request_json = json.loads( body )
+    buffer_store.ResolveFileData( request_json[ 'file_data' ] )
+    RequestWrap( request_json )[ 'file_data_fingerprint' ]
+    times.append( ( time.perf_counter() - start ) * 1000 )
+  return sorted( times )
+
+
+def BenchmarkBufferStore( args ):
+  request = BuildCompletionRequest( args.large_buffer_lines,
+                                    args.large_buffers )
+  server = StartServer()
+  try:
+    # Store the contents of the buffers.
+    PostRequest( Connect( server ), 'completions', WithHash( request ) )
+    for name, sent_request in [ ( 'contents', request ),
+                                ( 'hashes', ByHash( request ) ) ]:
+      size = len( json.dumps( sent_request ).encode() )
+      name = f'completions, { args.large_buffers } other buffers, { name }'
+      print( f'{ name:<56} request { size } bytes' )
+      PrintLatencies( f'{ name }, parse',
+                      MeasureParseTimes( sent_request, args.requests ) )
+      PrintLatencies( f'{ name }, round trip',
+                      MeasureLatencies( server,
+                                        'completions',
+                                        sent_request,
+                                        args.requests ) )
+  finally:
+    StopServer( server )
+
+
+def MeasureCacheCheckTimes( request, num_checks, num_requests ):
+  """Returns the sorted times in milliseconds taken to wrap |request| and
+  compare it |num_checks| times to the request of the completions cache, as
+  the completers do before using their cached candidates."""
+  from ycmd.request_wrap import RequestWrap
+  body = json.dumps( request )
+  cached_request = RequestWrap( json.loads( body ) )
+  cached_request[ 'file_data_fingerprint' ]
+  times = []
+  for _ in range( num_requests ):
+    # Every request comes with new strings, whose hashes are not cached yet.
+    request_json = json.loads( body )
+    start = time.perf_counter()
+    request_data = RequestWrap( request_json )
+    request_data[ 'prefix' ]
+    for _ in range( num_checks ):
+      if not request_data == cached_request:
+        raise RuntimeError( 'The request does not match the cached one' )
+    times.append( ( time.perf_counter() - start ) * 1000 )
+  return sorted( times )
+
+
+def BenchmarkCacheCheck( args ):
+  # Complete in the middle of the buffer, so that the current line splits it.
+  request = BuildCompletionRequest( args.cache_check_lines )
+  request[ 'line_num' ] = args.cache_check_lines * 3 // 5
+  for num_checks in [ 0, 1, 5 ]:
+    PrintLatencies(
+      f'completions cache, { args.cache_check_lines } lines, '
+      f'{ num_checks } checks',
+      MeasureCacheCheckTimes( request, num_checks, args.requests ) )
+
+
+def BuildCodeBuffer( num_lines ):
+  """Returns C++ code of |num_lines| lines with comments and strings, from
+  which the identifier completer strips them."""
+  patterns = [ '/* Returns identifier_{0} from identifier_{1}. */',
+               'int identifier_{0} = identifier_{1}; // Trailing comment.',
+               'const char *string_{0} = "string {0} with words";',
+               '/*',
+               ' * Multiline comment about identifier_{0}.',
+               ' */' ]
+  return '\n'.join( patterns[ line % len( patterns ) ].format( line,
+                                                               line // 2 )
+                     for line in range( num_lines ) )
+
+
+def EditLine( text, line_num ):
+  """Returns |text| with a word added at the start of the line |line_num|."""
+  lines = text.split( '\n' )
+  lines[ line_num ] = 'edited ' + lines[ line_num ]
+  return '\n'.join( lines )
+
+
+def MeasureTimes( function, num_runs ):
+  """Returns the sorted times in milliseconds taken by |num_runs| calls to
+  |function|."""
+  times = []
+  for _ in range( num_runs ):
+    start = time.perf_counter()
+    function()
+    times.append( ( time.perf_counter() - start ) * 1000 )
+  return sorted( times )
+
+
+def BenchmarkStrippedLines( args ):
+  from ycmd.completers.all.identifier_completer import _BufferIdentifiers
+  from ycmd.identifier_utils import RemoveIdentifierFreeText
+  from ycmd.utils import SplitLines
+  for num_lines in args.identifier_lines:
+    # The lines around the cursor are stripped after an edit in the middle of
+    # the buffer, e.g. on InsertLeave.
+    text = BuildCodeBuffer( num_lines )
+    line_num = num_lines // 2
+    edited_text = EditLine( text, line_num )
+    buffer_identifiers = _BufferIdentifiers( 'cpp', False )
+    buffer_identifiers.Update( text )
+    for name, function in [
+        ( 'whole buffer', lambda: SplitLines(
+            RemoveIdentifierFreeText( edited_text, 'cpp' ) )[ line_num ] ),
+        ( 'around the cursor', lambda: buffer_identifiers.StrippedLines(
+            edited_text, line_num, line_num ) ) ]:
+      PrintLatencies( f'stripped line, { num_lines } lines, { name }',
+                      MeasureTimes( function, args.requests ) )
+
+
+def BuildParseRequest( contents ):
+  from ycmd.request_wrap import RequestWrap
+  return RequestWrap( {
+    'filepath': '/buffer.cpp',
+    'line_num': 1,
+    'column_num': 1,
+    'file_data': { '/buffer.cpp': { 'filetypes': [ 'cpp' ],
+                                    'contents': contents } }
+  } )
+
+
+def BenchmarkIdentifierParse( args ):
+  from ycmd import identifier_utils
+  from ycmd.completers.all.identifier_completer import IdentifierCompleter
+  from ycmd.user_options_store import DefaultOptions
+  from ycmd.utils import ImportCore
+  ycm_core = ImportCore()
+  options = DefaultOptions()
+  for num_lines in args.identifier_lines:
+    text = BuildCodeBuffer( num_lines )
+    request = BuildParseRequest( text )
+    edited_request = BuildParseRequest( EditLine( text, num_lines // 2 ) )
+
+    def ExtractAll():
+      # What every FileReadyToParse did before the identifiers of the buffers
+      # were updated incrementally.
+      ycm_core.IdentifierCompleter().ClearForFileAndAddIdentifiersToDatabase(
+        ycm_core.StringVector( identifier_utils.ExtractIdentifiersFromText(
+          identifier_utils.RemoveIdentifierFreeText( text, 'cpp' ), 'cpp' ) ),
+        'cpp',
+        '/buffer.cpp' )
+
+    def ParseFirst():
+      IdentifierCompleter( options ).OnFileReadyToParse( request )
+
+    completer = IdentifierCompleter( options )
+    requests = [ edited_request, request ]
+
+    def ParseEdit():
+      completer.OnFileReadyToParse( requests[ 0 ] )
+      requests.reverse()
+
+    ParseEdit()
+    for name, function in [ ( 'full extraction', ExtractAll ),
+                            ( 'first parse', ParseFirst ),
+                            ( 'one-line edit', ParseEdit ) ]:
+      PrintLatencies( f'identifiers, { num_lines } lines, { name }',
+                      MeasureTimes( function, args.requests ) )
+
+
+def BuildBatch( request, handlers ):
+  """Returns a batch of requests to |handlers| sharing the file_data of
+  |request|."""
+  sub_request = dict( request )
+  del sub_request[ 'file_data' ]
+  return {
+    'file_data': request[ 'file_data' ],
+    'requests': [ { 'handler': handler, 'request': sub_request }
+                  for handler in handlers ]
+  }
+
+
+def MeasureCycleLatencies( server, requests, num_cycles ):
+  """Returns the sorted latencies in milliseconds of |num_cycles| cycles of
+  |requests|, given as ( handler, request ) pairs and sent in sequence."""
+  connection = Connect( server )
+  try:
+    latencies = []
+    for _ in range( num_cycles ):
+      start = time.perf_counter()
+      for handler, request in requests:
+        PostRequest( connection, handler, request )
+      latencies.append( ( time.perf_counter() - start ) * 1000 )
+  finally:
+    connection.close()
+  return sorted( latencies )
+
+
+def BenchmarkBatch( args ):
+  # The requests sent by a client after each change to the buffer.
+  request = BuildCompletionRequest( args.buffer_lines )
+  request[ 'event_name' ] = 'FileReadyToParse'
+  request[ 'range' ] = {
+    'start': { 'line_num': 1, 'column_num': 1 },
+    'end': { 'line_num': request[ 'line_num' ], 'column_num': 1 }
+  }
+  handlers = [ 'event_notification',
+               'semantic_tokens',
+               'inlay_hints',
+               'signature_help' ]
+  server = StartServer()
+  try:
+    for name, requests in [
+        ( 'separate requests', [ ( handler, request )
+                                 for handler in handlers ] ),
+        ( 'batch', [ ( 'batch', BuildBatch( request, handlers ) ) ] ) ]:
+      PrintLatencies( f'{ len( handlers ) } requests per change, { name }',
+                      MeasureCycleLatencies( server, requests, args.requests ) )
+  finally:
+    StopServer( server )
+
+
+def Main():
+  args = ParseArguments()
+  SetUpHandlers()
+  BenchmarkKeepAlive( args )
+  BenchmarkTransports( args )
+  BenchmarkBufferStore( args )
+  BenchmarkCacheCheck( args )
+  BenchmarkIdentifierParse( args )
+  BenchmarkStrippedLines( args )
+  BenchmarkBatch( args )
+
+
+if __name__ == "__main__":
+  Main()
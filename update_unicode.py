@@ -50,7 +50,22 @@ std::array< uint8_t, {size} > indic_conjunct_break;
 }};
 static const RawCodePointArray code_points = {{
 {code_points}
+}};
+// Two-stage table giving the position plus one of a code point in the arrays
+// above from its scalar value, or 0 if it is not in them. The first stage maps
+// the scalar value shifted by code_point_block_shift to a block of the second
+// stage, which holds the positions of the code points in that block.
+static constexpr size_t code_point_block_shift = {block_shift};
+static const std::array< uint16_t, {num_blocks} > code_point_blocks = {{
+{code_point_blocks}
+}};
+static const std::array< uint32_t, {num_indexes} > code_point_indexes = {{
+{code_point_indexes}
 }};""" )
+# The table and the test cases must be generated from the same version of the
+# Unicode Character Database, so it is pinned instead of using the latest one.
+UNICODE_VERSION = '16.0.0'
+UCD_URL = f'https://www.unicode.org/Public/{ UNICODE_VERSION }/ucd/'
 UNICODE_VERSION_REGEX = re.compile( r'Version (?P<version>\d+(?:\.\d+){2})' )
 INDIC_CONJUNCT_BREAK_PROPERTY_REGEX = re.compile(
   r'^(?P<value>[A-F0-9.]+)\s+; (?P<skip>\w+); (?P<property>\w+) # .*$' )
@@ -98,6 +113,10 @@ CASE_FOLDING_REGEX = re.compile(
 EMOJI_PROPERTY_REGEX = re.compile(
   r'^(?P<code>[A-F0-9.]+)\s*; (?P<property>[\w_]+)\s*# .*$' )
 EMOJI_PROPERTY_TOTAL = re.compile( r'# Total elements: (?P<total>\d+)' )
+MAX_CODE_POINT = 0x10FFFF
+# Number of bits of the scalar values indexing the second stage of the code
+# point table. It minimizes the size of the table.
+CODE_POINT_BLOCK_SHIFT = 7
 HANGUL_BASE = 0xAC00
 HANGUL_L_BASE = 0x1100
 HANGUL_V_BASE = 0x1161
@@ -179,8 +198,7 @@ def DecToHex( code_point ):
 
 
 def GetUnicodeVersion():
-  readme = Download(
-    'https://www.unicode.org/Public/UCD/latest/ReadMe.txt' )
+  readme = Download( UCD_URL + 'ReadMe.txt' )
   for line in readme:
     match = UNICODE_VERSION_REGEX.search( line )
     if match:
@@ -191,7 +209,7 @@ def GetUnicodeVersion():
 # See https://www.unicode.org/reports/tr44#UnicodeData.txt
 def GetUnicodeData():
   data = Download(
-    'https://www.unicode.org/Public/UCD/latest/ucd/UnicodeData.txt' )
+    UCD_URL + 'UnicodeData.txt' )
 
   unicode_data = OrderedDict()
 
@@ -279,7 +297,7 @@ def GetBreakProperty( data_url, break_property_regex ):
 # See https://www.unicode.org/reports/tr44#SpecialCasing.txt
 def GetSpecialFolding():
   data = Download(
-    'https://www.unicode.org/Public/UCD/latest/ucd/SpecialCasing.txt' )
+    UCD_URL + 'SpecialCasing.txt' )
 
   folding_data = {}
   for line in data:
@@ -305,7 +323,7 @@ def GetSpecialFolding():
 # See https://www.unicode.org/reports/tr44#CaseFolding.txt
 def GetCaseFolding():
   data = Download(
-    'https://www.unicode.org/Public/UCD/latest/ucd/CaseFolding.txt' )
+    UCD_URL + 'CaseFolding.txt' )
 
   folding_data = {}
   for line in data:
@@ -326,7 +344,7 @@ def GetCaseFolding():
 
 def GetEmojiData():
   data = Download(
-    'https://www.unicode.org/Public/UCD/latest/ucd/emoji/emoji-data.txt' )
+    UCD_URL + 'emoji/emoji-data.txt' )
 
   nb_code_points = 0
   emoji_data = defaultdict( list )
@@ -434,11 +452,10 @@ def GetCodePoints():
   code_points = []
   unicode_data = GetUnicodeData()
   grapheme_break_data = GetBreakProperty(
-    'https://www.unicode.org/Public/UCD/latest'
-      '/ucd/auxiliary/GraphemeBreakProperty.txt',
+    UCD_URL + 'auxiliary/GraphemeBreakProperty.txt',
     GRAPHEME_BREAK_PROPERTY_REGEX )
   indic_conjunct_break_data = GetBreakProperty(
-    'https://www.unicode.org/Public/UCD/latest/ucd/DerivedCoreProperties.txt',
+    UCD_URL + 'DerivedCoreProperties.txt',
     INDIC_CONJUNCT_BREAK_PROPERTY_REGEX )
   special_folding = GetSpecialFolding()
   case_folding = GetCaseFolding()
@@ -491,6 +508,7 @@ def GetCodePoints():
          combining_class or
          indic_conjunct_break ):
       code_points.append( {
+        'scalar_value': int( key, 16 ),
         'original': code_point,
         'normal': normal_code_point,
         'folded_case': folded_code_point,
@@ -531,9 +549,31 @@ def CppLength( utf8_code_point ):
   return len( bytearray( utf8_code_point, encoding = 'utf8' ) ) + 1
 
 
+def GenerateCodePointIndexes( code_points ):
+  # The NUL code point is stored as an empty string in the arrays so it can't
+  # be looked up.
+  indexes = [ 0 ] * ( MAX_CODE_POINT + 1 )
+  for index, code_point in enumerate( code_points ):
+    if code_point[ 'scalar_value' ] != 0:
+      indexes[ code_point[ 'scalar_value' ] ] = index + 1
+
+  # Identical blocks, e.g. the ones of unassigned code points, are shared.
+  block_size = 1 << CODE_POINT_BLOCK_SHIFT
+  blocks = {}
+  code_point_blocks = []
+  for start in range( 0, MAX_CODE_POINT + 1, block_size ):
+    block = tuple( indexes[ start : start + block_size ] )
+    code_point_blocks.append( blocks.setdefault( block, len( blocks ) ) )
+
+  code_point_indexes = [ index for block in blocks for index in block ]
+  return code_point_blocks, code_point_indexes
+
+
 def GenerateUnicodeTable( header_path, code_points ):
   unicode_version = GetUnicodeVersion()
   size = len( code_points )
+  code_point_blocks, code_point_indexes = GenerateCodePointIndexes(
+    code_points )
   table = {
     'original': { 'output': StringIO(), 'size': 0, 'converter': CppChar },
     'normal': { 'output': StringIO(), 'size': 0, 'converter': CppChar },
@@ -580,7 +620,12 @@ def GenerateUnicodeTable( header_path, code_points ):
     normal_size = table[ 'normal' ][ 'size' ],
     folded_case_size = table[ 'folded_case' ][ 'size' ],
     swapped_case_size = table[ 'swapped_case' ][ 'size' ],
-    code_points = code_points )
+    code_points = code_points,
+    block_shift = CODE_POINT_BLOCK_SHIFT,
+    num_blocks = len( code_point_blocks ),
+    code_point_blocks = ','.join( map( str, code_point_blocks ) ),
+    num_indexes = len( code_point_indexes ),
+    code_point_indexes = ','.join( map( str, code_point_indexes ) ) )
 
   with open( header_path, 'w', newline = '\n', encoding='utf8' ) as header_file:
     header_file.write( contents )
@@ -588,7 +633,7 @@ def GenerateUnicodeTable( header_path, code_points ):
 
 def GenerateNormalizationTestCases( output_file ):
   test_contents = Download(
-      'https://www.unicode.org/Public/UCD/latest/ucd/NormalizationTest.txt' )
+      UCD_URL + 'NormalizationTest.txt' )
   hex_codepoint = '(?:[A-F0-9]{4,} ?)+'
   pattern = f'(?:{ hex_codepoint };){{5}}'
   pattern = re.compile( pattern )
@@ -612,8 +657,7 @@ def GenerateNormalizationTestCases( output_file ):
 
 
 def GenerateGraphemeBreakTestCases( output_file ):
-  test_contents = Download( 'https://www.unicode.org/'
-      'Public/UCD/latest/ucd/auxiliary/GraphemeBreakTest.txt' )
+  test_contents = Download( UCD_URL + 'auxiliary/GraphemeBreakTest.txt' )
 
   res = []
   for line in test_contents:
@@ -111,6 +111,9 @@ def ParseArguments():
   # Default of 0 will make the OS pick a free port for us
   parser.add_argument( '--port', type = int, default = 0,
                        help = 'server port' )
+  parser.add_argument( '--unix_socket', type = str, default = None,
+                       help = 'path of a Unix domain socket to listen on '
+                              'instead of the host and port' )
   parser.add_argument( '--log', type = str, default = 'info',
                        help = 'log level, one of '
                               '[debug|info|warning|error|critical]' )
@@ -200,10 +203,14 @@ def Main():
   CloseStdin()
   handlers.wsgi_server = StoppableWSGIServer( handlers.app,
                                               host = args.host,
-                                              port = args.port )
+                                              port = args.port,
+                                              unix_socket = args.unix_socket )
   if sys.stdin is not None:
-    print( f'serving on http://{ handlers.wsgi_server.server_name }:'
-           f'{ handlers.wsgi_server.server_port }' )
+    if args.unix_socket:
+      print( f'serving on unix:{ args.unix_socket }' )
+    else:
+      print( f'serving on http://{ handlers.wsgi_server.server_name }:'
+             f'{ handlers.wsgi_server.server_port }' )
   handlers.wsgi_server.serve_forever()
   handlers.wsgi_server.server_close()
   handlers.ServerCleanup()
@@ -0,0 +1,59 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+from ycmd.responses import UnknownContentsHash
+
+
+class BufferStore:
+  """Contents of the buffers last sent by the client. A buffer in file_data
+  with a 'contents_hash' is stored under that hash when it has 'contents';
+  otherwise, its contents are those stored under that hash. The hash is chosen
+  by the client, e.g. a SHA-256 of the contents or a version number of the
+  buffer, and is never computed by the server."""
+
+  def __init__( self ):
+    self._lock = threading.Lock()
+    # filepath -> ( contents_hash, contents )
+    self._buffers = {}
+
+
+  def ResolveFileData( self, file_data ):
+    """Adds the stored contents to the buffers of |file_data| sent without them.
+    Raises UnknownContentsHash if some of them are not stored."""
+    unknown_filepaths = []
+    with self._lock:
+      for filepath, data in file_data.items():
+        contents_hash = data.get( 'contents_hash' )
+        if contents_hash is None:
+          continue
+        if 'contents' in data:
+          self._buffers[ filepath ] = ( contents_hash, data[ 'contents' ] )
+          continue
+        stored_hash, contents = self._buffers.get( filepath, ( None, None ) )
+        if stored_hash == contents_hash:
+          data[ 'contents' ] = contents
+        else:
+          unknown_filepaths.append( filepath )
+    if unknown_filepaths:
+      raise UnknownContentsHash( unknown_filepaths )
+
+
+  def RemoveBuffer( self, filepath ):
+    with self._lock:
+      self._buffers.pop( filepath, None )
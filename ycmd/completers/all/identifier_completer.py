@@ -15,23 +15,57 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
 import os
-from collections import defaultdict
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter, defaultdict
 from ycmd.completers.general_completer import GeneralCompleter
 from ycmd import identifier_utils
-from ycmd.utils import ImportCore, LOGGER, SplitLines
+from ycmd.utils import ( ImportCore, LOGGER, re, SplitLines, StartThread,
+                         ToBytes )
 from ycmd import responses
 ycm_core = ImportCore()
 
 SYNTAX_FILENAME = 'YCM_PLACEHOLDER_FOR_SYNTAX'
 
+# Minimum number of seconds between two saves of the identifier index.
+INDEX_SAVE_INTERVAL_SECONDS = 60
+
+# Tokens opening a comment or a string that can span several lines. If such a
+# token is not closed, it may be closed by a later edit. The lookahead finds
+# overlapping tokens.
+MULTILINE_OPENER_REGEX = re.compile( r"(?=(/\*|'''|\"\"\"))" )
+# The same tokens and the tokens closing them.
+MULTILINE_OPENERS_AND_CLOSERS = [ ( '/*', '*/' ),
+                                  ( "'''", "'''" ),
+                                  ( '"""', '"""' ) ]
+
 
 class IdentifierCompleter( GeneralCompleter ):
   def __init__( self, user_options ):
     super().__init__( user_options )
     self._completer = ycm_core.IdentifierCompleter()
     self._tags_file_last_mtime = defaultdict( int )
+    # ( filetype, filepath ) -> _BufferIdentifiers
+    self._buffer_identifiers = {}
+    # Held while the map above or one of its _BufferIdentifiers is used, and
+    # while the identifiers of their buffers are changed in the database, so
+    # that the database stays in sync with them.
+    self._buffer_identifiers_lock = threading.Lock()
     self._max_candidates = user_options[ 'max_num_identifier_candidates' ]
+    self._index_path = _IndexPath(
+      user_options[ 'identifier_index_directory' ] )
+    # Protects the two flags below.
+    self._index_lock = threading.Lock()
+    self._index_changed = False
+    self._index_save_scheduled = False
+    # Held while the index file is read or written.
+    self._index_file_lock = threading.Lock()
+    self._index_load_thread = None
+    if self._index_path:
+      self._index_load_thread = StartThread( self._LoadIndex )
 
 
   def ShouldUseNow( self, request_data ):
@@ -58,34 +92,51 @@ class IdentifierCompleter( GeneralCompleter ):
     return [ ConvertCompletionData( x ) for x in completions ]
 
 
-  def _AddIdentifier( self, identifier, request_data ):
+  def _AddIdentifier( self, identifier, request_data, buffer_identifiers ):
+    """Adds |identifier| to the database. |buffer_identifiers| are those of the
+    buffer, if any. Must be called with _buffer_identifiers_lock held."""
     filetype = request_data[ 'first_filetype' ]
     filepath = request_data[ 'filepath' ]
 
     if not filetype or not filepath or not identifier:
       return
 
+    if ( buffer_identifiers and
+         not buffer_identifiers.AddExtraIdentifier( identifier ) ):
+      return
+
     LOGGER.info( 'Adding ONE buffer identifier for file: %s', filepath )
     self._completer.AddSingleIdentifierToDatabase( identifier,
                                                   filetype,
                                                   filepath )
+    self._IndexChanged()
 
 
   def _AddPreviousIdentifier( self, request_data ):
-    self._AddIdentifier(
-      _PreviousIdentifier(
-        self.user_options[ 'min_num_of_chars_for_completion' ],
-        self.user_options[ 'collect_identifiers_from_comments_and_strings' ],
-        request_data ),
-      request_data )
+    with self._buffer_identifiers_lock:
+      buffer_identifiers = self._buffer_identifiers.get(
+        ( request_data[ 'first_filetype' ], request_data[ 'filepath' ] ) )
+      self._AddIdentifier(
+        _PreviousIdentifier(
+          self.user_options[ 'min_num_of_chars_for_completion' ],
+          self.user_options[ 'collect_identifiers_from_comments_and_strings' ],
+          request_data,
+          buffer_identifiers ),
+        request_data,
+        buffer_identifiers )
 
 
   def _AddIdentifierUnderCursor( self, request_data ):
-    self._AddIdentifier(
-      _GetCursorIdentifier(
-        self.user_options[ 'collect_identifiers_from_comments_and_strings' ],
-        request_data ),
-      request_data )
+    with self._buffer_identifiers_lock:
+      buffer_identifiers = self._buffer_identifiers.get(
+        ( request_data[ 'first_filetype' ], request_data[ 'filepath' ] ) )
+      self._AddIdentifier(
+        _GetCursorIdentifier(
+          self.user_options[ 'collect_identifiers_from_comments_and_strings' ],
+          request_data,
+          buffer_identifiers ),
+        request_data,
+        buffer_identifiers )
 
 
   def _AddBufferIdentifiers( self, request_data ):
@@ -98,13 +149,35 @@ class IdentifierCompleter( GeneralCompleter ):
     collect_from_comments_and_strings = bool( self.user_options[
       'collect_identifiers_from_comments_and_strings' ] )
     text = request_data[ 'file_data' ][ filepath ][ 'contents' ]
-    LOGGER.info( 'Adding buffer identifiers for file: %s', filepath )
-    self._completer.ClearForFileAndAddIdentifiersToDatabase(
-        _IdentifiersFromBuffer( text,
-                                filetype,
-                                collect_from_comments_and_strings ),
-        filetype,
-        filepath )
+
+    with self._buffer_identifiers_lock:
+      buffer_identifiers = self._buffer_identifiers.get(
+        ( filetype, filepath ) )
+      if buffer_identifiers is None:
+        buffer_identifiers = _BufferIdentifiers(
+          filetype, collect_from_comments_and_strings )
+        # All the identifiers of the buffer are added on the first update.
+        identifiers, _ = buffer_identifiers.Update( text )
+        self._buffer_identifiers[ ( filetype, filepath ) ] = buffer_identifiers
+        LOGGER.info( 'Adding buffer identifiers for file: %s', filepath )
+        self._completer.ClearForFileAndAddIdentifiersToDatabase(
+            ycm_core.StringVector( identifiers ),
+            filetype,
+            filepath )
+        self._IndexChanged()
+        return
+
+      added_identifiers, removed_identifiers = buffer_identifiers.Update(
+        text )
+      if not added_identifiers and not removed_identifiers:
+        return
+      LOGGER.info( 'Updating buffer identifiers for file: %s', filepath )
+      self._completer.UpdateIdentifiersInDatabase(
+          ycm_core.StringVector( added_identifiers ),
+          ycm_core.StringVector( removed_identifiers ),
+          filetype,
+          filepath )
+      self._IndexChanged()
 
 
   def _FilterUnchangedTagFiles( self, tag_files ):
@@ -127,9 +200,16 @@ class IdentifierCompleter( GeneralCompleter ):
 
 
   def _AddIdentifiersFromTagFiles( self, tag_files ):
-    self._completer.AddIdentifiersToDatabaseFromTagFiles(
-      ycm_core.StringVector(
-        self._FilterUnchangedTagFiles( tag_files ) ) )
+    changed_tag_files = list( self._FilterUnchangedTagFiles( tag_files ) )
+    if not changed_tag_files:
+      return
+    with self._buffer_identifiers_lock:
+      self._completer.AddIdentifiersToDatabaseFromTagFiles(
+        ycm_core.StringVector( changed_tag_files ) )
+      # The tags may have replaced the identifiers of parsed buffers in the
+      # database. They are extracted again on their next parse.
+      self._buffer_identifiers.clear()
+    self._IndexChanged()
 
 
   def _AddIdentifiersFromSyntax( self, keyword_list, filetype ):
@@ -138,6 +218,7 @@ class IdentifierCompleter( GeneralCompleter ):
       ycm_core.StringVector( keyword_list ),
       filetype,
       filepath )
+    self._IndexChanged()
 
 
   def OnFileReadyToParse( self, request_data ):
@@ -149,6 +230,16 @@ class IdentifierCompleter( GeneralCompleter ):
                                      request_data[ 'first_filetype' ] )
 
 
+  def OnBufferUnload( self, request_data ):
+    # The identifiers of the buffer stay in the database. They are recreated the
+    # next time the buffer is parsed.
+    filepath = request_data[ 'filepath' ]
+    with self._buffer_identifiers_lock:
+      for key in [ key for key in self._buffer_identifiers
+                   if key[ 1 ] == filepath ]:
+        del self._buffer_identifiers[ key ]
+
+
   def OnInsertLeave( self, request_data ):
     self._AddIdentifierUnderCursor( request_data )
 
@@ -157,11 +248,75 @@ class IdentifierCompleter( GeneralCompleter ):
     self._AddPreviousIdentifier( request_data )
 
 
+  def Shutdown( self ):
+    self._SaveIndex()
+
+
+  def _LoadIndex( self ):
+    with self._index_file_lock:
+      if not self._completer.LoadIndex( self._index_path ):
+        LOGGER.info( 'No identifier index loaded from %s', self._index_path )
+        return
+      LOGGER.info( 'Loaded identifier index from %s', self._index_path )
+      # Identifiers from the index are available while the files they come from
+      # are checked for modifications.
+      self._completer.RemoveStaleIndexedIdentifiers()
+    # The identifiers of the buffers parsed since the index was loaded are not
+    # removed, but their buffers are extracted again on their next parse in
+    # case the database doesn't match their state anymore.
+    with self._buffer_identifiers_lock:
+      self._buffer_identifiers.clear()
+
+
+  def _IndexChanged( self ):
+    """Schedules a save of the index in the background, at most once every
+    INDEX_SAVE_INTERVAL_SECONDS."""
+    if not self._index_path:
+      return
+    with self._index_lock:
+      self._index_changed = True
+      if self._index_save_scheduled:
+        return
+      self._index_save_scheduled = True
+    StartThread( self._SaveIndexLater )
+
+
+  def _SaveIndexLater( self ):
+    time.sleep( INDEX_SAVE_INTERVAL_SECONDS )
+    with self._index_lock:
+      self._index_save_scheduled = False
+    self._SaveIndex()
+
+
+  def _SaveIndex( self ):
+    if not self._index_path:
+      return
+    with self._index_file_lock:
+      with self._index_lock:
+        if not self._index_changed:
+          return
+        self._index_changed = False
+      if not self._completer.SaveIndex( self._index_path ):
+        LOGGER.error( 'Cannot save identifier index to %s', self._index_path )
+
+
+# The index of a project is stored in |index_directory| under a name derived
+# from the working directory of the server. Returns an empty string if indexes
+# are disabled.
+def _IndexPath( index_directory ):
+  if not index_directory:
+    return ''
+  project_hash = hashlib.sha256( ToBytes( os.getcwd() ) )
+  return os.path.join( os.path.expanduser( index_directory ),
+                       project_hash.hexdigest() )
+
+
 # This looks for the previous identifier and returns it; this might mean looking
 # at last identifier on the previous line if a new line has just been created.
 def _PreviousIdentifier( min_num_candidate_size_chars,
                          collect_from_comments_and_strings,
-                         request_data ):
+                         request_data,
+                         buffer_identifiers = None ):
   def PreviousIdentifierOnLine( line, column, filetype ):
     nearest_ident = ''
     for match in identifier_utils.IdentifierRegexForFiletype(
@@ -172,15 +327,16 @@ def _PreviousIdentifier( min_num_candidate_size_chars,
 
   line_num = request_data[ 'line_num' ] - 1
   column_num = request_data[ 'column_codepoint' ] - 1
-  filepath = request_data[ 'filepath' ]
   filetype = request_data[ 'first_filetype' ]
 
-  contents = request_data[ 'file_data' ][ filepath ][ 'contents' ]
-  if not collect_from_comments_and_strings:
-    contents = identifier_utils.RemoveIdentifierFreeText( contents, filetype )
-  contents_per_line = SplitLines( contents )
+  first_line_num = max( line_num - 1, 0 )
+  lines = _GetLines( collect_from_comments_and_strings,
+                     request_data,
+                     first_line_num,
+                     line_num,
+                     buffer_identifiers )
 
-  ident = PreviousIdentifierOnLine( contents_per_line[ line_num ],
+  ident = PreviousIdentifierOnLine( lines[ line_num - first_line_num ],
                                     column_num,
                                     filetype )
   if ident:
@@ -193,7 +349,7 @@ def _PreviousIdentifier( min_num_candidate_size_chars,
   if line_num < 0:
     return ''
 
-  prev_line = contents_per_line[ line_num ]
+  prev_line = lines[ 0 ]
   ident = PreviousIdentifierOnLine( prev_line, len( prev_line ), filetype )
   if len( ident ) < min_num_candidate_size_chars:
     return ''
@@ -208,27 +364,306 @@ def _RemoveSmallCandidates( candidates, min_num_candidate_size_chars ):
 
 
 def _GetCursorIdentifier( collect_from_comments_and_strings,
-                          request_data ):
-  filepath = request_data[ 'filepath' ]
-  contents = request_data[ 'file_data' ][ filepath ][ 'contents' ]
-  filetype = request_data[ 'first_filetype' ]
-  if not collect_from_comments_and_strings:
-    contents = identifier_utils.RemoveIdentifierFreeText( contents, filetype )
-  contents_per_line = SplitLines( contents )
-  line = contents_per_line[ request_data[ 'line_num' ] - 1 ]
+                          request_data,
+                          buffer_identifiers = None ):
+  line_num = request_data[ 'line_num' ] - 1
+  line = _GetLines( collect_from_comments_and_strings,
+                    request_data,
+                    line_num,
+                    line_num,
+                    buffer_identifiers )[ 0 ]
   return identifier_utils.IdentifierAtIndex(
       line,
       request_data[ 'column_codepoint' ] - 1,
-      filetype )
+      request_data[ 'first_filetype' ] )
 
 
-def _IdentifiersFromBuffer( text,
-                            filetype,
-                            collect_from_comments_and_strings ):
-  if not collect_from_comments_and_strings:
-    text = identifier_utils.RemoveIdentifierFreeText( text, filetype )
-  idents = identifier_utils.ExtractIdentifiersFromText( text, filetype )
-  return ycm_core.StringVector( idents )
+# Returns the lines [ first_line_num, last_line_num ] of the buffer, without
+# their comments and strings unless they are collected. The state of
+# |buffer_identifiers|, if any, is used to only strip the lines around them.
+def _GetLines( collect_from_comments_and_strings,
+               request_data,
+               first_line_num,
+               last_line_num,
+               buffer_identifiers ):
+  filepath = request_data[ 'filepath' ]
+  contents = request_data[ 'file_data' ][ filepath ][ 'contents' ]
+  if collect_from_comments_and_strings:
+    return SplitLines( contents )[ first_line_num : last_line_num + 1 ]
+  if buffer_identifiers is None:
+    buffer_identifiers = _BufferIdentifiers( request_data[ 'first_filetype' ],
+                                             collect_from_comments_and_strings )
+  return buffer_identifiers.StrippedLines( contents,
+                                           first_line_num,
+                                           last_line_num )
+
+
+class _BufferIdentifiers:
+  """Identifiers of a buffer. When the buffer changes, only the identifiers of
+  the lines around the change are extracted again.
+
+  Comments and strings are found by scanning the buffer with the same regex as
+  RemoveIdentifierFreeText. The scan restarts from a line before the change that
+  doesn't start inside a comment or a string, and stops at a line after the
+  change from which the comments and strings are the same as before."""
+
+  def __init__( self, filetype, collect_from_comments_and_strings ):
+    self._filetype = filetype
+    self._remove_comments_and_strings = not collect_from_comments_and_strings
+    self._text = ''
+    self._lines = []
+    # Lines without their comments and strings.
+    self._stripped_lines = []
+    # Whether each line starts inside a comment or a string.
+    self._line_in_comment_or_string = []
+    # Lines containing an opener of a multiline comment or string that is not
+    # closed, in increasing order. The scan must restart before them.
+    self._unclosed_lines = []
+    # Number of occurrences of each identifier in the buffer.
+    self._identifier_counts = Counter()
+    # Identifiers added to the database that are not in the buffer. They are
+    # removed on the next update.
+    self._extra_identifiers = set()
+
+
+  def Identifiers( self ):
+    return self._ExtractIdentifiers( self._stripped_lines )
+
+
+  def AddExtraIdentifier( self, identifier ):
+    """Returns False if |identifier| is already in the database."""
+    if ( self._identifier_counts[ identifier ] > 0 or
+         identifier in self._extra_identifiers ):
+      return False
+    self._extra_identifiers.add( identifier )
+    return True
+
+
+  def Update( self, text ):
+    """Updates the identifiers from the new |text| of the buffer and returns the
+    identifiers to add to and to remove from the database."""
+    lines = SplitLines( text )
+    old_lines = self._lines
+    num_lines = len( lines )
+    num_old_lines = len( old_lines )
+
+    # The new lines [ start, end ) replace the old lines [ start, old_end ).
+    max_common_lines = min( num_lines, num_old_lines )
+    start = 0
+    while start < max_common_lines and lines[ start ] == old_lines[ start ]:
+      start += 1
+    num_common_suffix_lines = 0
+    while ( num_common_suffix_lines < max_common_lines - start and
+            lines[ num_lines - num_common_suffix_lines - 1 ] ==
+            old_lines[ num_old_lines - num_common_suffix_lines - 1 ] ):
+      num_common_suffix_lines += 1
+    end = num_lines - num_common_suffix_lines
+    old_end = num_old_lines - num_common_suffix_lines
+
+    removed_identifiers = list( self._extra_identifiers )
+    self._extra_identifiers.clear()
+    if start == num_lines and num_lines == num_old_lines:
+      return [], removed_identifiers
+
+    if self._remove_comments_and_strings and not old_lines:
+      # The whole buffer is scanned on the first update, which ycm_core does
+      # much faster.
+      ( new_end,
+        stripped_lines,
+        line_in_comment_or_string,
+        unclosed_lines ) = self._ScanText( text, num_lines )
+    elif self._remove_comments_and_strings:
+      if self._unclosed_lines:
+        start = min( start, self._unclosed_lines[ 0 ] )
+      while ( start > 0 and start < num_old_lines and
+              self._line_in_comment_or_string[ start ] ):
+        start -= 1
+      ( new_end,
+        stripped_lines,
+        line_in_comment_or_string,
+        unclosed_lines ) = self._ScanLines( text, lines, start, end, old_end )
+    else:
+      new_end = end
+      stripped_lines = lines[ start : end ]
+      line_in_comment_or_string = [ False ] * ( end - start )
+      unclosed_lines = []
+
+    # The old lines [ start, old_new_end ) are replaced.
+    old_new_end = new_end - end + old_end
+    removed_identifiers.extend( self._ExtractIdentifiers(
+      self._stripped_lines[ start : old_new_end ] ) )
+    added_identifiers = self._ExtractIdentifiers( stripped_lines )
+
+    num_added_lines = new_end - old_new_end
+    self._unclosed_lines = (
+      [ line for line in self._unclosed_lines if line < start ] +
+      unclosed_lines +
+      [ line + num_added_lines for line in self._unclosed_lines
+        if line >= old_new_end ] )
+    self._text = text
+    self._lines = lines
+    self._stripped_lines[ start : old_new_end ] = stripped_lines
+    self._line_in_comment_or_string[ start : old_new_end ] = (
+      line_in_comment_or_string )
+
+    added_counts = Counter( added_identifiers )
+    removed_counts = Counter( removed_identifiers )
+    self._identifier_counts.update( added_counts )
+    self._identifier_counts.subtract( removed_counts )
+    # Nothing cancels out, e.g. on the first update.
+    if not added_identifiers or not removed_identifiers:
+      return added_identifiers, removed_identifiers
+    return ( list( ( added_counts - removed_counts ).elements() ),
+             list( ( removed_counts - added_counts ).elements() ) )
+
+
+  def StrippedLines( self, text, first_line, last_line ):
+    """Returns the lines [ first_line, last_line ] of |text| without their
+    comments and strings. Only the text from the closest line before them that
+    started outside of comments and strings on the last update is stripped,
+    provided that the text before that line didn't change since."""
+    sync_line = max( min( first_line, len( self._lines ) - 1 ), 0 )
+    if self._unclosed_lines:
+      sync_line = min( sync_line, self._unclosed_lines[ 0 ] )
+    while sync_line > 0 and self._line_in_comment_or_string[ sync_line ]:
+      sync_line -= 1
+    sync_offset = sum( map( len, self._lines[ : sync_line ] ) ) + sync_line
+    if not text.startswith( self._text[ : sync_offset ] ):
+      sync_line = 0
+      sync_offset = 0
+
+    end_offset = sync_offset - 1
+    for _ in range( sync_line, last_line + 1 ):
+      end_offset = text.find( '\n', end_offset + 1 )
+      if end_offset < 0:
+        end_offset = len( text )
+        break
+
+    # A comment or a string that can span several lines may end after the last
+    # line. In that case, the rest of the text is stripped.
+    window = text[ sync_offset : end_offset ]
+    for opener, closer in MULTILINE_OPENERS_AND_CLOSERS:
+      opener_offset = window.rfind( opener )
+      if ( opener_offset >= 0 and
+           window.find( closer, opener_offset + len( opener ) ) < 0 ):
+        window = text[ sync_offset : ]
+        break
+    stripped_lines = SplitLines(
+      identifier_utils.RemoveIdentifierFreeText( window, self._filetype ) )
+    return stripped_lines[ first_line - sync_line : last_line - sync_line + 1 ]
+
+
+  def _ExtractIdentifiers( self, stripped_lines ):
+    if not stripped_lines:
+      return []
+    return identifier_utils.ExtractIdentifiersFromText(
+      '\n'.join( stripped_lines ), self._filetype )
+
+
+  def _ScanText( self, text, num_lines ):
+    """Same as _ScanLines on all the |num_lines| lines of |text|."""
+    ( stripped_text,
+      lines_in_comment_or_string,
+      unclosed_lines ) = ycm_core.StripCommentsAndStrings( text,
+                                                           self._filetype )
+    line_in_comment_or_string = [ False ] * num_lines
+    for line in lines_in_comment_or_string:
+      line_in_comment_or_string[ line ] = True
+    return ( num_lines,
+             SplitLines( stripped_text ),
+             line_in_comment_or_string,
+             unclosed_lines )
+
+
+  def _ScanLines( self, text, lines, start, end, old_end ):
+    """Scans the comments and strings of |text| from the line |start|, which
+    doesn't start inside a comment or a string, until a line at or after |end|
+    from which they are the same as before. Returns that line and, for the
+    scanned lines, their text without comments and strings, whether they start
+    inside a comment or a string and which ones are unclosed."""
+    search = identifier_utils.CommentAndStringRegexForFiletype(
+      self._filetype ).search
+    old_line_in_comment_or_string = self._line_in_comment_or_string
+    num_lines = len( lines )
+    # The first line and number of lines of each range of lines starting inside
+    # a comment or a string.
+    lines_in_comment_or_string = []
+    match_starts = []
+    match_ends = []
+    # The scanned text without comments and strings.
+    stripped_text = []
+
+    start_offset = sum( map( len, lines[ : start ] ) ) + start
+    scan_offset = start_offset
+    # The line of scan_offset and the first line not yet scanned.
+    scan_line = start
+    next_line = start
+    while True:
+      match = search( text, scan_offset )
+      if match:
+        match_start, match_end = match.span()
+        match_line = scan_line + text.count( '\n', scan_offset, match_start )
+      else:
+        match_line = num_lines - 1
+
+      # The lines [ next_line, match_line ] start outside of comments and
+      # strings. Stop at the first one after the change that also did before.
+      if match_line >= end:
+        stop_line = next(
+          ( line for line in range( max( next_line, end ), match_line + 1 )
+            if not old_line_in_comment_or_string[ line - end + old_end ] ),
+          None )
+        if stop_line is not None:
+          stop_offset = ( start_offset +
+                          sum( map( len, lines[ start : stop_line ] ) ) +
+                          stop_line - start )
+          stripped_text.append( text[ scan_offset : stop_offset - 1 ] )
+          break
+
+      if not match:
+        stop_line = num_lines
+        stop_offset = len( text ) + 1
+        stripped_text.append( text[ scan_offset : ] )
+        break
+
+      stripped_text.append( text[ scan_offset : match_start ] )
+      num_newlines = match.group().count( '\n' )
+      if num_newlines:
+        stripped_text.append( '\n' * num_newlines )
+        lines_in_comment_or_string.append( ( match_line + 1, num_newlines ) )
+      match_starts.append( match_start )
+      match_ends.append( match_end )
+      scan_offset = match_end
+      scan_line = match_line + num_newlines
+      next_line = scan_line + 1
+
+    line_in_comment_or_string = [ False ] * ( stop_line - start )
+    for first_line, num_inside_lines in lines_in_comment_or_string:
+      line_in_comment_or_string[
+        first_line - start : first_line - start + num_inside_lines ] = (
+          [ True ] * num_inside_lines )
+
+    # Multiline comment and string openers are tried at each offset that is not
+    # inside a comment or a string. They are unclosed if they don't start a
+    # comment or a string of their own.
+    unclosed_lines = set()
+    for opener in MULTILINE_OPENER_REGEX.finditer( text,
+                                                   start_offset,
+                                                   stop_offset - 1 ):
+      offset = opener.start()
+      index = bisect_right( match_starts, offset ) - 1
+      if ( index >= 0 and offset < match_ends[ index ] and
+           ( offset > match_starts[ index ] or
+             match_ends[ index ] - offset >= len( opener.group( 1 ) ) ) ):
+        continue
+      unclosed_lines.add( start + text.count( '\n', start_offset, offset ) )
+
+    stripped_lines = ( SplitLines( ''.join( stripped_text ) )
+                       if stop_line > start else [] )
+    return ( stop_line,
+             stripped_lines,
+             line_in_comment_or_string,
+             sorted( unclosed_lines ) )
 
 
 def _SanitizeQuery( query ):
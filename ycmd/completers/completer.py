@@ -17,6 +17,7 @@
 
 import abc
 import threading
+from collections import OrderedDict
 from ycmd import extra_conf_store
 from ycmd.completers import completer_utils
 from ycmd.responses import NoDiagnosticSupport, SignatureHelpAvailalability
@@ -191,6 +192,9 @@ class Completer( metaclass = abc.ABCMeta ):
   instead of returning FixIts right away, you should override ResolveFixit.
   """
 
+  # Maximum number of completion sites for which completions are cached.
+  COMPLETIONS_CACHE_SIZE = 5
+
   def __init__( self, user_options ):
     self.user_options = user_options
     self.min_num_chars = user_options[ 'min_num_of_chars_for_completion' ]
@@ -209,7 +213,8 @@ class Completer( metaclass = abc.ABCMeta ):
         default_triggers = {} )
       if not user_options[ 'disable_signature_help' ] else None )
 
-    self._completions_cache = CompletionsCache()
+    self._completions_cache = CompletionsCache( self.COMPLETIONS_CACHE_SIZE )
+    self._candidate_set_cache = CandidateSetCache( self.COMPLETIONS_CACHE_SIZE )
     self._max_candidates = user_options[ 'max_num_candidates' ]
     self._max_candidates_to_detail = user_options[
       'max_num_candidates_to_detail' ]
@@ -222,7 +227,7 @@ class Completer( metaclass = abc.ABCMeta ):
   # version of it.
   def ShouldUseNow( self, request_data ):
     if not self.ShouldUseNowInner( request_data ):
-      self._completions_cache.Invalidate()
+      self._completions_cache.InvalidateRequest( request_data )
       return False
 
     # We have to do the cache valid check and get the completions as part of one
@@ -303,7 +308,8 @@ class Completer( metaclass = abc.ABCMeta ):
 
     candidates = self._GetCandidatesFromSubclass( request_data )
     candidates = self.FilterAndSortCandidates( candidates,
-                                               request_data[ 'query' ] )
+                                               request_data[ 'query' ],
+                                               request_data )
 
     return self.DetailCandidates( request_data, candidates )
 
@@ -420,7 +426,10 @@ class Completer( metaclass = abc.ABCMeta ):
       return 'This Completer has no supported subcommands.'
 
 
-  def FilterAndSortCandidates( self, candidates, query ):
+  def FilterAndSortCandidates( self, candidates, query, request_data = None ):
+    """Returns the |candidates| matching |query|, best first. If the candidates
+    were computed for |request_data|, they are filtered again for the next
+    requests at the same completion site without being converted again."""
     if not candidates:
       return []
 
@@ -436,12 +445,29 @@ class Completer( metaclass = abc.ABCMeta ):
       elif 'insertion_text' in candidates[ 0 ]:
         sort_property = 'insertion_text'
 
-    return self.FilterAndSortCandidatesInner( candidates, sort_property, query )
+    return self.FilterAndSortCandidatesInner( candidates,
+                                              sort_property,
+                                              query,
+                                              request_data )
+
 
+  def FilterAndSortCandidatesInner( self,
+                                    candidates,
+                                    sort_property,
+                                    query,
+                                    request_data = None ):
+    if request_data is None:
+      return completer_utils.FilterAndSortCandidatesWrap( candidates,
+                                                          sort_property,
+                                                          query,
+                                                          self._max_candidates )
 
-  def FilterAndSortCandidatesInner( self, candidates, sort_property, query ):
-    return completer_utils.FilterAndSortCandidatesWrap(
-      candidates, sort_property, query, self._max_candidates )
+    # The completions of a site are filtered on every keystroke while they are
+    # cached, so they are converted once to a native candidate set.
+    candidate_set = self._candidate_set_cache.GetCandidateSet( request_data,
+                                                               candidates,
+                                                               sort_property )
+    return candidate_set.FilterAndSort( query, self._max_candidates )
 
 
   def OnFileReadyToParse( self, request_data ):
@@ -513,6 +539,12 @@ class Completer( metaclass = abc.ABCMeta ):
     return ''
 
 
+  def CompletionsCacheDebugInfo( self ):
+    """Returns the size and the hit, miss, and eviction counters of the
+    completions cache."""
+    return self._completions_cache.DebugInfo()
+
+
   def Shutdown( self ):
     pass # pragma: no cover
 
@@ -571,10 +603,17 @@ class Completer( metaclass = abc.ABCMeta ):
 
 
 class CompletionsCache:
-  """Cache of computed completions for a particular request."""
+  """Bounded cache of computed completions. Entries are keyed by the completion
+  site of the request they were computed for (see _CompletionSite) and the least
+  recently used entry is evicted when the cache is full."""
 
-  def __init__( self ):
+  def __init__( self, max_size = 1 ):
     self._access_lock = threading.Lock()
+    self._max_size = max( max_size, 1 )
+    self._entries = OrderedDict()
+    self._hits = 0
+    self._misses = 0
+    self._evictions = 0
     self.Invalidate()
 
 
@@ -584,8 +623,12 @@ class CompletionsCache:
 
 
   def InvalidateNoLock( self ):
-    self._request_data = None
-    self._completions = None
+    self._entries.clear()
+
+
+  def InvalidateRequest( self, request_data ):
+    with self._access_lock:
+      self._entries.pop( _CompletionSite( request_data ), None )
 
 
   def Update( self, request_data, completions ):
@@ -593,17 +636,93 @@ class CompletionsCache:
       self.UpdateNoLock( request_data, completions )
 
 
-  def UpdateNoLock( self, request_data, completions ):
-    self._request_data = request_data
-    self._completions = completions
+  def UpdateNoLock( self, request_data, completions, **kwargs ):
+    """Stores the completions computed for |request_data|. Additional keyword
+    arguments are stored with the entry and passed to _IsEntryValid."""
+    site = _CompletionSite( request_data )
+    self._entries.pop( site, None )
+    self._entries[ site ] = ( request_data, completions, kwargs )
+    while len( self._entries ) > self._max_size:
+      self._entries.popitem( last = False )
+      self._evictions += 1
 
 
   def GetCompletionsIfCacheValid( self, request_data, **kwargs ):
     with self._access_lock:
-      return self.GetCompletionsIfCacheValidNoLock( request_data )
+      return self.GetCompletionsIfCacheValidNoLock( request_data, **kwargs )
+
+
+  def GetCompletionsIfCacheValidNoLock( self, request_data, **kwargs ):
+    site = _CompletionSite( request_data )
+    entry = self._entries.get( site )
+    if entry is None or not self._IsEntryValid( entry, request_data, **kwargs ):
+      self._misses += 1
+      return None
+
+    self._entries.move_to_end( site )
+    self._hits += 1
+    return entry[ 1 ]
+
 
+  # Must be called under the lock.
+  def _IsEntryValid( self, entry, request_data, **kwargs ):
+    return True
+
+
+  def DebugInfo( self ):
+    with self._access_lock:
+      return {
+        'size': len( self._entries ),
+        'max_size': self._max_size,
+        'hits': self._hits,
+        'misses': self._misses,
+        'evictions': self._evictions
+      }
+
+
+def _CompletionSite( request_data ):
+  """Returns a hashable key such that two requests have the same key if and only
+  if they compare equal."""
+  return ( request_data[ 'filepath' ],
+           tuple( request_data[ 'filetypes' ] ),
+           request_data[ 'line_num' ],
+           request_data[ 'start_column' ],
+           request_data[ 'prefix' ],
+           request_data[ 'force_semantic' ],
+           request_data[ 'extra_conf_data' ],
+           frozenset( request_data[ 'file_data_fingerprint' ].items() ) )
+
+
+class CandidateSetCache:
+  """Bounded cache of the native candidate sets built for the completions of
+  the most recently filtered completion sites (see _CompletionSite)."""
+
+  def __init__( self, max_size = 1 ):
+    self._access_lock = threading.Lock()
+    self._max_size = max( max_size, 1 )
+    self._entries = OrderedDict()
+
+
+  def GetCandidateSet( self, request_data, candidates, sort_property ):
+    site = _CompletionSite( request_data )
+    with self._access_lock:
+      entry = self._entries.get( site )
+      if entry is not None:
+        cached_candidates, cached_sort_property, candidate_set = entry
+        # The completions of the site are recomputed when they are no longer
+        # valid, in which case the set is built again.
+        if ( cached_candidates is candidates and
+             cached_sort_property == sort_property ):
+          self._entries.move_to_end( site )
+          return candidate_set
+
+    candidate_set = completer_utils.CandidateSetWrap( candidates,
+                                                      sort_property )
+
+    with self._access_lock:
+      self._entries.pop( site, None )
+      self._entries[ site ] = ( candidates, sort_property, candidate_set )
+      while len( self._entries ) > self._max_size:
+        self._entries.popitem( last = False )
 
-  def GetCompletionsIfCacheValidNoLock( self, request_data ):
-    if self._request_data and self._request_data == request_data:
-      return self._completions
-    return None
+    return candidate_set
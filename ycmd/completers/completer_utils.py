@@ -175,6 +175,12 @@ def FilterAndSortCandidatesWrap( candidates, sort_property, query,
                                   max_candidates )
 
 
+def CandidateSetWrap( candidates, sort_property ):
+  from ycm_core import CandidateSet
+
+  return CandidateSet( candidates, sort_property )
+
+
 TRIGGER_REGEX_PREFIX = 're!'
 
 DEFAULT_FILETYPE_TRIGGERS = {
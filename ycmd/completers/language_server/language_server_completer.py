@@ -222,6 +222,20 @@ class Response:
     return self._message
 
 
+def _FindEndOfHeaders( data, start ):
+  """Returns the offset just past the empty line terminating the header block
+  in |data|, searching from offset |start|, or -1 if |data| does not (yet)
+  contain a complete header block. The protocol mandates CRLF line endings, but
+  bare LF is tolerated."""
+  crlf = data.find( b'\n\r\n', start )
+  lf = data.find( b'\n\n', start )
+  if lf >= 0 and ( crlf < 0 or lf < crlf ):
+    return lf + 2
+  if crlf >= 0:
+    return crlf + 3
+  return -1
+
+
 class LanguageServerConnection( threading.Thread ):
   """
   Abstract language server communication object.
@@ -239,6 +253,10 @@ class LanguageServerConnection( threading.Thread ):
     - ReadData: Read some data from the server, blocking until some data is
              available
 
+  Implementations may also override ReadDataInto to read message payloads
+  directly into a preallocated buffer. The default implementation is in terms of
+  ReadData.
+
   Threads:
 
   LSP is by its nature an asynchronous protocol. There are request-reply like
@@ -323,6 +341,24 @@ class LanguageServerConnection( threading.Thread ):
     pass # pragma: no cover
 
 
+  def ReadDataInto( self, buffer ):
+    """Read up to len( buffer ) bytes from the server into the writable
+    bytes-like object |buffer|, blocking until some data is available. Returns
+    the number of bytes read."""
+    data = self.ReadData( len( buffer ) )
+    buffer[ : len( data ) ] = data
+    return len( data )
+
+
+  def _RaiseConnectionClosed( self, message ):
+    # No data means the connection was severed. Connection severed when (not
+    # self.IsStopped()) means the server died unexpectedly.
+    if self.IsStopped():
+      raise LanguageServerConnectionStopped()
+
+    raise RuntimeError( message )
+
+
   def __init__( self,
                 project_directory,
                 watchdog_factory,
@@ -342,6 +378,10 @@ class LanguageServerConnection( threading.Thread ):
     self._stop_event = threading.Event()
     self._notification_handler = notification_handler
 
+    # Data received from the server which has not yet been consumed as part of a
+    # message.
+    self._receive_buffer = bytearray()
+
     self._collector = UnsolicitedEditApplier()
     self._observers = []
 
@@ -476,107 +516,84 @@ class LanguageServerConnection( threading.Thread ):
 
   def _ReadMessages( self ):
     """Main message pump. Within the message pump thread context, reads messages
-    from the socket/stream by calling self.ReadData in a loop and dispatch
-    complete messages by calling self._DispatchMessage.
+    from the socket/stream by calling self.ReadData and self.ReadDataInto in a
+    loop and dispatch complete messages by calling self._DispatchMessage.
 
     When the server is shut down cleanly, raises
     LanguageServerConnectionStopped"""
 
-    data = bytes( b'' )
     while True:
-      data, read_bytes, headers = self._ReadHeaders( data )
+      headers = self._ReadHeaders()
 
       if 'Content-Length' not in headers:
         # FIXME: We could try and recover this, but actually the message pump
         # just fails.
         raise ValueError( "Missing 'Content-Length' header" )
 
-      content_length = int( headers[ 'Content-Length' ] )
-
-      # We need to read content_length bytes for the payload of this message.
-      # This may be in the remainder of `data`, but equally we may need to read
-      # more data from the socket.
-      content = bytes( b'' )
-      content_read = 0
-      if read_bytes < len( data ):
-        # There are bytes left in data, use them
-        data = data[ read_bytes: ]
-
-        # Read up to content_length bytes from data
-        content_to_read = min( content_length, len( data ) )
-        content += data[ : content_to_read ]
-        content_read += len( content )
-        read_bytes = content_to_read
-
-      while content_read < content_length:
-        # There is more content to read, but data is exhausted - read more from
-        # the socket
-        data = self.ReadData( content_length - content_read )
-        content_to_read = min( content_length - content_read, len( data ) )
-        content += data[ : content_to_read ]
-        content_read += len( content )
-        read_bytes = content_to_read
+      content = self._ReadContent( int( headers[ 'Content-Length' ] ) )
 
       LOGGER.debug( 'RX: Received message: %r', content )
 
       # lsp will convert content to Unicode
       self._DispatchMessage( lsp.Parse( content ) )
 
-      # We only consumed len( content ) of data. If there is more, we start
-      # again with the remainder and look for headers
-      data = data[ read_bytes : ]
-
 
-  def _ReadHeaders( self, data ):
-    """Starting with the data in |data| read headers from the stream/socket
-    until a full set of headers has been consumed. Returns a tuple (
-      - data: any remaining unused data from |data| or the socket
-      - read_bytes: the number of bytes of returned data that have been consumed
-      - headers: a dictionary whose keys are the header names and whose values
-                 are the header values
-    )"""
+  def _ReadHeaders( self ):
+    """Read from the stream/socket until the receive buffer contains a full set
+    of headers, then consume them from the buffer. Returns a dictionary whose
+    keys are the header names and whose values are the header values."""
     # LSP defines only 2 headers, of which only 1 is useful (Content-Length).
     # Headers end with an empty line, and there is no guarantee that a single
     # socket or stream read will contain only a single message, or even a whole
     # message.
+    data = self._receive_buffer
+    search_start = 0
+    end_of_headers = _FindEndOfHeaders( data, search_start )
+    while end_of_headers < 0:
+      # The terminating empty line may straddle two reads, so resume the search
+      # just before the end of what was already scanned.
+      search_start = max( 0, len( data ) - 2 )
+      data += self.ReadData()
+      end_of_headers = _FindEndOfHeaders( data, search_start )
 
-    headers_complete = False
-    prefix = bytes( b'' )
     headers = {}
+    for line in data[ : end_of_headers ].splitlines():
+      line = line.strip()
+      if not line:
+        continue
+      try:
+        key, value = line.decode( 'utf-8' ).split( ':', 1 )
+        headers[ key.strip() ] = value.strip()
+      except Exception:
+        LOGGER.exception( 'Received invalid protocol data from server: '
+                           + str( line ) )
+        raise
 
-    while not headers_complete:
-      read_bytes = 0
-      last_line = 0
-      if len( data ) == 0:
-        data = self.ReadData()
-
-      while read_bytes < len( data ):
-        if utils.ToUnicode( data[ read_bytes: ] )[ 0 ] == '\n':
-          line = prefix + data[ last_line : read_bytes ].strip()
-          prefix = bytes( b'' )
-          last_line = read_bytes
-
-          if not line.strip():
-            headers_complete = True
-            read_bytes += 1
-            break
-          else:
-            try:
-              key, value = utils.ToUnicode( line ).split( ':', 1 )
-              headers[ key.strip() ] = value.strip()
-            except Exception:
-              LOGGER.exception( 'Received invalid protocol data from server: '
-                                 + str( line ) )
-              raise
-
-        read_bytes += 1
-
-      if not headers_complete:
-        prefix = data[ last_line : ]
-        data = bytes( b'' )
-
+    del data[ : end_of_headers ]
+    return headers
+
+
+  def _ReadContent( self, content_length ):
+    """Read and consume exactly |content_length| bytes of message payload,
+    starting with any data left over in the receive buffer. Returns the payload
+    as a bytearray."""
+    data = self._receive_buffer
+    if len( data ) >= content_length:
+      content = data[ : content_length ]
+      del data[ : content_length ]
+      return content
+
+    # Preallocate the whole payload and have the transport read the remainder
+    # straight into it, rather than growing it with a copy per chunk.
+    content = bytearray( content_length )
+    with memoryview( content ) as view:
+      content_read = len( data )
+      view[ : content_read ] = data
+      data.clear()
+      while content_read < content_length:
+        content_read += self.ReadDataInto( view[ content_read : ] )
 
-    return data, read_bytes, headers
+    return content
 
 
   def _HandleDynamicRegistrations( self, request ):
@@ -764,16 +781,23 @@ class StandardIOLanguageServerConnection( LanguageServerConnection ):
           data = self._server_stdout.readline()
 
     if not data:
-      # No data means the connection was severed. Connection severed when (not
-      # self.IsStopped()) means the server died unexpectedly.
-      if self.IsStopped():
-        raise LanguageServerConnectionStopped()
-
-      raise RuntimeError( "Connection to server died" )
+      self._RaiseConnectionClosed( "Connection to server died" )
 
     return data
 
 
+  def ReadDataInto( self, buffer ):
+    bytes_read = 0
+    with self._stdout_lock:
+      if not self._server_stdout.closed:
+        bytes_read = self._server_stdout.readinto( buffer )
+
+    if not bytes_read:
+      self._RaiseConnectionClosed( "Connection to server died" )
+
+    return bytes_read
+
+
 class TCPSingleStreamConnection( LanguageServerConnection ):
   # Connection timeout in seconds
   TCP_CONNECT_TIMEOUT = 10
@@ -853,14 +877,10 @@ class TCPSingleStreamConnection( LanguageServerConnection ):
         else:
           chunk = self._client_socket.recv( min( size - bytes_read , 2048 ) )
       except OSError:
-        chunk = ''
-
-      if chunk == '':
-        # The socket was closed
-        if self.IsStopped():
-          raise LanguageServerConnectionStopped()
+        chunk = b''
 
-        raise RuntimeError( 'Scoket closed unexpectedly when reading' )
+      if not chunk:
+        self._RaiseConnectionClosed( 'Socket closed unexpectedly when reading' )
 
       if size < 0:
         # We just return whatever we read
@@ -873,6 +893,21 @@ class TCPSingleStreamConnection( LanguageServerConnection ):
     return b''.join( chunks )
 
 
+  def ReadDataInto( self, buffer ):
+    assert self._connection_event.is_set()
+    assert self._client_socket
+
+    try:
+      bytes_read = self._client_socket.recv_into( buffer )
+    except OSError:
+      bytes_read = 0
+
+    if not bytes_read:
+      self._RaiseConnectionClosed( 'Socket closed unexpectedly when reading' )
+
+    return bytes_read
+
+
 class LanguageServerCompleter( Completer ):
   """
   Abstract completer implementation for Language Server Protocol. Concrete
@@ -1010,7 +1045,8 @@ class LanguageServerCompleter( Completer ):
     #    whole completion;
     #  - the current column was sent to the server: cache stays valid while the
     #    cached query is a prefix of the subsequent queries.
-    self._completions_cache = LanguageServerCompletionsCache()
+    self._completions_cache = LanguageServerCompletionsCache(
+      self.COMPLETIONS_CACHE_SIZE )
 
     self._completer_name = self.__class__.__name__.replace( 'Completer', '' )
     self._language = self._completer_name.lower()
@@ -2274,6 +2310,7 @@ class LanguageServerCompleter( Completer ):
   def _RefreshFileContentsUnderLock( self, file_name, contents, file_types ):
     file_state: lsp.ServerFileState = self._server_file_state[ file_name ]
     old_state = file_state.state
+    old_contents = file_state.contents
     action = file_state.GetDirtyFileAction( contents )
 
     LOGGER.debug( 'Refreshing file %s: State is %s -> %s/action %s',
@@ -2295,13 +2332,17 @@ class LanguageServerCompleter( Completer ):
 
       self.GetConnection().SendNotification( msg )
     elif action == lsp.ServerFileState.CHANGE_FILE:
-      # FIXME: DidChangeTextDocument doesn't actually do anything
-      # different from DidOpenTextDocument other than send the right
-      # message, because we don't actually have a mechanism for generating
-      # the diffs. This isn't strictly necessary, but might lead to
-      # performance problems.
-      msg = lsp.DidChangeTextDocument( file_state, contents )
-      self.GetConnection().SendNotification( msg )
+      self._SendFileChangeUnderLock( file_state, old_contents, contents )
+
+
+  def _SendFileChangeUnderLock( self, file_state, old_contents, contents ):
+    # Servers which support incremental sync are only sent the changed lines,
+    # computed against the contents they were last sent.
+    if self._sync_type != 'Incremental':
+      old_contents = None
+
+    msg = lsp.DidChangeTextDocument( file_state, contents, old_contents )
+    self.GetConnection().SendNotification( msg )
 
 
   def _UpdateDirtyFilesUnderLock( self, request_data ):
@@ -2334,10 +2375,12 @@ class LanguageServerCompleter( Completer ):
       # the request, we check to see if its on-disk contents match the latest in
       # the server. If they don't, we send an update.
       #
-      # FIXME: This is really inefficient currently, as it reads the entire file
-      # on every update. It might actually be better to close files which have
-      # been saved and are no longer "dirty", though that would likely be less
-      # efficient for downstream servers which cache e.g. AST.
+      # Reading and hashing every such file on every update is expensive, so
+      # the file is only read if it changed on disk since it was last checked.
+      file_signature = lsp.FileSignature( file_name )
+      if file_state.IsSavedFileUnchanged( file_signature ):
+        continue
+
       try:
         contents = GetFileContents( request_data, file_name )
       except IOError:
@@ -2353,10 +2396,10 @@ class LanguageServerCompleter( Completer ):
         files_to_purge.append( file_name )
         continue
 
-      action = file_state.GetSavedFileAction( contents )
+      old_contents = file_state.contents
+      action = file_state.GetSavedFileAction( contents, file_signature )
       if action == lsp.ServerFileState.CHANGE_FILE:
-        msg = lsp.DidChangeTextDocument( file_state, contents )
-        self.GetConnection().SendNotification( msg )
+        self._SendFileChangeUnderLock( file_state, old_contents, contents )
 
     return files_to_purge
 
@@ -3813,19 +3856,20 @@ def WorkspaceEditToFixIt( request_data,
 
 
 class LanguageServerCompletionsCache( CompletionsCache ):
-  """Cache of computed LSP completions for a particular request."""
+  """Cache of computed LSP completions. Entries for incomplete lists of
+  completions are only used to resolve completion items."""
 
   def Invalidate( self ):
     with self._access_lock:
       super().InvalidateNoLock()
-      self._is_incomplete = False
       self._use_start_column = True
 
 
   def Update( self, request_data, completions, is_incomplete ):
     with self._access_lock:
-      super().UpdateNoLock( request_data, completions )
-      self._is_incomplete = is_incomplete
+      super().UpdateNoLock( request_data,
+                            completions,
+                            is_incomplete = is_incomplete )
       if is_incomplete:
         self._use_start_column = False
 
@@ -3838,19 +3882,13 @@ class LanguageServerCompletionsCache( CompletionsCache ):
 
 
   # Must be called under the lock.
-  def _IsQueryPrefix( self, request_data ):
-    return request_data[ 'query' ].startswith( self._request_data[ 'query' ] )
-
-
-  def GetCompletionsIfCacheValid( self,
-                                  request_data,
-                                  **kwargs ):
-    with self._access_lock:
-      if ( ( not self._is_incomplete
-             or kwargs.get( 'ignore_incomplete' ) ) and
-           ( self._use_start_column or self._IsQueryPrefix( request_data ) ) ):
-        return super().GetCompletionsIfCacheValidNoLock( request_data )
-      return None
+  def _IsEntryValid( self, entry, request_data, **kwargs ):
+    cached_request_data, _, cached_kwargs = entry
+    return ( ( not cached_kwargs[ 'is_incomplete' ] or
+               kwargs.get( 'ignore_incomplete' ) ) and
+             ( self._use_start_column or
+               request_data[ 'query' ].startswith(
+                 cached_request_data[ 'query' ] ) ) )
 
 
 class RejectCollector:
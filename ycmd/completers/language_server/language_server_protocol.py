@@ -20,12 +20,12 @@ import collections
 import os
 import json
 import hashlib
+import time
 from urllib.parse import urljoin, urlparse, unquote
 from urllib.request import pathname2url, url2pathname
 
 from ycmd.utils import ( ByteOffsetToCodepointOffset,
                          ToBytes,
-                         ToUnicode,
                          UpdateDict )
 
 
@@ -173,6 +173,12 @@ INLAY_HINT_KIND = [
 ]
 
 
+# Files modified less than this long ago (in nanoseconds) don't have a
+# FileSignature, because a further modification might not change their
+# timestamp.
+FILE_SIGNATURE_RACY_INTERVAL_NS = 2 * 10**9
+
+
 class InvalidUriException( Exception ):
   """Raised when trying to convert a server URI to a file path but the scheme
   was not supported. Only the file: scheme is supported"""
@@ -208,6 +214,10 @@ class ServerFileState:
     self.state = ServerFileState.CLOSED
     self.checksum = None
     self.contents = ''
+    # The FileSignature of the file on disk when its contents were last checked
+    # against the contents sent to the server, or None if they have not been
+    # checked since the last version was sent.
+    self.file_signature = None
 
 
   def GetDirtyFileAction( self, contents ):
@@ -227,21 +237,34 @@ class ServerFileState:
     return self._SendNewVersion( new_checksum, action, contents )
 
 
-  def GetSavedFileAction( self, contents ):
+  def IsSavedFileUnchanged( self, file_signature ):
+    """Returns True if the file on disk, whose FileSignature is
+    |file_signature|, is known to match the contents last sent to the server,
+    i.e. GetSavedFileAction would return NO_ACTION without the file having to be
+    read."""
+    return ( self.state == ServerFileState.OPEN and
+             file_signature is not None and
+             file_signature == self.file_signature )
+
+
+  def GetSavedFileAction( self, contents, file_signature = None ):
     """Progress the state for a file to be updated due to having previously been
-    opened, but no longer supplied in the dirty buffers list. Returns one of the
-    Actions to perform: either NO_ACTION or CHANGE_FILE."""
+    opened, but no longer supplied in the dirty buffers list. |file_signature|
+    is the FileSignature of the file from which |contents| were read. Returns
+    one of the Actions to perform: either NO_ACTION or CHANGE_FILE."""
     # We only need to update if the server state is open
     if self.state != ServerFileState.OPEN:
       return ServerFileState.NO_ACTION
 
+    action = ServerFileState.NO_ACTION
     new_checksum = self._CalculateCheckSum( contents )
-    if self.checksum.digest() == new_checksum.digest():
-      return ServerFileState.NO_ACTION
+    if self.checksum.digest() != new_checksum.digest():
+      action = self._SendNewVersion( new_checksum,
+                                     ServerFileState.CHANGE_FILE,
+                                     contents )
 
-    return self._SendNewVersion( new_checksum,
-                                 ServerFileState.CHANGE_FILE,
-                                 contents )
+    self.file_signature = file_signature
+    return action
 
 
   def GetFileCloseAction( self ):
@@ -260,6 +283,7 @@ class ServerFileState:
     self.version = self.version + 1
     self.state = ServerFileState.OPEN
     self.contents = contents
+    self.file_signature = None
 
     return action
 
@@ -268,6 +292,22 @@ class ServerFileState:
     return hashlib.sha1( ToBytes( contents ) )
 
 
+def FileSignature( filename ):
+  """Returns a value which changes whenever the file |filename| is modified, or
+  None if the file cannot be stat'd or was modified so recently that a further
+  modification might not change the value (e.g. on file systems with coarse
+  timestamps)."""
+  try:
+    stat = os.stat( filename )
+  except OSError:
+    return None
+
+  if time.time_ns() - stat.st_mtime_ns < FILE_SIGNATURE_RACY_INTERVAL_NS:
+    return None
+
+  return ( stat.st_mtime_ns, stat.st_size, stat.st_ino )
+
+
 def BuildRequest( request_id, method, parameters ):
   """Builds a JSON RPC request message with the supplied ID, method and method
   parameters"""
@@ -501,18 +541,118 @@ def DidOpenTextDocument( file_state, file_types, file_contents ):
   } )
 
 
-def DidChangeTextDocument( file_state, file_contents ):
+def DidChangeTextDocument( file_state,
+                           file_contents,
+                           previous_contents = None ):
+  """Build a didChange notification for the new |file_contents|. If the
+  contents last sent to the server are supplied in |previous_contents|, only the
+  changed lines are sent (incremental sync), otherwise the whole document is
+  sent (full sync)."""
+  if previous_contents is None:
+    content_changes = [ { 'text': file_contents } ]
+  else:
+    content_changes = IncrementalContentChanges( previous_contents,
+                                                 file_contents )
+
   return BuildNotification( 'textDocument/didChange', {
     'textDocument': {
       'uri': FilePathToUri( file_state.filename ),
       'version': file_state.version,
     },
-    'contentChanges': [
-      { 'text': file_contents },
-    ]
+    'contentChanges': content_changes
   } )
 
 
+def IncrementalContentChanges( previous_contents, file_contents ):
+  """Returns the list of TextDocumentContentChangeEvent which turn
+  |previous_contents| into |file_contents|. This is a single replacement of the
+  lines between the common leading and trailing lines of both contents."""
+  if previous_contents == file_contents:
+    return []
+
+  # The common leading lines are the whole lines of the common prefix.
+  prefix = _CommonPrefixLength( previous_contents, file_contents )
+  start_offset = previous_contents.rfind( '\n', 0, prefix ) + 1
+  start = {
+    'line': previous_contents.count( '\n', 0, start_offset ),
+    'character': 0
+  }
+
+  # The common trailing lines are the whole lines of the common suffix, which
+  # mustn't overlap the leading lines. Unless the suffix directly follows a
+  # newline or the leading lines in both contents, its first line differs.
+  suffix = _CommonSuffixLength(
+    previous_contents,
+    file_contents,
+    min( len( previous_contents ), len( file_contents ) ) - start_offset )
+  end_offset = len( previous_contents ) - suffix
+  if not ( _StartsLine( previous_contents, end_offset, start_offset ) and
+           _StartsLine( file_contents,
+                        len( file_contents ) - suffix,
+                        start_offset ) ):
+    newline = previous_contents.find( '\n', end_offset )
+    end_offset = newline + 1 if newline != -1 else None
+
+  if end_offset is not None:
+    end = {
+      'line': previous_contents.count( '\n', 0, end_offset ),
+      'character': 0
+    }
+  else:
+    # There are no common trailing lines, not even an empty one after a final
+    # newline, so the replaced range extends to the end of the document.
+    end_offset = len( previous_contents )
+    last_line_start = previous_contents.rfind( '\n' ) + 1
+    last_line = previous_contents[ last_line_start : ]
+    end = Position( previous_contents.count( '\n', 0, last_line_start ) + 1,
+                    last_line,
+                    len( last_line ) + 1 )
+
+  suffix = len( previous_contents ) - end_offset
+  text = file_contents[ start_offset : len( file_contents ) - suffix ]
+  return [ { 'range': { 'start': start, 'end': end }, 'text': text } ]
+
+
+def _StartsLine( contents, offset, first_line_start ):
+  return offset == first_line_start or contents[ offset - 1 ] == '\n'
+
+
+# Comparing slices runs at C speed, so the common prefix and suffix are found by
+# comparing blocks of this many characters before narrowing down on the first
+# differing block.
+_COMPARISON_BLOCK_SIZE = 4096
+
+
+def _CommonPrefixLength( a, b ):
+  length = min( len( a ), len( b ) )
+  start = 0
+  while ( start < length and
+          a[ start : start + _COMPARISON_BLOCK_SIZE ] ==
+          b[ start : start + _COMPARISON_BLOCK_SIZE ] ):
+    start += _COMPARISON_BLOCK_SIZE
+  end = min( start + _COMPARISON_BLOCK_SIZE, length )
+  while start < end and a[ start ] == b[ start ]:
+    start += 1
+  return start
+
+
+def _CommonSuffixLength( a, b, max_length ):
+  """Returns the length of the common suffix of |a| and |b|, which is at most
+  |max_length|."""
+  length = 0
+  while length < max_length:
+    block = min( _COMPARISON_BLOCK_SIZE, max_length - length )
+    if ( a[ len( a ) - length - block : len( a ) - length ] !=
+         b[ len( b ) - length - block : len( b ) - length ] ):
+      break
+    length += block
+  else:
+    return length
+  while length < max_length and a[ -1 - length ] == b[ -1 - length ]:
+    length += 1
+  return length
+
+
 def DidSaveTextDocument( file_state, file_contents ):
   params = {
     'textDocument': {
@@ -798,8 +938,10 @@ def _BuildMessageData( message ):
 
 
 def Parse( data ):
-  """Reads the raw language server message payload into a Python dictionary"""
-  return json.loads( ToUnicode( data ) )
+  """Reads the raw language server message payload into a Python dictionary.
+  |data| may be a string, bytes or a bytearray. The latter are decoded by the
+  JSON parser itself rather than copied into a string first."""
+  return json.loads( data )
 
 
 def CodepointsToUTF16CodeUnits( line_value, codepoint_offset ):
@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
+import http.client
 import json
 import platform
 import sys
@@ -31,8 +32,11 @@ from ycmd.responses import ( BuildExceptionResponse,
                              BuildSignatureHelpAvailableResponse,
                              BuildSemanticTokensResponse,
                              BuildInlayHintsResponse,
+                             ServerError,
                              SignatureHelpAvailalability,
+                             UnknownContentsHash,
                              UnknownExtraConf )
+from ycmd.request_validation import EnsureBatchValid
 from ycmd.request_wrap import RequestWrap
 from ycmd.completers.completer_utils import FilterAndSortCandidatesWrap
 from ycmd.utils import LOGGER, StartThread, ImportCore
@@ -44,12 +48,25 @@ _hmac_secret = bytes()
 app = ycmd.web_plumbing.AppProducer()
 wsgi_server = None
 
+# Returned when the body of a batch is not valid.
+HTTP_BAD_REQUEST = 400
+# Returned when file_data refers to buffer contents that are not stored.
+HTTP_PRECONDITION_FAILED = 412
+
+# Handlers that cannot be part of a batch.
+BATCH_EXCLUDED_HANDLERS = {
+  'batch',
+  'receive_messages',
+}
+
 
 @app.post( '/event_notification' )
 def EventNotification( request, response ):
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
   event_name = request_data[ 'event_name' ]
   LOGGER.debug( 'Event name: %s', event_name )
+  if event_name == 'BufferUnload':
+    _server_state.GetBufferStore().RemoveBuffer( request_data[ 'filepath' ] )
 
   event_handler = 'On' + event_name
   getattr( _server_state.GetGeneralCompleter(), event_handler )( request_data )
@@ -83,7 +100,7 @@ def GetSignatureHelpAvailable( request, response ):
 
 @app.post( '/run_completer_command' )
 def RunCompleterCommand( request, response ):
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
   completer = _GetCompleterForRequestData( request_data )
 
   return _JsonResponse( completer.OnUserCommand(
@@ -93,7 +110,7 @@ def RunCompleterCommand( request, response ):
 
 @app.post( '/resolve_fixit' )
 def ResolveFixit( request, response ):
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
   completer = _GetCompleterForRequestData( request_data )
 
   return _JsonResponse( completer.ResolveFixit( request_data ), response )
@@ -101,7 +118,7 @@ def ResolveFixit( request, response ):
 
 @app.post( '/completions' )
 def GetCompletions( request, response ):
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
   do_filetype_completion = _server_state.ShouldUseFiletypeCompleter(
     request_data )
   LOGGER.debug( 'Using filetype completion: %s', do_filetype_completion )
@@ -138,7 +155,7 @@ def GetCompletions( request, response ):
 
 @app.post( '/resolve_completion' )
 def ResolveCompletionItem( request, response ):
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
   completer = _GetCompleterForRequestData( request_data )
 
   errors = None
@@ -154,7 +171,7 @@ def ResolveCompletionItem( request, response ):
 
 @app.post( '/signature_help' )
 def GetSignatureHelp( request, response ):
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
 
   if not _server_state.FiletypeCompletionUsable( request_data[ 'filetypes' ],
                                                  silent = True ):
@@ -180,7 +197,7 @@ def GetSignatureHelp( request, response ):
 @app.post( '/semantic_tokens' )
 def GetSemanticTokens( request, response ):
   LOGGER.info( 'Received semantic tokens request' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
 
   if not _server_state.FiletypeCompletionUsable( request_data[ 'filetypes' ],
                                                  silent = True ):
@@ -208,7 +225,7 @@ def GetSemanticTokens( request, response ):
 @app.post( '/inlay_hints' )
 def GetInlayHints( request, response ):
   LOGGER.info( 'Received inlay hints request' )
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
 
   if not _server_state.FiletypeCompletionUsable( request_data[ 'filetypes' ],
                                                  silent = True ):
@@ -266,19 +283,19 @@ def GetReady( request, response ):
 @app.post( '/semantic_completion_available' )
 def FiletypeCompletionAvailable( request, response ):
   return _JsonResponse( _server_state.FiletypeCompletionAvailable(
-      RequestWrap( request.json )[ 'filetypes' ] ), response )
+      _RequestWrap( request )[ 'filetypes' ] ), response )
 
 
 @app.post( '/defined_subcommands' )
 def DefinedSubcommands( request, response ):
-  completer = _GetCompleterForRequestData( RequestWrap( request.json ) )
+  completer = _GetCompleterForRequestData( _RequestWrap( request ) )
 
   return _JsonResponse( completer.DefinedSubcommands(), response )
 
 
 @app.post( '/detailed_diagnostic' )
 def GetDetailedDiagnostic( request, response ):
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
   completer = _GetCompleterForRequestData( request_data )
 
   return _JsonResponse( completer.GetDetailedDiagnostic( request_data ),
@@ -287,7 +304,7 @@ def GetDetailedDiagnostic( request, response ):
 
 @app.post( '/load_extra_conf_file' )
 def LoadExtraConfFile( request, response ):
-  request_data = RequestWrap( request.json, validate = False )
+  request_data = _RequestWrap( request, validate = False )
   extra_conf_store.Load( request_data[ 'filepath' ], force = True )
 
   return _JsonResponse( True, response )
@@ -295,7 +312,7 @@ def LoadExtraConfFile( request, response ):
 
 @app.post( '/ignore_extra_conf_file' )
 def IgnoreExtraConfFile( request, response ):
-  request_data = RequestWrap( request.json, validate = False )
+  request_data = _RequestWrap( request, validate = False )
   extra_conf_store.Disable( request_data[ 'filepath' ] )
 
   return _JsonResponse( True, response )
@@ -303,7 +320,7 @@ def IgnoreExtraConfFile( request, response ):
 
 @app.post( '/debug_info' )
 def DebugInfo( request, response ):
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
 
   has_clang_support = ycm_core.HasClangSupport()
   clang_version = ycm_core.ClangVersion() if has_clang_support else None
@@ -329,12 +346,17 @@ def DebugInfo( request, response ):
       'path': extra_conf_path,
       'is_loaded': is_loaded
     },
-    'completer': None
+    'completer': None,
+    'completions_cache': None,
+    'repositories': ycm_core.RepositoryDebugInfo(),
+    'request_pool': ( wsgi_server.RequestPoolDebugInfo() if wsgi_server else
+                      None )
   }
 
   try:
-    result[ 'completer' ] = _GetCompleterForRequestData(
-        request_data ).DebugInfo( request_data )
+    completer = _GetCompleterForRequestData( request_data )
+    result[ 'completer' ] = completer.DebugInfo( request_data )
+    result[ 'completions_cache' ] = completer.CompletionsCacheDebugInfo()
   except Exception:
     LOGGER.exception( 'Error retrieving completer debug info' )
 
@@ -353,7 +375,7 @@ def ReceiveMessages( request, response ):
   # The client makes the request with a long timeout (1 hour).
   # When we have data to send, we send it and close the socket.
   # The client then sends a new request.
-  request_data = RequestWrap( request.json )
+  request_data = _RequestWrap( request )
   try:
     completer = _GetCompleterForRequestData( request_data )
   except Exception:
@@ -364,6 +386,40 @@ def ReceiveMessages( request, response ):
   return _JsonResponse( completer.PollForMessages( request_data ), response )
 
 
+@app.post( '/batch' )
+def Batch( request, response ):
+  batch = request.json
+  try:
+    EnsureBatchValid( batch )
+  except ServerError as error:
+    raise ycmd.web_plumbing.HTTPError(
+      HTTP_BAD_REQUEST,
+      http.client.responses[ HTTP_BAD_REQUEST ],
+      error,
+      traceback.format_exc() )
+
+  # The sub-requests share the file_data of the batch, which is resolved once.
+  # Each of them gets its own copy.
+  file_data = batch.get( 'file_data', {} )
+  _ResolveFileData( file_data )
+
+  # The sub-requests run in order in the thread of the request pool that runs
+  # the batch, so that a batch counts as a single request against the bound of
+  # the pool.
+  results = []
+  for sub_request in batch[ 'requests' ]:
+    request_json = {
+      **sub_request.get( 'request', {} ),
+      'file_data': { filepath: dict( data )
+                     for filepath, data in file_data.items() }
+    }
+    results.append( _RunBatchRequest( sub_request[ 'handler' ], request_json ) )
+
+  # The results are already serialized.
+  response.set_header( 'Content-Type', 'application/json' )
+  return '[' + ','.join( results ) + ']'
+
+
 def ErrorHandler( httperror : ycmd.web_plumbing.HTTPError,
                   response : ycmd.web_plumbing.Response ):
   body = _JsonResponse( BuildExceptionResponse( httperror.exception,
@@ -393,6 +449,64 @@ def _UniversalSerialize( obj ):
     return str( obj )
 
 
+def _ResolveFileData( file_data ):
+  """Takes the contents of the buffers of |file_data| sent by hash from the
+  buffer store."""
+  try:
+    _server_state.GetBufferStore().ResolveFileData( file_data )
+  except UnknownContentsHash as error:
+    raise ycmd.web_plumbing.HTTPError(
+      HTTP_PRECONDITION_FAILED,
+      http.client.responses[ HTTP_PRECONDITION_FAILED ],
+      error,
+      traceback.format_exc() )
+
+
+def _RequestWrap( request, validate = True ):
+  """Returns the RequestWrap of |request|. The contents of the buffers sent by
+  hash are taken from the buffer store."""
+  request_json = request.json
+  # The file_data of the requests of a batch is resolved with the batch.
+  if not isinstance( request, _BatchSubRequest ):
+    _ResolveFileData( request_json.get( 'file_data', {} ) )
+  return RequestWrap( request_json, validate )
+
+
+class _BatchSubRequest:
+  """A request of a batch, passed to the callback of its handler. Its JSON was
+  parsed with the batch."""
+
+  def __init__( self, handler, request_json ):
+    self.method = 'POST'
+    self.path = '/' + handler
+    self.json = request_json
+
+
+def _RunBatchRequest( handler, request_json ):
+  """Runs the callback of |handler| without the plugins, which already ran for
+  the batch. Returns the serialized status and response of the sub-request."""
+  response = ycmd.web_plumbing.Response()
+  try:
+    if handler in BATCH_EXCLUDED_HANDLERS:
+      raise ValueError( f'Handler { handler } cannot be part of a batch' )
+    callback = app.GetCallback( '/' + handler )
+    body = callback( _BatchSubRequest( handler, request_json ), response )
+    status = response.status
+  except ycmd.web_plumbing.HTTPError as error:
+    body = _JsonResponse( BuildExceptionResponse( error.exception,
+                                                  error.traceback ),
+                          response )
+    status = error.status
+  except Exception as error:
+    LOGGER.exception( 'Error running %s in a batch', handler )
+    body = _JsonResponse( BuildExceptionResponse( error,
+                                                  traceback.format_exc() ),
+                          response )
+    status = 500
+  return f'{{"status":{ status },"response":{ body }}}'
+
+
+
 def _GetCompleterForRequestData( request_data ):
   completer_target = request_data.get( 'completer_target', None )
 
@@ -435,6 +549,10 @@ def UpdateUserOptions( options ):
   options.pop( 'hmac_secret', None )
   user_options_store.SetAll( options )
   _server_state = server_state.ServerState( options )
+  ycm_core.SetRepositoryMemoryBudget(
+    options.get( 'max_candidate_memory_mb', 0 ) * 1024 * 1024 )
+  # 0 matches candidates on one thread per hardware thread.
+  ycm_core.SetNumThreads( options.get( 'num_matching_threads', 0 ) )
 
 
 def KeepSubserversAlive( check_interval_seconds ):
@@ -21,6 +21,7 @@ from urllib.parse import urlparse
 from ycmd import hmac_utils
 from ycmd.utils import LOGGER, ToBytes, ToUnicode
 from ycmd.web_plumbing import abort
+from ycmd.wsgi_server import UNIX_SOCKET_ENVIRON_KEY
 
 HTTP_UNAUTHORIZED = 401
 
@@ -68,6 +69,10 @@ class HmacPlugin:
 
 
 def HostHeaderCorrect( request ):
+  # The Host header prevents DNS rebinding attacks from web pages, which can't
+  # connect to Unix domain sockets.
+  if request.env.get( UNIX_SOCKET_ENVIRON_KEY ):
+    return True
   host = urlparse( 'http://' + request.headers[ _HOST_HEADER ] ).hostname
   return host == '127.0.0.1' or host == 'localhost'
 
@@ -15,7 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
-from ycmd.utils import re, SplitLines
+from ycmd.utils import ImportCore, re, SplitLines
+ycm_core = ImportCore()
 
 C_STYLE_COMMENT = '/\\*(?:\n|.)*?\\*/'
 CPP_STYLE_COMMENT = '//.*?$'
@@ -176,8 +177,10 @@ def ReplaceWithEmptyLines( regex_match ):
 
 
 def RemoveIdentifierFreeText( text, filetype = None ):
-  return CommentAndStringRegexForFiletype( filetype ).sub(
-    ReplaceWithEmptyLines, text )
+  # Same as replacing the matches of CommentAndStringRegexForFiletype with
+  # ReplaceWithEmptyLines, but without the backtracking of the regex on long
+  # unclosed strings.
+  return ycm_core.RemoveIdentifierFreeText( text, filetype or '' )
 
 
 def ExtractIdentifiersFromText( text, filetype = None ):
@@ -0,0 +1,235 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import threading
+import time
+from collections import deque
+
+from ycmd.utils import StartThread
+
+# Requests waiting for the user, e.g. to show completions.
+INTERACTIVE_LANE = 'interactive'
+# Commands run by the user, e.g. GoTo or FixIt, which can be slow.
+COMMAND_LANE = 'command'
+# Requests whose result is not waited for, e.g. to parse a file.
+BACKGROUND_LANE = 'background'
+# Requests that wait for messages for a long time.
+LONG_POLL_LANE = 'long_poll'
+
+INTERACTIVE_PATHS = {
+  '/completions',
+  '/detailed_diagnostic',
+  '/filter_and_sort_candidates',
+  '/resolve_completion',
+  '/signature_help',
+  '/signature_help_available',
+}
+COMMAND_PATHS = {
+  '/resolve_fixit',
+  '/run_completer_command',
+}
+LONG_POLL_PATHS = {
+  '/receive_messages',
+}
+# Requests that are answered at once, even when all the threads are busy. They
+# are run outside of the pool.
+DIRECT_PATHS = {
+  '/healthy',
+  '/ready',
+  '/shutdown',
+}
+
+# The lane of a batch depends on the handlers of its requests.
+BATCH_PATH = '/batch'
+# Finds these handlers in the JSON body of a batch, which is not parsed before
+# its HMAC is checked. Quotes inside JSON strings are escaped so they don't
+# match.
+BATCH_HANDLER_REGEX = re.compile( rb'"handler"\s*:\s*"(\w+)"' )
+
+NUM_WORKERS = 8
+NUM_LONG_POLL_WORKERS = 8
+
+
+def LaneForPath( path ):
+  """Returns the lane of the requests to |path|, or None if they are run
+  outside of the pool."""
+  if path in DIRECT_PATHS:
+    return None
+  if path in INTERACTIVE_PATHS:
+    return INTERACTIVE_LANE
+  if path in COMMAND_PATHS:
+    return COMMAND_LANE
+  if path in LONG_POLL_PATHS:
+    return LONG_POLL_LANE
+  return BACKGROUND_LANE
+
+
+def LaneForBatch( body ):
+  """Returns the lane of the batch whose body is |body|: the interactive lane
+  if one of its requests is interactive, the command lane if one of them is a
+  command, and the background lane otherwise."""
+  lanes = { LaneForPath( '/' + handler.decode() )
+            for handler in BATCH_HANDLER_REGEX.findall( body ) }
+  for lane in [ INTERACTIVE_LANE, COMMAND_LANE ]:
+    if lane in lanes:
+      return lane
+  return BACKGROUND_LANE
+
+
+class _Lane:
+  def __init__( self, max_running ):
+    self.max_running = max_running
+    self.running = 0
+    self.jobs = deque()
+    # Metrics.
+    self.max_queued = 0
+    self.num_jobs = 0
+    self.total_wait_seconds = 0.0
+    self.max_wait_seconds = 0.0
+
+
+  def DebugInfo( self ):
+    return {
+      'queued': len( self.jobs ),
+      'max_queued': self.max_queued,
+      'running': self.running,
+      'max_running': self.max_running,
+      'requests': self.num_jobs,
+      'mean_wait_ms': ( self.total_wait_seconds * 1000 / self.num_jobs
+                        if self.num_jobs else 0.0 ),
+      'max_wait_ms': self.max_wait_seconds * 1000
+    }
+
+
+class _Job:
+  def __init__( self, function ):
+    self.function = function
+    self.queued_time = time.perf_counter()
+    self.done = threading.Event()
+    self.result = None
+    self.exception = None
+
+
+  def Run( self ):
+    try:
+      self.result = self.function()
+    except BaseException as exception:
+      self.exception = exception
+    self.done.set()
+
+
+class RequestPool:
+  """Runs requests on a fixed number of threads. Each request is queued in a
+  lane. |num_workers| threads run the interactive requests first, then the
+  commands, then the background requests. Commands take at most half of these
+  threads and, together with the background requests, never take the last of
+  them. Long-polls have their own |num_long_poll_workers| threads."""
+
+  def __init__( self,
+                num_workers = NUM_WORKERS,
+                num_long_poll_workers = NUM_LONG_POLL_WORKERS ):
+    self._condition = threading.Condition()
+    self._stopping = False
+    self._lanes = {
+      INTERACTIVE_LANE: _Lane( num_workers ),
+      COMMAND_LANE: _Lane( max( num_workers // 2, 1 ) ),
+      BACKGROUND_LANE: _Lane( max( num_workers - 1, 1 ) ),
+      LONG_POLL_LANE: _Lane( num_long_poll_workers ),
+    }
+    # The commands and the background requests together leave a thread to the
+    # interactive requests.
+    self._max_running_non_interactive = max( num_workers - 1, 1 )
+    self._running_non_interactive = 0
+    # The lanes served by each group of threads, by decreasing priority.
+    for num_threads, lanes in [
+        ( num_workers, [ INTERACTIVE_LANE, COMMAND_LANE, BACKGROUND_LANE ] ),
+        ( num_long_poll_workers, [ LONG_POLL_LANE ] ) ]:
+      for _ in range( num_threads ):
+        StartThread( self._WorkerMain,
+                     [ self._lanes[ lane ] for lane in lanes ] )
+
+
+  def Run( self, lane, function ):
+    """Runs |function| in |lane| and returns its result or raises its
+    exception once it ran."""
+    job = _Job( function )
+    with self._condition:
+      queue = self._lanes[ lane ]
+      queue.jobs.append( job )
+      queue.max_queued = max( queue.max_queued, len( queue.jobs ) )
+      self._condition.notify_all()
+    job.done.wait()
+    if job.exception is not None:
+      raise job.exception
+    return job.result
+
+
+  def Stop( self ):
+    """Lets the threads end once there are no more requests to run."""
+    with self._condition:
+      self._stopping = True
+      self._condition.notify_all()
+
+
+  def DebugInfo( self ):
+    with self._condition:
+      return { name: lane.DebugInfo() for name, lane in self._lanes.items() }
+
+
+  def _CanRun( self, lane ):
+    """Whether a job of |lane| can start. Must be called with the condition
+    held."""
+    if not lane.jobs or lane.running >= lane.max_running:
+      return False
+    return ( lane not in self._NonInteractiveLanes() or
+             self._running_non_interactive <
+               self._max_running_non_interactive )
+
+
+  def _NonInteractiveLanes( self ):
+    return ( self._lanes[ COMMAND_LANE ], self._lanes[ BACKGROUND_LANE ] )
+
+
+  def _WorkerMain( self, lanes ):
+    while True:
+      with self._condition:
+        while True:
+          lane = next( ( lane for lane in lanes if self._CanRun( lane ) ),
+                       None )
+          if lane or self._stopping:
+            break
+          self._condition.wait()
+        if not lane:
+          return
+        job = lane.jobs.popleft()
+        lane.running += 1
+        if lane in self._NonInteractiveLanes():
+          self._running_non_interactive += 1
+        wait_seconds = time.perf_counter() - job.queued_time
+        lane.num_jobs += 1
+        lane.total_wait_seconds += wait_seconds
+        lane.max_wait_seconds = max( lane.max_wait_seconds, wait_seconds )
+
+      job.Run()
+
+      with self._condition:
+        lane.running -= 1
+        if lane in self._NonInteractiveLanes():
+          self._running_non_interactive -= 1
+        # A job waiting for the lane to have fewer running jobs can now run.
+        self._condition.notify_all()
@@ -33,6 +33,25 @@ def EnsureRequestValid( request_json ):
   raise ServerError( message )
 
 
+# Throws an exception if the request of a batch is not a list of requests with
+# their handler.
+def EnsureBatchValid( batch_json ):
+  if not isinstance( batch_json, dict ) or 'requests' not in batch_json:
+    raise ServerError( _FieldMissingMessage( 'requests' ) )
+  requests = batch_json[ 'requests' ]
+  if not isinstance( requests, list ):
+    raise ServerError( 'Batch requests must be a list' )
+  if not isinstance( batch_json.get( 'file_data', {} ), dict ):
+    raise ServerError( 'Batch file_data must be an object' )
+  for index, request in enumerate( requests ):
+    if not isinstance( request, dict ) or 'handler' not in request:
+      raise ServerError( _FieldMissingMessage( f'requests[ { index } ]'
+                                               '[ "handler" ]' ) )
+    if not isinstance( request.get( 'request', {} ), dict ):
+      raise ServerError( f'Batch request { index } must be an object' )
+  return True
+
+
 def _FieldMissingMessage( field ):
   return f'Request missing required field: { field }'
 
@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
+from itertools import islice
+
 from ycmd.utils import ( ByteOffsetToCodepointOffset,
                          CodepointOffsetToByteOffset,
                          HashableDict,
@@ -83,6 +85,11 @@ class RequestWrap:
       'lines': ( self._CurrentLines, None ),
 
       'extra_conf_data': ( self._GetExtraConfData, None ),
+
+      # Maps each file in file_data to a fingerprint of its contents and
+      # filetypes. The current line is left out of the fingerprint of the
+      # current file. Used to compare requests without comparing contents.
+      'file_data_fingerprint': ( self._FileDataFingerprint, None ),
     }
     self._cached_computed = {}
 
@@ -123,23 +130,8 @@ class RequestWrap:
          len( self[ 'file_data' ] ) != len( other[ 'file_data' ] ) ):
       return False
 
-    for filename, file_data in self[ 'file_data' ].items():
-      if filename == self[ 'filepath' ]:
-        lines = self[ 'lines' ]
-        other_lines = other[ 'lines' ]
-        if len( lines ) != len( other_lines ):
-          return False
-
-        line_num = self[ 'line_num' ]
-        if ( lines[ : line_num - 1 ] != other_lines[ : line_num - 1 ] or
-             lines[ line_num : ] != other_lines[ line_num : ] ):
-          return False
-
-      elif ( filename not in other[ 'file_data' ] or
-             file_data != other[ 'file_data' ][ filename ] ):
-        return False
-
-    return True
+    return ( self[ 'file_data_fingerprint' ] ==
+             other[ 'file_data_fingerprint' ] )
 
 
   def get( self, key, default = None ):
@@ -155,6 +147,42 @@ class RequestWrap:
     return SplitLines( contents )
 
 
+  def _CurrentFileFingerprint( self ):
+    contents = self[ 'file_data' ][ self[ 'filepath' ] ][ 'contents' ]
+    lines = self[ 'lines' ]
+    line_index = self[ 'line_num' ] - 1
+    if line_index < 0:
+      start = end = 0
+    elif line_index >= len( lines ):
+      start = end = len( contents )
+    else:
+      # Lines are separated by a single \n character.
+      start = sum( map( len, islice( lines, line_index ) ) ) + line_index
+      end = start + len( lines[ line_index ] )
+    before = contents[ : start ]
+    after = contents[ end : ]
+    return ( len( lines ),
+             len( before ),
+             hash( before ),
+             len( after ),
+             hash( after ) )
+
+
+  def _FileDataFingerprint( self ):
+    fingerprint = {}
+    for filename, file_data in self[ 'file_data' ].items():
+      filetypes = tuple( file_data.get( 'filetypes', [] ) )
+      if filename == self[ 'filepath' ]:
+        fingerprint[ filename ] = ( filetypes,
+                                    self._CurrentFileFingerprint() )
+      else:
+        contents = file_data.get( 'contents', '' )
+        fingerprint[ filename ] = ( filetypes,
+                                    len( contents ),
+                                    hash( contents ) )
+    return fingerprint
+
+
   def _CurrentLine( self ):
     try:
       return self[ 'lines' ][ self[ 'line_num' ] - 1 ]
@@ -31,6 +31,9 @@ NO_EXTRA_CONF_FILENAME_MESSAGE = ( f'No { YCM_EXTRA_CONF_FILENAME } file '
 NO_DIAGNOSTIC_SUPPORT_MESSAGE = ( 'YCM has no diagnostics support for this '
   'filetype; refer to Syntastic docs if using Syntastic.' )
 
+UNKNOWN_CONTENTS_HASH_MESSAGE = ( 'Unknown contents hash for {0}. Send the '
+  'contents of these buffers again.' )
+
 EMPTY_SIGNATURE_INFO = {
   'activeSignature': 0,
   'activeParameter': 0,
@@ -66,6 +69,13 @@ class NoDiagnosticSupport( ServerError ):
     super().__init__( NO_DIAGNOSTIC_SUPPORT_MESSAGE )
 
 
+class UnknownContentsHash( ServerError ):
+  def __init__( self, filepaths ):
+    super().__init__(
+      UNKNOWN_CONTENTS_HASH_MESSAGE.format( ', '.join( filepaths ) ) )
+    self.filepaths = filepaths
+
+
 # column_num is a byte offset
 def BuildGoToResponse( filepath,
                        line_num,
@@ -17,6 +17,7 @@
 
 import threading
 from importlib import import_module
+from ycmd.buffer_store import BufferStore
 from ycmd.completers.general.general_completer_store import (
     GeneralCompleterStore )
 from ycmd.completers.language_server import generic_lsp_completer
@@ -43,6 +44,7 @@ class ServerState:
     self._filetype_completers = {}
     self._filetype_completers_lock = threading.Lock()
     self._gencomp = GeneralCompleterStore( self._user_options )
+    self._buffer_store = BufferStore()
 
 
   @property
@@ -50,6 +52,10 @@ class ServerState:
     return self._user_options
 
 
+  def GetBufferStore( self ):
+    return self._buffer_store
+
+
   def Shutdown( self ):
     with self._filetype_completers_lock:
       for completer in self._filetype_completers.values():
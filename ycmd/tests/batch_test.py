@@ -0,0 +1,216 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, contains_exactly, equal_to, has_entries,
+                       has_entry )
+import time
+from unittest.mock import patch
+from unittest import TestCase
+
+from ycmd import handlers
+from ycmd.buffer_store import BufferStore
+from ycmd.responses import ServerError, UnknownContentsHash
+from ycmd.tests import IsolatedYcmd, SharedYcmd
+from ycmd.tests.test_utils import ( BuildRequest, CompletionEntryMatcher,
+                                    DummyCompleter, ErrorMatcher,
+                                    PatchCompleter )
+from ycmd.web_plumbing import RouteNotFound
+
+
+def BuildBatch( *requests, **kwargs ):
+  """Builds a batch of |requests|, given as ( handler, request ) pairs, that
+  share the file_data of BuildRequest( **kwargs )."""
+  return {
+    'file_data': BuildRequest( **kwargs )[ 'file_data' ],
+    'requests': [ { 'handler': handler, 'request': request }
+                  for handler, request in requests ]
+  }
+
+
+class BatchTest( TestCase ):
+  @IsolatedYcmd()
+  def test_Batch_RequestsShareFileData( self, app ):
+    response = app.post_json( '/batch', BuildBatch(
+      ( 'event_notification', { 'filepath': '/foo',
+                                'line_num': 1,
+                                'column_num': 1,
+                                'event_name': 'FileReadyToParse' } ),
+      ( 'completions', { 'filepath': '/foo',
+                         'line_num': 1,
+                         'column_num': 3 } ),
+      contents = 'foo foogoo' ) ).json
+    assert_that( response, contains_exactly(
+      has_entries( { 'status': 200, 'response': equal_to( {} ) } ),
+      has_entries( {
+        'status': 200,
+        'response': has_entry( 'completions', contains_exactly(
+          CompletionEntryMatcher( 'foo' ),
+          CompletionEntryMatcher( 'foogoo' ) ) )
+      } )
+    ) )
+
+
+  @SharedYcmd
+  def test_Batch_ErrorsPerRequest( self, app ):
+    request = { 'filepath': '/foo', 'line_num': 1, 'column_num': 1 }
+    response = app.post_json( '/batch', BuildBatch(
+      ( 'not_found', request ),
+      ( 'receive_messages', request ),
+      ( 'completions', { 'filepath': '/foo', 'column_num': 1 } ),
+      ( 'semantic_completion_available', request ) ) ).json
+    assert_that( response, contains_exactly(
+      has_entries( {
+        'status': 500,
+        'response': ErrorMatcher( RouteNotFound, "'/not_found'" )
+      } ),
+      has_entries( {
+        'status': 500,
+        'response': ErrorMatcher(
+          ValueError, 'Handler receive_messages cannot be part of a batch' )
+      } ),
+      has_entries( {
+        'status': 500,
+        'response': ErrorMatcher( ServerError,
+                                  'Request missing required field: line_num' )
+      } ),
+      has_entries( { 'status': 200, 'response': equal_to( False ) } )
+    ) )
+
+
+  @SharedYcmd
+  def test_Batch_InvalidBody( self, app ):
+    for body, message in [
+      ( {}, 'Request missing required field: requests' ),
+      ( { 'requests': {} }, 'Batch requests must be a list' ),
+      ( { 'requests': [ { 'request': {} } ] },
+        'Request missing required field: requests[ 0 ][ "handler" ]' ) ]:
+      response = app.post_json( '/batch', body, expect_errors = True )
+      assert_that( response.status_code, equal_to( 400 ) )
+      assert_that( response.json, ErrorMatcher( ServerError, message ) )
+
+
+  @SharedYcmd
+  def test_Batch_FileDataResolvedOnceAndCopied( self, app ):
+    def ChangeFileData( completer, request_data ):
+      request_data[ 'file_data' ][ '/foo' ][ 'contents' ] = 'changed'
+      return []
+
+    def FileDataContents( completer, request_data ):
+      return [ request_data[ 'file_data' ][ '/foo' ][ 'contents' ] ]
+
+    request = { 'filepath': '/foo', 'line_num': 1, 'column_num': 1 }
+    with PatchCompleter( DummyCompleter, filetype = 'dummy_filetype' ):
+      with patch.object( DummyCompleter, 'GetDetailedDiagnostic',
+                         ChangeFileData ):
+        with patch.object( DummyCompleter, 'ComputeSemanticTokens',
+                           FileDataContents ):
+          with patch.object(
+              BufferStore,
+              'ResolveFileData',
+              autospec = True,
+              side_effect = BufferStore.ResolveFileData ) as resolve_file_data:
+            response = app.post_json( '/batch', BuildBatch(
+              ( 'detailed_diagnostic', request ),
+              ( 'semantic_tokens', request ),
+              filetype = 'dummy_filetype',
+              contents = 'contents' ) ).json
+    assert_that( resolve_file_data.call_count, equal_to( 1 ) )
+    assert_that( response, contains_exactly(
+      has_entries( { 'status': 200 } ),
+      has_entries( {
+        'status': 200,
+        'response': has_entry( 'semantic_tokens',
+                               contains_exactly( 'contents' ) )
+      } )
+    ) )
+
+
+  @SharedYcmd
+  def test_Batch_StatusOfRequest( self, app ):
+    def Accepted( request, response ):
+      response.status = 202
+      return 'true'
+
+    with patch.object( handlers.app, 'GetCallback', return_value = Accepted ):
+      response = app.post_json( '/batch', BuildBatch(
+        ( 'accepted', {} ) ) ).json
+    assert_that( response, contains_exactly(
+      has_entries( { 'status': 202, 'response': True } ) ) )
+
+
+  @SharedYcmd
+  def test_Batch_UnknownContentsHash( self, app ):
+    response = app.post_json( '/batch', {
+      'file_data': { '/foo': { 'filetypes': [ 'foo' ],
+                               'contents_hash': 'unknown' } },
+      'requests': []
+    }, expect_errors = True )
+    assert_that( response.status_code, equal_to( 412 ) )
+    assert_that( response.json[ 'exception' ],
+                 has_entry( 'TYPE', UnknownContentsHash.__name__ ) )
+
+
+  @SharedYcmd
+  def test_Batch_RequestsRunInOrder( self, app ):
+    calls = []
+
+    def Record( name ):
+      def Compute( *args ):
+        calls.append( name + ' started' )
+        time.sleep( 0.01 )
+        calls.append( name + ' done' )
+        return []
+      return Compute
+
+    request = { 'filepath': '/foo',
+                'line_num': 1,
+                'column_num': 1,
+                'range': { 'start': { 'line_num': 1, 'column_num': 1 },
+                           'end': { 'line_num': 1, 'column_num': 1 } } }
+    with PatchCompleter( DummyCompleter, filetype = 'dummy_filetype' ):
+      with patch.object( DummyCompleter,
+                         'ComputeSemanticTokens',
+                         Record( 'semantic_tokens' ) ):
+        with patch.object( DummyCompleter,
+                           'ComputeInlayHints',
+                           Record( 'inlay_hints' ) ):
+          with patch.object( DummyCompleter,
+                             'DefinedSubcommands',
+                             Record( 'defined_subcommands' ) ):
+            with patch.object( DummyCompleter,
+                               'DebugInfo',
+                               Record( 'debug_info' ) ):
+              response = app.post_json( '/batch', BuildBatch(
+                ( 'semantic_tokens', request ),
+                ( 'defined_subcommands', request ),
+                ( 'debug_info', request ),
+                ( 'inlay_hints', request ),
+                filetype = 'dummy_filetype' ) ).json
+    assert_that( response, contains_exactly(
+      has_entries( { 'status': 200 } ),
+      has_entries( { 'status': 200 } ),
+      has_entries( { 'status': 200 } ),
+      has_entries( { 'status': 200 } )
+    ) )
+    assert_that( calls, contains_exactly( 'semantic_tokens started',
+                                          'semantic_tokens done',
+                                          'defined_subcommands started',
+                                          'defined_subcommands done',
+                                          'debug_info started',
+                                          'debug_info done',
+                                          'inlay_hints started',
+                                          'inlay_hints done' ) )
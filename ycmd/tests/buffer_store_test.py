@@ -0,0 +1,133 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, calling, contains_exactly, equal_to,
+                       has_entries, has_entry, has_properties, raises )
+from unittest import TestCase
+
+from ycmd.buffer_store import BufferStore
+from ycmd.responses import UnknownContentsHash
+from ycmd.tests import IsolatedYcmd
+from ycmd.tests.test_utils import ( BuildRequest, CompletionEntryMatcher,
+                                    ErrorMatcher )
+
+
+def FileData( contents_hash, contents = None ):
+  data = { 'filetypes': [ 'foo' ], 'contents_hash': contents_hash }
+  if contents is not None:
+    data[ 'contents' ] = contents
+  return data
+
+
+def BuildHashRequest( contents_hash, contents = None, **kwargs ):
+  request = BuildRequest( **kwargs )
+  request[ 'file_data' ][ '/foo' ] = FileData( contents_hash, contents )
+  return request
+
+
+class BufferStoreTest( TestCase ):
+  def test_ResolveFileData( self ):
+    store = BufferStore()
+    file_data = {
+      '/foo': FileData( '1', 'foo' ),
+      '/bar': FileData( '2', 'bar' ),
+      '/zoo': { 'filetypes': [ 'foo' ], 'contents': 'zoo' }
+    }
+    store.ResolveFileData( file_data )
+
+    file_data = {
+      '/foo': FileData( '1' ),
+      '/bar': FileData( '3', 'qux' ),
+      '/zoo': { 'filetypes': [ 'foo' ], 'contents': 'zoo' }
+    }
+    store.ResolveFileData( file_data )
+    assert_that( file_data, has_entries( {
+      '/foo': has_entry( 'contents', 'foo' ),
+      '/bar': has_entry( 'contents', 'qux' ),
+      '/zoo': has_entry( 'contents', 'zoo' )
+    } ) )
+
+    # Only the last contents of a buffer are stored.
+    assert_that(
+      calling( store.ResolveFileData ).with_args( { '/bar': FileData( '2' ),
+                                                    '/foo': FileData( '1' ),
+                                                    '/zoo': FileData( '4' ) } ),
+      raises( UnknownContentsHash ) )
+
+
+  def test_ResolveFileData_UnknownHashes( self ):
+    store = BufferStore()
+    store.ResolveFileData( { '/foo': FileData( '1', 'foo' ) } )
+    try:
+      store.ResolveFileData( { '/foo': FileData( '1' ),
+                               '/bar': FileData( '1' ),
+                               '/zoo': FileData( '2' ) } )
+    except UnknownContentsHash as error:
+      assert_that( error, has_properties( {
+        'filepaths': contains_exactly( '/bar', '/zoo' ) } ) )
+    else:
+      raise AssertionError( 'UnknownContentsHash not raised' )
+
+
+  def test_RemoveBuffer( self ):
+    store = BufferStore()
+    store.ResolveFileData( { '/foo': FileData( '1', 'foo' ) } )
+    store.RemoveBuffer( '/foo' )
+    store.RemoveBuffer( '/bar' )
+    assert_that(
+      calling( store.ResolveFileData ).with_args( { '/foo': FileData( '1' ) } ),
+      raises( UnknownContentsHash ) )
+
+
+  @IsolatedYcmd()
+  def test_BufferStore_ContentsSentByHash( self, app ):
+    app.post_json( '/event_notification',
+                   BuildHashRequest( '1',
+                                     'foo foogoo',
+                                     event_name = 'FileReadyToParse' ) )
+
+    response = app.post_json( '/completions',
+                              BuildHashRequest( '1', column_num = 3 ) ).json
+    assert_that( response[ 'completions' ],
+                 contains_exactly( CompletionEntryMatcher( 'foo' ),
+                                   CompletionEntryMatcher( 'foogoo' ) ) )
+
+    response = app.post_json( '/completions',
+                              BuildHashRequest( '2', column_num = 3 ),
+                              expect_errors = True )
+    assert_that( response.status_code, equal_to( 412 ) )
+    assert_that( response.json, ErrorMatcher(
+      UnknownContentsHash,
+      'Unknown contents hash for /foo. Send the contents of these buffers '
+      'again.' ) )
+    assert_that( response.json[ 'exception' ],
+                 has_entry( 'filepaths', contains_exactly( '/foo' ) ) )
+
+
+  @IsolatedYcmd()
+  def test_BufferStore_BufferUnloadRemovesContents( self, app ):
+    app.post_json( '/event_notification',
+                   BuildHashRequest( '1',
+                                     'foo foogoo',
+                                     event_name = 'FileReadyToParse' ) )
+    app.post_json( '/event_notification',
+                   BuildHashRequest( '1', event_name = 'BufferUnload' ) )
+
+    response = app.post_json( '/completions',
+                              BuildHashRequest( '1', column_num = 3 ),
+                              expect_errors = True )
+    assert_that( response.status_code, equal_to( 412 ) )
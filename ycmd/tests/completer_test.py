@@ -15,11 +15,14 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
-from ycmd.tests.test_utils import DummyCompleter
+from ycmd.completers import completer_utils
+from ycmd.completers.completer import CompletionsCache
+from ycmd.request_wrap import RequestWrap
+from ycmd.tests.test_utils import BuildRequest, DummyCompleter
 from ycmd.user_options_store import DefaultOptions
 from unittest import TestCase
 from unittest.mock import patch
-from hamcrest import assert_that, contains_exactly, equal_to
+from hamcrest import assert_that, contains_exactly, equal_to, has_entries
 
 
 def _FilterAndSortCandidates_Match( candidates, query, expected_matches ):
@@ -28,6 +31,13 @@ def _FilterAndSortCandidates_Match( candidates, query, expected_matches ):
   assert_that( expected_matches, equal_to( matches ) )
 
 
+def _CompletionRequest( line_num, contents = 'foo\nbar\nbaz', **kwargs ):
+  return RequestWrap( BuildRequest( line_num = line_num,
+                                    column_num = 2,
+                                    contents = contents,
+                                    **kwargs ) )
+
+
 class CompleterTest( TestCase ):
   def test_FilterAndSortCandidates_OmniCompleter_List( self ):
     _FilterAndSortCandidates_Match( [ 'password' ],
@@ -71,8 +81,150 @@ class CompleterTest( TestCase ):
                                     [ { 'insertion_text': 'ø' } ] )
 
 
+  def test_FilterAndSortCandidates_SameCompletionSite( self ):
+    completer = DummyCompleter( DefaultOptions() )
+    candidates = [ 'foo', 'fab', 'bar', 'fobar', 'foobar' ]
+
+    with patch( 'ycmd.completers.completer_utils.CandidateSetWrap',
+                wraps = completer_utils.CandidateSetWrap ) as candidate_set:
+      request_data = _CompletionRequest( 1 )
+      for query, expected_matches in [
+          ( 'f', [ 'fab', 'foo', 'fobar', 'foobar' ] ),
+          ( 'fo', [ 'foo', 'fobar', 'foobar' ] ),
+          ( 'fob', [ 'fobar', 'foobar' ] ),
+          ( 'fa', [ 'fab', 'fobar', 'foobar' ] ),
+          ( 'fab', [ 'fab' ] ) ]:
+        assert_that( completer.FilterAndSortCandidates( candidates,
+                                                        query,
+                                                        request_data ),
+                     equal_to( expected_matches ) )
+
+      # The candidates are only converted once.
+      assert_that( candidate_set.call_count, equal_to( 1 ) )
+
+      # The candidates of another site are converted again.
+      assert_that( completer.FilterAndSortCandidates( candidates,
+                                                      'f',
+                                                      _CompletionRequest( 2 ) ),
+                   equal_to( [ 'fab', 'foo', 'fobar', 'foobar' ] ) )
+      assert_that( candidate_set.call_count, equal_to( 2 ) )
+
+      # So are new candidates computed for the same site.
+      assert_that( completer.FilterAndSortCandidates( list( candidates ),
+                                                      'f',
+                                                      _CompletionRequest( 2 ) ),
+                   equal_to( [ 'fab', 'foo', 'fobar', 'foobar' ] ) )
+      assert_that( candidate_set.call_count, equal_to( 3 ) )
+
+      # Candidates without a completion site are not kept.
+      assert_that( completer.FilterAndSortCandidates( candidates, 'f' ),
+                   equal_to( [ 'fab', 'foo', 'fobar', 'foobar' ] ) )
+      assert_that( candidate_set.call_count, equal_to( 3 ) )
+
+
+  def test_ComputeCandidates_CachedCompletionsConvertedOnce( self ):
+    completer = DummyCompleter( DefaultOptions() )
+    with patch.object( completer,
+                       'CandidatesList',
+                       return_value = [ 'foo', 'fab', 'bar' ] ), \
+         patch( 'ycmd.completers.completer_utils.CandidateSetWrap',
+                wraps = completer_utils.CandidateSetWrap ) as candidate_set:
+      for column_num, expected_matches in [
+          ( 2, [ 'fab', 'foo' ] ),
+          ( 3, [ 'foo' ] ),
+          ( 4, [ 'foo' ] ) ]:
+        request_data = RequestWrap( BuildRequest( line_num = 1,
+                                                  column_num = column_num,
+                                                  contents = 'foo',
+                                                  force_semantic = True ) )
+        assert_that(
+          completer.ComputeCandidates( request_data ),
+          contains_exactly( *[ has_entries( { 'insertion_text': match } )
+                               for match in expected_matches ] ) )
+
+      assert_that( candidate_set.call_count, equal_to( 1 ) )
+
+
   @patch( 'ycmd.tests.test_utils.DummyCompleter.GetSubcommandsMap',
           return_value = { 'Foo': '', 'StopServer': '' } )
   def test_DefinedSubcommands_RemoveStopServerSubcommand( self, *args ):
     completer = DummyCompleter( DefaultOptions() )
     assert_that( completer.DefinedSubcommands(), contains_exactly( 'Foo' ) )
+
+
+  def test_CompletionsCache_MultipleSites( self ):
+    cache = CompletionsCache( 2 )
+    cache.Update( _CompletionRequest( 1 ), [ 'foo' ] )
+    cache.Update( _CompletionRequest( 2 ), [ 'bar' ] )
+
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 1 ) ),
+                 equal_to( [ 'foo' ] ) )
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 2 ) ),
+                 equal_to( [ 'bar' ] ) )
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 3 ) ),
+                 equal_to( None ) )
+
+    # The current line is not part of the completion site.
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _CompletionRequest( 2, 'foo\nbax\nbaz' ) ),
+                 equal_to( [ 'bar' ] ) )
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _CompletionRequest( 2, 'foo\nbar\nbax' ) ),
+                 equal_to( None ) )
+
+    # The least recently used entry is evicted.
+    cache.Update( _CompletionRequest( 3 ), [ 'baz' ] )
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 1 ) ),
+                 equal_to( None ) )
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 2 ) ),
+                 equal_to( [ 'bar' ] ) )
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 3 ) ),
+                 equal_to( [ 'baz' ] ) )
+
+    assert_that( cache.DebugInfo(), has_entries( {
+      'size': 2,
+      'max_size': 2,
+      'hits': 5,
+      'misses': 3,
+      'evictions': 1
+    } ) )
+
+    cache.InvalidateRequest( _CompletionRequest( 2 ) )
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 2 ) ),
+                 equal_to( None ) )
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 3 ) ),
+                 equal_to( [ 'baz' ] ) )
+
+    cache.Invalidate()
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 3 ) ),
+                 equal_to( None ) )
+    assert_that( cache.DebugInfo(), has_entries( { 'size': 0 } ) )
+
+
+  def test_CompletionsCache_UpdateSameSite( self ):
+    cache = CompletionsCache( 2 )
+    cache.Update( _CompletionRequest( 1 ), [ 'foo' ] )
+    cache.Update( _CompletionRequest( 1, 'fox\nbar\nbaz' ), [ 'fox' ] )
+
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 1 ) ),
+                 equal_to( [ 'fox' ] ) )
+    assert_that( cache.DebugInfo(), has_entries( {
+      'size': 1,
+      'evictions': 0
+    } ) )
+
+
+  def test_CompletionsCache_OtherFiles( self ):
+    def Request( contents ):
+      return _CompletionRequest( 1, file_data = {
+        '/bar': { 'filetypes': [ 'foo' ], 'contents': contents }
+      } )
+
+    cache = CompletionsCache( 2 )
+    cache.Update( Request( 'bar' ), [ 'bar' ] )
+    assert_that( cache.GetCompletionsIfCacheValid( Request( 'bar' ) ),
+                 equal_to( [ 'bar' ] ) )
+    assert_that( cache.GetCompletionsIfCacheValid( Request( 'baz' ) ),
+                 equal_to( None ) )
+    assert_that( cache.GetCompletionsIfCacheValid( _CompletionRequest( 1 ) ),
+                 equal_to( None ) )
@@ -0,0 +1,51 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import assert_that, equal_to
+from io import BytesIO
+from unittest import TestCase
+
+from ycmd.hmac_plugin import HostHeaderCorrect
+from ycmd.web_plumbing import Request
+from ycmd.wsgi_server import UNIX_SOCKET_ENVIRON_KEY
+
+
+def BuildRequest( host, **environ ):
+  return Request( dict( environ,
+                        HTTP_HOST = host,
+                        REQUEST_METHOD = 'GET',
+                        PATH_INFO = '/',
+                        **{ 'wsgi.input': BytesIO() } ) )
+
+
+class HmacPluginTest( TestCase ):
+  def test_HostHeaderCorrect( self ):
+    for host, correct in [ ( '127.0.0.1', True ),
+                           ( '127.0.0.1:1234', True ),
+                           ( 'localhost:1234', True ),
+                           ( 'example.com', False ),
+                           ( 'example.com:1234', False ) ]:
+      with self.subTest( host = host ):
+        assert_that( HostHeaderCorrect( BuildRequest( host ) ),
+                     equal_to( correct ) )
+
+
+  def test_HostHeaderCorrect_UnixSocket( self ):
+    assert_that( HostHeaderCorrect(
+                   BuildRequest( '%2Ftmp%2Fycmd.sock',
+                                 **{ UNIX_SOCKET_ENVIRON_KEY: True } ) ),
+                 equal_to( True ) )
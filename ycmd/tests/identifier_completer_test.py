@@ -15,15 +15,22 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
+import contextlib
+import functools
 import os
-from hamcrest import assert_that, empty, equal_to, contains_exactly
+import time
+from hamcrest import ( assert_that, contains_exactly, contains_inanyorder,
+                       empty, equal_to )
 from unittest import TestCase
+from unittest.mock import patch
+from ycmd import identifier_utils
 from ycmd.user_options_store import DefaultOptions
 from ycmd.completers.all import identifier_completer as ic
 from ycmd.completers.all.identifier_completer import IdentifierCompleter
 from ycmd.request_wrap import RequestWrap
 from ycmd.tests import PathToTestFile
-from ycmd.tests.test_utils import BuildRequest
+from ycmd.tests.test_utils import BuildRequest, TemporaryTestDir
+from ycmd.utils import SplitLines, StartThread
 
 
 def BuildRequestWrap( contents, column_num, line_num = 1 ):
@@ -32,6 +39,54 @@ def BuildRequestWrap( contents, column_num, line_num = 1 ):
                                     contents = contents ) )
 
 
+@contextlib.contextmanager
+def OverlappingCallsRecorded( *method_names ):
+  """Slows down the |method_names| of _BufferIdentifiers so that concurrent
+  calls would overlap without locking. Yields the list of the names of the
+  calls that started while another one was running."""
+  running_calls = []
+  overlapping_calls = []
+
+  def SlowMethod( method_name ):
+    method = getattr( ic._BufferIdentifiers, method_name )
+
+    def Wrapper( *args ):
+      running_calls.append( method_name )
+      if len( running_calls ) > 1:
+        overlapping_calls.append( method_name )
+      time.sleep( 0.001 )
+      try:
+        return method( *args )
+      finally:
+        running_calls.remove( method_name )
+
+    return Wrapper
+
+  with contextlib.ExitStack() as stack:
+    for method_name in method_names:
+      stack.enter_context( patch.object( ic._BufferIdentifiers,
+                                         method_name,
+                                         SlowMethod( method_name ) ) )
+    yield overlapping_calls
+
+
+def RunInThreads( *functions ):
+  """Runs each of |functions| in its own thread and returns the exceptions they
+  raised once they are all done."""
+  exceptions = []
+
+  def Run( function ):
+    try:
+      function()
+    except Exception as error:
+      exceptions.append( error )
+
+  threads = [ StartThread( Run, function ) for function in functions ]
+  for thread in threads:
+    thread.join()
+  return exceptions
+
+
 class IdentifierCompleterTest( TestCase ):
   def test_GetCursorIdentifier_StartOfLine( self ):
     assert_that( 'foo', equal_to(
@@ -305,3 +360,260 @@ class IdentifierCompleterTest( TestCase ):
     assert_that(
         list( ident_completer._FilterUnchangedTagFiles( [ tag_file ] ) ),
         empty() )
+
+
+  def test_BufferIdentifiers_Update( self ):
+    for filetype, contents in [
+      ( 'cpp', [
+        'int foo = 1; /* bar */\nint baz;',
+        'int foo = 1; /* bar\nint qux;\n*/ int baz;',
+        'int foo = 1; /* bar\nint qux;\nint baz;',
+        'int foo = 1; /* bar\nint qux;\nint baz; */ "zoo"',
+        'int foo = 1;\nint qux;\nint baz; */ "zoo"',
+        'int foo = 1;\nint qux;\nint baz; */ "zoo\n"',
+        '' ] ),
+      ( 'python', [
+        'foo = """bar\nbaz"""\nqux',
+        'foo = ""\nbaz"""\nqux',
+        'foo = \\"""bar\nbaz\nqux',
+        'foo = \\"""bar\nbaz\nqux"""' ] ) ]:
+      for collect_from_comments_and_strings in [ False, True ]:
+        buffer_identifiers = ic._BufferIdentifiers(
+          filetype, collect_from_comments_and_strings )
+        identifiers = []
+        for text in contents:
+          added, removed = buffer_identifiers.Update( text )
+          for identifier in removed:
+            identifiers.remove( identifier )
+          identifiers.extend( added )
+
+          if not collect_from_comments_and_strings:
+            text = identifier_utils.RemoveIdentifierFreeText( text, filetype )
+          expected = identifier_utils.ExtractIdentifiersFromText( text,
+                                                                  filetype )
+          assert_that( buffer_identifiers.Identifiers(),
+                       contains_inanyorder( *expected ) )
+          assert_that( identifiers, contains_inanyorder( *expected ) )
+
+
+  def test_BufferIdentifiers_FirstUpdate( self ):
+    # The first update scans the buffer in ycm_core. It must leave the same
+    # state as the scans of the later updates.
+    for filetype, text in [
+      ( 'cpp', 'a /* b\nc\nd */ e // f /*\ng "/*"\nh /* i\n""" j\n' ),
+      ( 'cpp', "'\\'' /* a */ \\\"/*\nb */\n'''c\n" ),
+      ( 'python', "'''a\nb''' '''c\nd\n" ),
+      ( 'python', '# """\n"""a\n\nb\n"""\n\\"""\n\n' ),
+      ( 'go', '`a\nb` /*\n*/ c' ) ]:
+      with self.subTest( filetype = filetype, text = text ):
+        buffer_identifiers = ic._BufferIdentifiers( filetype, False )
+        buffer_identifiers.Update( text )
+        lines = SplitLines( text )
+        _, stripped_lines, line_in_comment_or_string, unclosed_lines = (
+          ic._BufferIdentifiers( filetype, False )._ScanLines(
+            text, lines, 0, len( lines ), 0 ) )
+        assert_that( buffer_identifiers._stripped_lines,
+                     equal_to( stripped_lines ) )
+        assert_that( buffer_identifiers._line_in_comment_or_string,
+                     equal_to( line_in_comment_or_string ) )
+        assert_that( buffer_identifiers._unclosed_lines,
+                     equal_to( unclosed_lines ) )
+
+
+  def test_BufferIdentifiers_StrippedLines( self ):
+    for filetype, parsed_text, text in [
+      # The text before the lines didn't change.
+      ( 'cpp', 'a; /* b\nc */ d;\ne;', 'a; /* b\nc */ d;\ne "f";' ),
+      # A comment is opened before the lines.
+      ( 'cpp', 'a;\nb;\nc;\nd;', 'a; /*\nb;\nc;\nd;' ),
+      # A comment is opened in the lines and closed after them.
+      ( 'cpp', 'a;\nb;\nc;\nd;', 'a;\nb; /*\nc;\nd; */' ),
+      # A multiline string is closed after the lines.
+      ( 'python', 'a\nb\nc\nd', "a\nb\nc '''\nd'''" ),
+      ( 'python', 'a\nb\nc\nd', "a\n'''b\nc\nd'''" ) ]:
+      buffer_identifiers = ic._BufferIdentifiers( filetype, False )
+      buffer_identifiers.Update( parsed_text )
+      expected = SplitLines(
+        identifier_utils.RemoveIdentifierFreeText( text, filetype ) )
+      for first_line in range( len( expected ) ):
+        for last_line in range( first_line, len( expected ) ):
+          assert_that( buffer_identifiers.StrippedLines( text,
+                                                         first_line,
+                                                         last_line ),
+                       equal_to( expected[ first_line : last_line + 1 ] ) )
+
+
+  def test_AddBufferIdentifiers_OnlyChangedLines( self ):
+    ident_completer = IdentifierCompleter( DefaultOptions() )
+
+    def Parse( contents ):
+      ident_completer.OnFileReadyToParse(
+        RequestWrap( BuildRequest( contents = contents, filetype = 'c' ) ) )
+
+    def Candidates():
+      return ident_completer._completer.CandidatesForQueryAndType( 'fo', 'c' )
+
+    Parse( 'foo\nfoobar\n// fooqux' )
+    assert_that( Candidates(), contains_exactly( 'foo', 'foobar' ) )
+
+    # Identifiers added while typing are removed on the next update.
+    ident_completer.OnCurrentIdentifierFinished(
+      RequestWrap( BuildRequest( contents = 'foo\nfoobar\nfoozoo ',
+                                 filetype = 'c',
+                                 line_num = 3,
+                                 column_num = 8 ) ) )
+    assert_that( Candidates(), contains_exactly( 'foo', 'foobar', 'foozoo' ) )
+
+    Parse( 'foo\nfoobar\nfooqux' )
+    assert_that( Candidates(), contains_exactly( 'foo', 'foobar', 'fooqux' ) )
+
+    Parse( 'foo\n/* foobar\nfooqux */' )
+    assert_that( Candidates(), contains_exactly( 'foo' ) )
+
+
+  def test_AddBufferIdentifiers_ConcurrentEvents( self ):
+    ident_completer = IdentifierCompleter( DefaultOptions() )
+    lines = [ f'foo{ line }' for line in range( 100 ) ]
+    contents = [ '\n'.join( lines ),
+                 '\n'.join( lines[ : 50 ] + [ 'foobar' ] + lines[ 50 : ] ),
+                 '\n'.join( lines[ 1 : ] + [ 'fooqux' ] ) ]
+
+    def Request( text, **kwargs ):
+      return RequestWrap( BuildRequest( contents = text,
+                                        filetype = 'c',
+                                        **kwargs ) )
+
+    def SendEvents( thread_index ):
+      for iteration in range( 10 ):
+        text = contents[ ( thread_index + iteration ) % len( contents ) ]
+        ident_completer.OnFileReadyToParse( Request( text ) )
+        finished_text = text + '\nfoozoo '
+        ident_completer.OnCurrentIdentifierFinished(
+          Request( finished_text,
+                   line_num = len( SplitLines( finished_text ) ),
+                   column_num = 8 ) )
+        if iteration % 5 == 2:
+          ident_completer.OnBufferUnload( Request( text ) )
+
+    with OverlappingCallsRecorded( 'Update' ) as overlapping_calls:
+      exceptions = RunInThreads( *[ functools.partial( SendEvents,
+                                                       thread_index )
+                                    for thread_index in range( 4 ) ] )
+    assert_that( exceptions, empty() )
+    assert_that( overlapping_calls, empty() )
+    assert_that(
+      ident_completer._completer.CandidatesForQueryAndType( 'fooz', 'c' ),
+      contains_exactly( 'foozoo' ) )
+
+    # The database is still in sync with the buffer.
+    ident_completer.OnFileReadyToParse( Request( 'foo\nfoobar' ) )
+    ident_completer.OnFileReadyToParse( Request( 'foo\nfooqux' ) )
+    assert_that(
+      ident_completer._completer.CandidatesForQueryAndType( 'fo', 'c' ),
+      contains_exactly( 'foo', 'fooqux' ) )
+
+
+  def test_AddIdentifiers_InterleavedWithUpdates( self ):
+    ident_completer = IdentifierCompleter( DefaultOptions() )
+    lines = [ f'foo{ line } /* comment */' for line in range( 100 ) ]
+    contents = [ '\n'.join( lines + [ 'foozoo' ] ),
+                 '\n'.join( [ '/* foobar */' ] + lines + [ 'foozoo' ] ) ]
+
+    def Request( text, **kwargs ):
+      return RequestWrap( BuildRequest( contents = text,
+                                        filetype = 'c',
+                                        **kwargs ) )
+
+    def Parse():
+      for iteration in range( 20 ):
+        ident_completer.OnFileReadyToParse(
+          Request( contents[ iteration % 2 ] ) )
+
+    def AddIdentifiers():
+      for iteration in range( 20 ):
+        text = contents[ iteration % 2 ]
+        line_num = len( SplitLines( text ) )
+        ident_completer.OnInsertLeave(
+          Request( text, line_num = line_num, column_num = 1 ) )
+        ident_completer.OnCurrentIdentifierFinished(
+          Request( text + ' ', line_num = line_num, column_num = 8 ) )
+
+    with OverlappingCallsRecorded( 'Update',
+                                   'StrippedLines' ) as overlapping_calls:
+      exceptions = RunInThreads( Parse, AddIdentifiers )
+    assert_that( exceptions, empty() )
+    assert_that( overlapping_calls, empty() )
+
+    ident_completer.OnFileReadyToParse( Request( 'foo\n/* foobar */' ) )
+    assert_that(
+      ident_completer._completer.CandidatesForQueryAndType( 'fo', 'c' ),
+      contains_exactly( 'foo' ) )
+
+
+  def test_AddBufferIdentifiers_AfterTagsReload( self ):
+    with TemporaryTestDir() as tmp_dir:
+      ident_completer = IdentifierCompleter( DefaultOptions() )
+      filepath = os.path.join( tmp_dir, 'foo.c' )
+      tags_file = os.path.join( tmp_dir, 'tags' )
+      with open( tags_file, 'w' ) as f:
+        f.write( 'footag\tfoo.c\t/^footag$/;"\tlanguage:C\n' )
+
+      def Parse( contents, **kwargs ):
+        ident_completer.OnFileReadyToParse(
+          RequestWrap( BuildRequest( filepath = filepath,
+                                     contents = contents,
+                                     filetype = 'c',
+                                     **kwargs ) ) )
+
+      def Candidates():
+        return ident_completer._completer.CandidatesForQueryAndType( 'fo',
+                                                                     'c' )
+
+      Parse( 'foo\nfoobar' )
+      # The tags replace the identifiers of the buffer.
+      Parse( 'foo\nfoobar', tag_files = [ tags_file ] )
+      assert_that( Candidates(), contains_exactly( 'footag' ) )
+
+      Parse( 'foo\nfoobar\nfooqux' )
+      assert_that( Candidates(),
+                   contains_exactly( 'foo', 'foobar', 'fooqux' ) )
+
+
+  def test_Index_SavedOnShutdownAndLoaded( self ):
+    with TemporaryTestDir() as tmp_dir:
+      options = DefaultOptions()
+      options[ 'identifier_index_directory' ] = os.path.join( tmp_dir, 'index' )
+      unmodified_file = os.path.join( tmp_dir, 'unmodified.c' )
+      modified_file = os.path.join( tmp_dir, 'modified.c' )
+
+      def Parse( ident_completer, filepath, contents ):
+        with open( filepath, 'w' ) as f:
+          f.write( contents )
+        ident_completer.OnFileReadyToParse(
+          RequestWrap( BuildRequest( filepath = filepath,
+                                     contents = contents,
+                                     filetype = 'c' ) ) )
+
+      def Candidates( ident_completer ):
+        return ident_completer._completer.CandidatesForQueryAndType( 'fo',
+                                                                     'c' )
+
+      ident_completer = IdentifierCompleter( options )
+      ident_completer._index_load_thread.join()
+      Parse( ident_completer, unmodified_file, 'foo' )
+      Parse( ident_completer, modified_file, 'foobar' )
+      ident_completer.Shutdown()
+
+      os.utime( modified_file, ( 0, 0 ) )
+      ident_completer = IdentifierCompleter( options )
+      ident_completer._index_load_thread.join()
+      assert_that( Candidates( ident_completer ), contains_exactly( 'foo' ) )
+
+
+  def test_Index_Disabled( self ):
+    ident_completer = IdentifierCompleter( DefaultOptions() )
+    assert_that( ident_completer._index_load_thread, equal_to( None ) )
+    ident_completer.OnFileReadyToParse(
+      RequestWrap( BuildRequest( contents = 'foo', filetype = 'c' ) ) )
+    assert_that( ident_completer._index_save_scheduled, equal_to( False ) )
+    ident_completer.Shutdown()
@@ -44,10 +44,12 @@ from ycmd.tests.test_utils import ( BuildRequest,
                                     ChunkMatcher,
                                     DummyCompleter,
                                     LocationMatcher,
-                                    RangeMatcher )
+                                    RangeMatcher,
+                                    TemporaryTestDir )
 from ycmd.tests.language_server import IsolatedYcmd, PathToTestFile
 from ycmd import handlers, utils, responses
 import os
+import time
 
 
 class MockCompleter( lsc.LanguageServerCompleter, DummyCompleter ):
@@ -904,6 +906,45 @@ class LanguageServerCompleterTest( TestCase ):
         assert_that( response.call_count, equal_to( 0 ) )
 
 
+  @IsolatedYcmd()
+  def test_LanguageServerCompleter_GetCompletions_MultipleSites( self, app ):
+    completer = MockCompleter()
+    completer._resolve_completion_items = False
+    complete_response = {
+      'result': {
+        'items': [ { 'label': 'aa' }, { 'label': 'ab' } ],
+        'isIncomplete': False
+      }
+    }
+
+    def Request( line_num ):
+      return RequestWrap( BuildRequest( line_num = line_num,
+                                        column_num = 2,
+                                        contents = 'a\na',
+                                        force_semantic = True ) )
+
+    with patch.object( completer, '_is_completion_provider', True ):
+      with patch.object( completer.GetConnection(),
+                         'GetResponse',
+                         return_value = complete_response ) as response:
+        for line_num in [ 1, 2, 1, 2 ]:
+          assert_that(
+            completer.ComputeCandidates( Request( line_num ) ),
+            contains_exactly(
+              has_entry( 'insertion_text', 'aa' ),
+              has_entry( 'insertion_text', 'ab' )
+            )
+          )
+
+        # Completions for both sites are cached.
+        assert_that( response.call_count, equal_to( 2 ) )
+        assert_that( completer.CompletionsCacheDebugInfo(), has_entries( {
+          'size': 2,
+          'hits': 2,
+          'misses': 2
+        } ) )
+
+
   @IsolatedYcmd()
   def test_LanguageServerCompleter_GetCompletions_CompleteOnCurrentColumn(
       self, app ):
@@ -1556,6 +1597,97 @@ class LanguageServerCompleterTest( TestCase ):
         uri_to_filepath.assert_called()
 
 
+  @IsolatedYcmd()
+  def test_LanguageServerCompleter_UpdateServerWithFileContents_SyncKind(
+      self, app ):
+    for sync, content_changes in [
+      ( 1, [ { 'text': 'a\nx\nc' } ] ),
+      ( 2, [ { 'range': { 'start': { 'line': 1, 'character': 0 },
+                          'end': { 'line': 2, 'character': 0 } },
+               'text': 'x\n' } ] ),
+      ( { 'change': 2 }, [ { 'range': { 'start': { 'line': 1, 'character': 0 },
+                                        'end': { 'line': 2, 'character': 0 } },
+                             'text': 'x\n' } ] ),
+    ]:
+      with self.subTest( sync = sync ):
+        completer = MockCompleter()
+        completer._HandleInitializeInPollThread( {
+          'result': { 'capabilities': { 'textDocumentSync': sync } }
+        } )
+
+        for contents in [ 'a\nb\nc', 'a\nx\nc' ]:
+          request_data = RequestWrap( BuildRequest( filepath = '/foo',
+                                                    filetype = 'foo',
+                                                    contents = contents ) )
+          with patch.object( completer,
+                             'SupportedFiletypes',
+                             return_value = [ 'foo' ] ):
+            with patch.object( completer.GetConnection(),
+                               'SendNotification' ) as send_notification:
+              completer._UpdateServerWithFileContents( request_data )
+
+        message = send_notification.call_args[ 0 ][ 0 ]
+        assert_that( lsp.Parse( message.split( b'\r\n\r\n', 1 )[ 1 ] ),
+                     has_entries( {
+                       'method': 'textDocument/didChange',
+                       'params': has_entries( {
+                         'contentChanges': content_changes
+                       } )
+                     } ) )
+
+
+  @IsolatedYcmd()
+  def test_LanguageServerCompleter_UpdateServerWithFileContents_SavedFiles(
+      self, app ):
+    completer = MockCompleter()
+    completer._HandleInitializeInPollThread( {
+      'result': { 'capabilities': { 'textDocumentSync': 1 } }
+    } )
+
+    with TemporaryTestDir() as tmp_dir:
+      saved_file = os.path.join( tmp_dir, 'saved' )
+      with open( saved_file, 'w' ) as f:
+        f.write( 'saved contents' )
+      mtime = time.time() - 10
+      os.utime( saved_file, ( mtime, mtime ) )
+
+      def Update( file_data ):
+        request_data = RequestWrap( BuildRequest( filepath = '/foo',
+                                                  filetype = 'foo',
+                                                  contents = 'current',
+                                                  file_data = file_data ) )
+        with patch.object( completer,
+                           'SupportedFiletypes',
+                           return_value = [ 'foo' ] ):
+          with patch( 'ycmd.completers.language_server.'
+                      'language_server_completer.GetFileContents',
+                      wraps = lsc.GetFileContents ) as get_file_contents:
+            with patch.object( completer.GetConnection(),
+                               'SendNotification' ) as send_notification:
+              completer._UpdateServerWithFileContents( request_data )
+        return get_file_contents.call_count, send_notification.call_count
+
+      # The current and dirty files are opened
+      assert_that( Update( { saved_file: { 'filetypes': [ 'foo' ],
+                                           'contents': 'dirty' } } ),
+                   equal_to( ( 0, 2 ) ) )
+
+      # The buffer is no longer dirty, so the file is read and the server
+      # updated with the contents on disk
+      assert_that( Update( {} ), equal_to( ( 1, 1 ) ) )
+
+      # The file didn't change on disk, so it isn't read again
+      assert_that( Update( {} ), equal_to( ( 0, 0 ) ) )
+      assert_that( Update( {} ), equal_to( ( 0, 0 ) ) )
+
+      # The file changed on disk
+      with open( saved_file, 'w' ) as f:
+        f.write( 'new saved contents' )
+      os.utime( saved_file, ( mtime, mtime ) )
+      assert_that( Update( {} ), equal_to( ( 1, 1 ) ) )
+      assert_that( Update( {} ), equal_to( ( 0, 0 ) ) )
+
+
   def test_LanguageServerCompleter_DistanceOfPointToRange_SingleLineRange(
       self ):
     # Point to the left of range.
@@ -15,7 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
-from unittest.mock import patch, MagicMock
+from unittest.mock import call, patch, MagicMock
 from ycmd.completers.language_server import language_server_completer as lsc
 from hamcrest import assert_that, calling, equal_to, raises
 from unittest import TestCase
@@ -40,6 +40,45 @@ class LanguageServerConnectionTest( TestCase ):
         dispatch_message.assert_called_with( { 'abc': '' } )
 
 
+  def test_LanguageServerConnection_ReadMultipleMessages( self ):
+    connection = MockConnection()
+
+    return_values = [
+      bytes( b'Content-Length: 10\r\n\r\n{"abc":""}'
+             b'Content-Length: 10\r\nContent-Type: application/json\r\n'
+             b'\r\n{"def":""}Content-' ),
+      bytes( b'Length: 10\r\n\r' ),
+      bytes( b'\n{"ghi":""}' ),
+      lsc.LanguageServerConnectionStopped
+    ]
+
+    with patch.object( connection, 'ReadData', side_effect = return_values ):
+      with patch.object( connection, '_DispatchMessage' ) as dispatch_message:
+        connection.run()
+        assert_that( dispatch_message.call_args_list, equal_to( [
+          call( { 'abc': '' } ),
+          call( { 'def': '' } ),
+          call( { 'ghi': '' } ),
+        ] ) )
+
+
+  def test_LanguageServerConnection_ReadLargeMessage( self ):
+    connection = MockConnection()
+
+    payload = bytes( b'{"abc":"' + b'x' * 100000 + b'"}' )
+    return_values = [
+      bytes( b'Content-Length: 100010\r\n\r\n' ) + payload[ : 1000 ],
+      payload[ 1000 : 50000 ],
+      payload[ 50000 : ],
+      lsc.LanguageServerConnectionStopped
+    ]
+
+    with patch.object( connection, 'ReadData', side_effect = return_values ):
+      with patch.object( connection, '_DispatchMessage' ) as dispatch_message:
+        connection.run()
+        dispatch_message.assert_called_once_with( { 'abc': 'x' * 100000 } )
+
+
   def test_LanguageServerConnection_MissingHeader( self ):
     connection = MockConnection()
 
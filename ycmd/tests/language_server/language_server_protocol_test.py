@@ -18,7 +18,38 @@
 from ycmd.completers.language_server import language_server_protocol as lsp
 from hamcrest import assert_that, equal_to, calling, is_not, raises
 from unittest import TestCase
-from ycmd.tests.test_utils import UnixOnly, WindowsOnly
+from ycmd.tests.test_utils import TemporaryTestDir, UnixOnly, WindowsOnly
+
+import json
+import os
+import random
+import time
+
+
+def _PositionToOffset( contents, position ):
+  lines = contents.split( '\n' )
+  offset = sum( len( line ) + 1 for line in lines[ : position[ 'line' ] ] )
+  line = lines[ position[ 'line' ] ].encode( 'utf-16-le' )
+  return offset + len( line[ : position[ 'character' ] * 2 ].decode(
+    'utf-16-le' ) )
+
+
+def _ApplyContentChanges( contents, content_changes ):
+  """Reconstructs the document the way a server would on receipt of a
+  didChange notification."""
+  for change in content_changes:
+    if 'range' not in change:
+      contents = change[ 'text' ]
+      continue
+    start = _PositionToOffset( contents, change[ 'range' ][ 'start' ] )
+    end = _PositionToOffset( contents, change[ 'range' ][ 'end' ] )
+    contents = contents[ : start ] + change[ 'text' ] + contents[ end : ]
+  return contents
+
+
+def _ContentChanges( message ):
+  _, payload = message.split( b'\r\n\r\n', 1 )
+  return json.loads( payload )[ 'params' ][ 'contentChanges' ]
 
 
 class LanguageServerProtocolTest( TestCase ):
@@ -144,6 +175,145 @@ class LanguageServerProtocolTest( TestCase ):
     assert_that( file2_state.state, equal_to( lsp.ServerFileState.CLOSED ) )
 
 
+  def test_ServerFileState_SavedFileSignature( self ):
+    file_state = lsp.ServerFileState( 'file1' )
+
+    # Closed files are never unchanged
+    assert_that( file_state.IsSavedFileUnchanged( ( 1, 2, 3 ) ),
+                 equal_to( False ) )
+
+    file_state.GetDirtyFileAction( 'test contents' )
+    assert_that( file_state.IsSavedFileUnchanged( ( 1, 2, 3 ) ),
+                 equal_to( False ) )
+
+    # The saved file matches the server and is recorded as such
+    assert_that( file_state.GetSavedFileAction( 'test contents', ( 1, 2, 3 ) ),
+                 equal_to( lsp.ServerFileState.NO_ACTION ) )
+    assert_that( file_state.IsSavedFileUnchanged( ( 1, 2, 3 ) ),
+                 equal_to( True ) )
+    assert_that( file_state.IsSavedFileUnchanged( ( 1, 2, 4 ) ),
+                 equal_to( False ) )
+    assert_that( file_state.IsSavedFileUnchanged( None ), equal_to( False ) )
+
+    # The saved file changed and the new version is sent
+    assert_that( file_state.GetSavedFileAction( 'new contents', ( 4, 5, 6 ) ),
+                 equal_to( lsp.ServerFileState.CHANGE_FILE ) )
+    assert_that( file_state.IsSavedFileUnchanged( ( 4, 5, 6 ) ),
+                 equal_to( True ) )
+
+    # Sending a version from a dirty buffer invalidates the signature
+    file_state.GetDirtyFileAction( 'dirty contents' )
+    assert_that( file_state.IsSavedFileUnchanged( ( 4, 5, 6 ) ),
+                 equal_to( False ) )
+
+    file_state.GetSavedFileAction( 'new contents', ( 4, 5, 6 ) )
+    file_state.GetFileCloseAction()
+    assert_that( file_state.IsSavedFileUnchanged( ( 4, 5, 6 ) ),
+                 equal_to( False ) )
+
+
+  def test_FileSignature( self ):
+    with TemporaryTestDir() as tmp_dir:
+      filename = os.path.join( tmp_dir, 'test' )
+      assert_that( lsp.FileSignature( filename ), equal_to( None ) )
+
+      with open( filename, 'w' ) as f:
+        f.write( 'test' )
+
+      # Recently modified files have no signature
+      assert_that( lsp.FileSignature( filename ), equal_to( None ) )
+
+      mtime = time.time() - 10
+      os.utime( filename, ( mtime, mtime ) )
+      signature = lsp.FileSignature( filename )
+      assert_that( signature, is_not( equal_to( None ) ) )
+      assert_that( lsp.FileSignature( filename ), equal_to( signature ) )
+
+      with open( filename, 'w' ) as f:
+        f.write( 'test changed' )
+      os.utime( filename, ( mtime, mtime ) )
+      assert_that( lsp.FileSignature( filename ),
+                   is_not( equal_to( signature ) ) )
+
+
+  def test_DidChangeTextDocument_FullSync( self ):
+    file_state = lsp.ServerFileState( '/test' )
+    message = lsp.DidChangeTextDocument( file_state, 'new\ncontents' )
+    assert_that( _ContentChanges( message ),
+                 equal_to( [ { 'text': 'new\ncontents' } ] ) )
+
+
+  def test_DidChangeTextDocument_IncrementalSync( self ):
+    file_state = lsp.ServerFileState( '/test' )
+    for previous_contents, contents, content_changes in [
+      ( 'a\nb\nc', 'a\nx\nc', [ {
+        'range': { 'start': { 'line': 1, 'character': 0 },
+                   'end': { 'line': 2, 'character': 0 } },
+        'text': 'x\n' } ] ),
+      ( 'a\nb\nc', 'a\nc', [ {
+        'range': { 'start': { 'line': 1, 'character': 0 },
+                   'end': { 'line': 2, 'character': 0 } },
+        'text': '' } ] ),
+      ( 'a\nb\nc', 'a\nb', [ {
+        'range': { 'start': { 'line': 1, 'character': 0 },
+                   'end': { 'line': 2, 'character': 1 } },
+        'text': 'b' } ] ),
+      ( 'a\nb', 'a\nb\n', [ {
+        'range': { 'start': { 'line': 1, 'character': 0 },
+                   'end': { 'line': 1, 'character': 1 } },
+        'text': 'b\n' } ] ),
+      ( 'a\n😉', 'a\n😉x', [ {
+        'range': { 'start': { 'line': 1, 'character': 0 },
+                   'end': { 'line': 1, 'character': 2 } },
+        'text': '😉x' } ] ),
+      ( 'a\nb\nc', 'x\na\nb\nc', [ {
+        'range': { 'start': { 'line': 0, 'character': 0 },
+                   'end': { 'line': 0, 'character': 0 } },
+        'text': 'x\n' } ] ),
+      ( 'a\nb\nc', 'b\nc', [ {
+        'range': { 'start': { 'line': 0, 'character': 0 },
+                   'end': { 'line': 1, 'character': 0 } },
+        'text': '' } ] ),
+      ( 'a\na\n', 'a\na\na\n', [ {
+        'range': { 'start': { 'line': 2, 'character': 0 },
+                   'end': { 'line': 2, 'character': 0 } },
+        'text': 'a\n' } ] ),
+      ( '', 'a', [ {
+        'range': { 'start': { 'line': 0, 'character': 0 },
+                   'end': { 'line': 0, 'character': 0 } },
+        'text': 'a' } ] ),
+      ( 'a\nb', 'a\nb', [] ),
+    ]:
+      with self.subTest( previous_contents = previous_contents,
+                         contents = contents ):
+        message = lsp.DidChangeTextDocument( file_state,
+                                             contents,
+                                             previous_contents )
+        assert_that( _ContentChanges( message ), equal_to( content_changes ) )
+
+
+  def test_DidChangeTextDocument_IncrementalSync_RandomEdits( self ):
+    rng = random.Random( 1234 )
+    alphabet = [ 'a', 'b', ' ', '\n', '\r\n', '\t', 'é', '😉', '' ]
+    file_state = lsp.ServerFileState( '/test' )
+    contents = ''
+    server_contents = ''
+    for _ in range( 2000 ):
+      start = rng.randint( 0, len( contents ) )
+      end = rng.randint( start, min( len( contents ), start + 20 ) )
+      text = ''.join( rng.choice( alphabet )
+                      for _ in range( rng.randint( 0, 10 ) ) )
+      previous_contents = contents
+      contents = contents[ : start ] + text + contents[ end : ]
+
+      message = lsp.DidChangeTextDocument( file_state,
+                                           contents,
+                                           previous_contents )
+      server_contents = _ApplyContentChanges( server_contents,
+                                              _ContentChanges( message ) )
+      assert_that( server_contents, equal_to( contents ) )
+
+
   @UnixOnly
   def test_UriToFilePath_Unix( self ):
     assert_that( calling( lsp.UriToFilePath ).with_args( 'test' ),
@@ -206,3 +376,10 @@ class LanguageServerProtocolTest( TestCase ):
                      equal_to( code_units ) )
         assert_that( lsp.UTF16CodeUnitsToCodepoints( line_value, code_units ),
                      equal_to( codepoints ) )
+
+
+  def test_Parse( self ):
+    payload = '{"result":"😉"}'
+    for data in [ payload, payload.encode(), bytearray( payload.encode() ) ]:
+      with self.subTest( data = data ):
+        assert_that( lsp.Parse( data ), equal_to( { 'result': '😉' } ) )
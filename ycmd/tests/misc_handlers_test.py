@@ -28,6 +28,8 @@ from ycmd.tests.test_utils import ( BuildRequest,
                                     PatchCompleter,
                                     SignatureAvailableMatcher,
                                     ErrorMatcher )
+from ycmd.utils import ImportCore
+ycm_core = ImportCore()
 
 
 class MiscHandlersTest( TestCase ):
@@ -199,6 +201,26 @@ class MiscHandlersTest( TestCase ):
     )
 
 
+  @SharedYcmd
+  def test_MiscHandlers_DebugInfo_Repositories( self, app ):
+    element_stats = has_entries( {
+      'count': instance_of( int ),
+      'bytes': instance_of( int )
+    } )
+    assert_that(
+      app.post_json( '/debug_info', BuildRequest() ).json,
+      has_entries( {
+        'repositories': has_entries( {
+          'candidates': element_stats,
+          'characters': element_stats,
+          'code_points': element_stats,
+          'memory_budget': 256 * 1024 * 1024,
+          'collections': instance_of( int )
+        } )
+      } )
+    )
+
+
   @IsolatedYcmd()
   def test_MiscHandlers_DebugInfo_ExtraConfFoundButNotLoaded( self, app ):
     filepath = PathToTestFile( 'extra_conf', 'project', '.ycm_extra_conf.py' )
@@ -283,3 +305,8 @@ class MiscHandlersTest( TestCase ):
       assert_that( response, ErrorMatcher( RouteNotFound, "'/not_found'" ) )
       response = app.post( '/not_found', expect_errors = True ).json
       assert_that( response, ErrorMatcher( RouteNotFound, "'/not_found'" ) )
+
+
+  @IsolatedYcmd( { 'num_matching_threads': 2 } )
+  def test_MiscHandlers_NumMatchingThreads( self, app ):
+    assert_that( ycm_core.NumThreads(), equal_to( 2 ) )
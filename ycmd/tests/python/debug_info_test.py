@@ -63,3 +63,13 @@ class DebugInfoTest( TestCase ):
         )
       } ) )
     )
+    assert_that(
+      app.post_json( '/debug_info', request_data ).json,
+      has_entry( 'completions_cache', has_entries( {
+        'size': instance_of( int ),
+        'max_size': 5,
+        'hits': instance_of( int ),
+        'misses': instance_of( int ),
+        'evictions': instance_of( int )
+      } ) )
+    )
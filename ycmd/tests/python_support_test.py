@@ -17,7 +17,8 @@
 
 import os
 
-from hamcrest import assert_that, equal_to
+from hamcrest import ( assert_that, contains_exactly, equal_to, greater_than,
+                       has_entries, same_instance )
 
 from ycmd.tests.test_utils import ClangOnly
 from ycmd.utils import ToBytes, OnWindows, ImportCore
@@ -49,6 +50,64 @@ class PythonSupportTest( TestCase ):
     assert_that( b'123', equal_to( ycm_core.GetUtf8String( 123 ) ) )
 
 
+  def test_CandidateSet_FilterAndSort( self ):
+    candidates = [ 'foo', 'bar', 'fob', '', 'FOOBAR' ]
+    candidate_set = ycm_core.CandidateSet( candidates, '' )
+    assert_that( len( candidate_set ), equal_to( 5 ) )
+
+    for query, max_candidates, expected_matches in [
+        ( 'fo', 0, [ 'fob', 'foo', 'FOOBAR' ] ),
+        ( 'foo', 0, [ 'foo', 'FOOBAR' ] ),
+        ( 'foo', 1, [ 'foo' ] ),
+        ( 'fooba', 0, [ 'FOOBAR' ] ),
+        # The query doesn't extend the previous one.
+        ( 'b', 0, [ 'bar', 'fob', 'FOOBAR' ] ),
+        ( '', 0, [ 'bar', 'fob', 'foo', 'FOOBAR' ] ),
+        ( 'x', 0, [] ),
+        ( 'xf', 0, [] ),
+        ( 'f', 0, [ 'fob', 'foo', 'FOOBAR' ] ) ]:
+      assert_that( candidate_set.FilterAndSort( query, max_candidates ),
+                   equal_to( expected_matches ) )
+
+    # The candidates are not affected by changes to the original list.
+    candidates.clear()
+    assert_that( candidate_set.FilterAndSort( 'fo' ),
+                 equal_to( [ 'fob', 'foo', 'FOOBAR' ] ) )
+
+
+  def test_CandidateSet_FilterAndSort_Dictionary( self ):
+    candidates = [ { 'insertion_text': 'foo' }, { 'insertion_text': 'bar' } ]
+    candidate_set = ycm_core.CandidateSet( candidates, 'insertion_text' )
+    assert_that( candidate_set.FilterAndSort( 'b' ),
+                 contains_exactly( candidates[ 1 ] ) )
+    assert_that( candidate_set.FilterAndSort( 'b' )[ 0 ],
+                 same_instance( candidates[ 1 ] ) )
+
+
+  def test_CandidateSet_FilterAndSort_UnicodeQueryExtension( self ):
+    # The combining acute accent is part of the same character as the previous
+    # letter so candidates that did not match the previous query may match.
+    candidate_set = ycm_core.CandidateSet( [ 'é', 'e' ], '' )
+    assert_that( candidate_set.FilterAndSort( 'é' ), equal_to( [ 'é' ] ) )
+    assert_that( candidate_set.FilterAndSort( 'é' ), equal_to( [ 'é' ] ) )
+    assert_that( candidate_set.FilterAndSort( 'e' ), equal_to( [ 'e', 'é' ] ) )
+    assert_that( candidate_set.FilterAndSort( 'e\u0301' ),
+                 equal_to( [ 'é' ] ) )
+
+
+  def test_CandidateSet_FilterAndSort_AfterCollection( self ):
+    candidate_set = ycm_core.CandidateSet( [ 'foo', 'bar' ], '' )
+    ycm_core.FilterAndSortCandidates( [ 'unused_candidate' ], '', 'u' )
+    ycm_core.CollectRepositories()
+
+    debug_info = ycm_core.RepositoryDebugInfo()
+    assert_that( debug_info[ 'candidates' ][ 'count' ], greater_than( 0 ) )
+    assert_that( debug_info[ 'code_points' ], has_entries( { 'count': 0,
+                                                             'bytes': 0 } ) )
+    assert_that( debug_info[ 'collections' ], greater_than( 0 ) )
+    assert_that( candidate_set.FilterAndSort( 'fo' ), equal_to( [ 'foo' ] ) )
+
+
   @ClangOnly
   def test_CompilationDatabase_Py3Bytes( self ):
     cc_dir = ToBytes( PATH_TO_COMPILE_COMMANDS )
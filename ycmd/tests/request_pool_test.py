@@ -0,0 +1,190 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, calling, contains_exactly, equal_to,
+                       has_entries, raises )
+from threading import Event
+from unittest import TestCase
+import time
+
+from ycmd.request_pool import ( BACKGROUND_LANE, COMMAND_LANE,
+                                INTERACTIVE_LANE, LaneForBatch, LaneForPath,
+                                LONG_POLL_LANE, RequestPool )
+from ycmd.utils import StartThread
+
+
+class RequestPoolTest( TestCase ):
+  def setUp( self ):
+    self._pool = None
+    self._order = []
+    self._events = []
+
+
+  def tearDown( self ):
+    for event in self._events:
+      event.set()
+    if self._pool:
+      self._pool.Stop()
+
+
+  def RunInThread( self, lane, name ):
+    """Runs a job in |lane| that records |name| once it starts and waits for the
+    returned event."""
+    event = Event()
+    self._events.append( event )
+
+    def Job():
+      self._order.append( name )
+      event.wait()
+
+    return event, StartThread( self._pool.Run, lane, Job )
+
+
+  def WaitFor( self, lane, queued, running ):
+    for _ in range( 1000 ):
+      info = self._pool.DebugInfo()[ lane ]
+      if info[ 'queued' ] == queued and info[ 'running' ] == running:
+        return
+      time.sleep( 0.01 )
+    raise AssertionError( f'{ lane } lane never had { queued } queued and '
+                          f'{ running } running requests' )
+
+
+  def test_LaneForPath( self ):
+    assert_that( LaneForPath( '/completions' ), equal_to( INTERACTIVE_LANE ) )
+    assert_that( LaneForPath( '/signature_help' ),
+                 equal_to( INTERACTIVE_LANE ) )
+    assert_that( LaneForPath( '/event_notification' ),
+                 equal_to( BACKGROUND_LANE ) )
+    assert_that( LaneForPath( '/semantic_tokens' ),
+                 equal_to( BACKGROUND_LANE ) )
+    assert_that( LaneForPath( '/receive_messages' ),
+                 equal_to( LONG_POLL_LANE ) )
+    assert_that( LaneForPath( '/run_completer_command' ),
+                 equal_to( COMMAND_LANE ) )
+    assert_that( LaneForPath( '/healthy' ), equal_to( None ) )
+    assert_that( LaneForPath( '/ready' ), equal_to( None ) )
+    assert_that( LaneForPath( '/shutdown' ), equal_to( None ) )
+
+
+  def test_LaneForBatch( self ):
+    assert_that( LaneForBatch( b'{"requests":[]}' ),
+                 equal_to( BACKGROUND_LANE ) )
+    assert_that(
+      LaneForBatch( b'{"requests":[{"handler":"event_notification"},'
+                    b'{"handler": "completions"}]}' ),
+      equal_to( INTERACTIVE_LANE ) )
+    assert_that(
+      LaneForBatch( b'{"requests":[{"handler":"event_notification"},'
+                    b'{"handler": "run_completer_command"}]}' ),
+      equal_to( COMMAND_LANE ) )
+    # Handlers in strings, e.g. in the contents of a buffer, are ignored.
+    assert_that(
+      LaneForBatch( b'{"file_data":{"/foo":{"contents":'
+                    b'"{\\"handler\\":\\"completions\\"}"}},'
+                    b'"requests":[{"handler":"semantic_tokens"}]}' ),
+      equal_to( BACKGROUND_LANE ) )
+
+
+  def test_Run_ReturnsResultOrRaises( self ):
+    self._pool = RequestPool( num_workers = 1, num_long_poll_workers = 1 )
+    assert_that( self._pool.Run( INTERACTIVE_LANE, lambda: 42 ),
+                 equal_to( 42 ) )
+
+    def Raise():
+      raise ValueError( 'error' )
+
+    assert_that( calling( self._pool.Run ).with_args( BACKGROUND_LANE, Raise ),
+                 raises( ValueError, 'error' ) )
+
+
+  def test_Run_InteractiveBeforeBackground( self ):
+    self._pool = RequestPool( num_workers = 1, num_long_poll_workers = 1 )
+    first, _ = self.RunInThread( INTERACTIVE_LANE, 'first' )
+    self.WaitFor( INTERACTIVE_LANE, queued = 0, running = 1 )
+    _, background = self.RunInThread( BACKGROUND_LANE, 'background' )
+    self.WaitFor( BACKGROUND_LANE, queued = 1, running = 0 )
+    _, interactive = self.RunInThread( INTERACTIVE_LANE, 'interactive' )
+    self.WaitFor( INTERACTIVE_LANE, queued = 1, running = 1 )
+
+    first.set()
+    self.WaitFor( INTERACTIVE_LANE, queued = 0, running = 1 )
+    for event in self._events:
+      event.set()
+    background.join()
+    interactive.join()
+    assert_that( self._order,
+                 contains_exactly( 'first', 'interactive', 'background' ) )
+
+
+  def test_Run_BackgroundLeavesAWorkerToInteractive( self ):
+    self._pool = RequestPool( num_workers = 2, num_long_poll_workers = 1 )
+    self.RunInThread( BACKGROUND_LANE, 'background 1' )
+    self.RunInThread( BACKGROUND_LANE, 'background 2' )
+    self.WaitFor( BACKGROUND_LANE, queued = 1, running = 1 )
+
+    assert_that( self._pool.Run( INTERACTIVE_LANE, lambda: 'interactive' ),
+                 equal_to( 'interactive' ) )
+
+
+  def test_Run_CommandsLeaveWorkersToOtherLanes( self ):
+    self._pool = RequestPool( num_workers = 4, num_long_poll_workers = 1 )
+    for index in range( 3 ):
+      self.RunInThread( COMMAND_LANE, f'command { index }' )
+    self.WaitFor( COMMAND_LANE, queued = 1, running = 2 )
+
+    self.RunInThread( BACKGROUND_LANE, 'background 1' )
+    self.RunInThread( BACKGROUND_LANE, 'background 2' )
+    self.WaitFor( BACKGROUND_LANE, queued = 1, running = 1 )
+
+    assert_that( self._pool.Run( INTERACTIVE_LANE, lambda: 'interactive' ),
+                 equal_to( 'interactive' ) )
+
+
+  def test_Run_LongPollsHaveTheirOwnWorkers( self ):
+    self._pool = RequestPool( num_workers = 1, num_long_poll_workers = 1 )
+    self.RunInThread( LONG_POLL_LANE, 'long poll 1' )
+    self.RunInThread( LONG_POLL_LANE, 'long poll 2' )
+    self.WaitFor( LONG_POLL_LANE, queued = 1, running = 1 )
+
+    assert_that( self._pool.Run( BACKGROUND_LANE, lambda: 'background' ),
+                 equal_to( 'background' ) )
+
+
+  def test_DebugInfo( self ):
+    self._pool = RequestPool( num_workers = 2, num_long_poll_workers = 1 )
+    self._pool.Run( INTERACTIVE_LANE, lambda: None )
+    self._pool.Run( INTERACTIVE_LANE, lambda: None )
+    assert_that( self._pool.DebugInfo(), has_entries( {
+      INTERACTIVE_LANE: has_entries( {
+        'queued': 0,
+        'max_queued': 1,
+        'running': 0,
+        'max_running': 2,
+        'requests': 2
+      } ),
+      BACKGROUND_LANE: has_entries( {
+        'max_running': 1,
+        'requests': 0,
+        'mean_wait_ms': 0.0,
+        'max_wait_ms': 0.0
+      } ),
+      LONG_POLL_LANE: has_entries( {
+        'max_running': 1,
+        'requests': 0
+      } )
+    } ) )
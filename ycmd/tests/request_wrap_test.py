@@ -413,3 +413,67 @@ class RequestWrapTest( TestCase ):
     extra_conf_data[ 'key' ].append( 'another_value' )
     assert_that( extra_conf_data,
                  has_entry( 'key', contains_exactly( 'value' ) ) )
+
+
+  def test_Equal_IgnoresCurrentLine( self ):
+    wrap = RequestWrap( PrepareJson( 'foo\nbar\nbaz', line_num = 2 ) )
+    assert_that( wrap == RequestWrap(
+                   PrepareJson( 'foo\nbar\nbaz', line_num = 2 ) ),
+                 equal_to( True ) )
+    assert_that( wrap == RequestWrap(
+                   PrepareJson( 'foo\nbarx\nbaz', line_num = 2 ) ),
+                 equal_to( True ) )
+    assert_that( wrap == RequestWrap(
+                   PrepareJson( 'foo\n\nbaz', line_num = 2 ) ),
+                 equal_to( True ) )
+    assert_that( wrap == RequestWrap(
+                   PrepareJson( 'foox\nbar\nbaz', line_num = 2 ) ),
+                 equal_to( False ) )
+    assert_that( wrap == RequestWrap(
+                   PrepareJson( 'foo\nbar\nbazx', line_num = 2 ) ),
+                 equal_to( False ) )
+    assert_that( wrap == RequestWrap(
+                   PrepareJson( 'foo\nbar\n\nbaz', line_num = 2 ) ),
+                 equal_to( False ) )
+    assert_that( wrap == RequestWrap(
+                   PrepareJson( 'foo\nbar\nbaz', line_num = 3 ) ),
+                 equal_to( False ) )
+
+
+  def test_Equal_FirstAndLastLines( self ):
+    wrap = RequestWrap( PrepareJson( 'foo\nbar', line_num = 1 ) )
+    assert_that( wrap == RequestWrap( PrepareJson( 'x\nbar', line_num = 1 ) ),
+                 equal_to( True ) )
+    assert_that( wrap == RequestWrap( PrepareJson( 'foo\nx', line_num = 1 ) ),
+                 equal_to( False ) )
+
+    wrap = RequestWrap( PrepareJson( 'foo\nbar', line_num = 2 ) )
+    assert_that( wrap == RequestWrap( PrepareJson( 'foo\nx', line_num = 2 ) ),
+                 equal_to( True ) )
+    assert_that( wrap == RequestWrap( PrepareJson( 'x\nbar', line_num = 2 ) ),
+                 equal_to( False ) )
+
+    # Line past the end of the file
+    wrap = RequestWrap( PrepareJson( 'foo\nbar', line_num = 3 ) )
+    assert_that( wrap == RequestWrap( PrepareJson( 'foo\nbar',
+                                                   line_num = 3 ) ),
+                 equal_to( True ) )
+    assert_that( wrap == RequestWrap( PrepareJson( 'foo\nx', line_num = 3 ) ),
+                 equal_to( False ) )
+
+
+  def test_Equal_OtherFiles( self ):
+    def Wrap( other_contents, other_filetypes = [ 'bar' ] ):
+      request = PrepareJson( 'foo', line_num = 1 )
+      request[ 'file_data' ][ '/bar' ] = {
+        'filetypes': other_filetypes,
+        'contents': other_contents
+      }
+      return RequestWrap( request )
+
+    wrap = Wrap( 'bar' )
+    assert_that( wrap == Wrap( 'bar' ), equal_to( True ) )
+    assert_that( wrap == Wrap( 'baz' ), equal_to( False ) )
+    assert_that( wrap == Wrap( 'bar', [ 'baz' ] ), equal_to( False ) )
+    assert_that( wrap == RequestWrap( PrepareJson( 'foo', line_num = 1 ) ),
+                 equal_to( False ) )
@@ -0,0 +1,343 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import assert_that, contains_exactly, equal_to, has_entries
+from http.client import HTTPConnection
+from threading import Event
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+import os
+import socket
+import stat
+import time
+
+from ycmd.request_pool import NUM_WORKERS
+from ycmd.tests.test_utils import TemporaryTestDir
+from ycmd.utils import OnWindows, StartThread
+from ycmd.web_plumbing import _MEMFILE_MAX, AppProducer
+from ycmd.wsgi_server import StoppableWSGIServer
+
+
+# Responds with the path of the request followed by its body, or only the path
+# for the /ignore_body path.
+def EchoApp( environ, start_response ):
+  response = environ[ 'PATH_INFO' ].encode()
+  if environ[ 'PATH_INFO' ] != '/ignore_body':
+    length = int( environ.get( 'CONTENT_LENGTH' ) or 0 )
+    response += environ[ 'wsgi.input' ].read( length )
+  start_response( '200 OK', [ ( 'Content-Type', 'text/plain' ),
+                              ( 'Content-Length', str( len( response ) ) ) ] )
+  return [ response ]
+
+
+# Responds once the event of the server is set to /run_completer_command
+# requests, and at once to the others.
+def SlowCommandApp( environ, start_response ):
+  if environ[ 'PATH_INFO' ] == '/run_completer_command':
+    environ[ 'ycmd.test_event' ].wait()
+  return EchoApp( environ, start_response )
+
+
+def SlowParseApp( environ, start_response ):
+  """Blocks the event notifications until the test event is set and shuts the
+  server down like the /shutdown handler."""
+  if environ[ 'PATH_INFO' ] == '/event_notification':
+    environ[ 'ycmd.test_event' ].wait()
+  if environ[ 'PATH_INFO' ] == '/shutdown':
+    StartThread( environ[ 'ycmd.test_server' ].shutdown )
+  return EchoApp( environ, start_response )
+
+
+def BatchApp():
+  app = AppProducer()
+  app.SetErrorHandler( lambda error, response: '' )
+
+  @app.post( '/batch' )
+  def Batch( request, response ):
+    return request.body.decode()
+
+  return app
+
+
+def StreamingApp( environ, start_response ):
+  start_response( '200 OK', [ ( 'Content-Type', 'text/plain' ) ] )
+  yield b'foo'
+  yield b'bar'
+
+
+def ReadResponses( sock, count ):
+  responses = []
+  stream = sock.makefile( 'rb' )
+  for _ in range( count ):
+    headers = {}
+    status_line = stream.readline()
+    while True:
+      line = stream.readline().strip()
+      if not line:
+        break
+      name, value = line.split( b':', 1 )
+      headers[ name.strip().lower() ] = value.strip()
+    body = stream.read( int( headers[ b'content-length' ] ) )
+    responses.append( ( status_line.split()[ 0 ], body ) )
+  return responses
+
+
+class UnixHTTPConnection( HTTPConnection ):
+  def __init__( self, path ):
+    super().__init__( 'localhost' )
+    self._path = path
+
+
+  def connect( self ):
+    self.sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+    self.sock.connect( self._path )
+
+
+class WSGIServerTest( TestCase ):
+  def setUp( self ):
+    self._server = None
+    self._thread = None
+    self._events = []
+
+
+  def tearDown( self ):
+    for event in self._events:
+      event.set()
+    if self._server:
+      self._server.shutdown()
+      self._server.server_close()
+      self._thread.join()
+
+
+  def Start( self, app, **kwargs ):
+    self._server = StoppableWSGIServer( app, '127.0.0.1', 0, **kwargs )
+    self._thread = StartThread( self._server.serve_forever )
+    return self._server.server_port
+
+
+  def test_KeepAlive_RequestsOnOneConnection( self ):
+    connection = HTTPConnection( '127.0.0.1', self.Start( EchoApp ) )
+    for path, body in [ ( '/foo', b'' ),
+                        ( '/bar', b'baz' ),
+                        ( '/ignore_body', b'qux' ),
+                        ( '/zoo', b'' ) ]:
+      connection.request( 'POST', path, body )
+      response = connection.getresponse()
+      assert_that( response.version, equal_to( 11 ) )
+      assert_that( response.read(),
+                   equal_to( path.encode() +
+                             ( b'' if path == '/ignore_body' else body ) ) )
+      assert_that( response.will_close, equal_to( False ) )
+    connection.close()
+
+
+  def test_KeepAlive_PipelinedRequests( self ):
+    port = self.Start( EchoApp )
+    with socket.create_connection( ( '127.0.0.1', port ) ) as sock:
+      sock.sendall( b'POST /foo HTTP/1.1\r\nHost: x\r\n'
+                    b'Content-Length: 3\r\n\r\nbar'
+                    b'POST /ignore_body HTTP/1.1\r\nHost: x\r\n'
+                    b'Content-Length: 3\r\n\r\nbaz'
+                    b'GET /qux HTTP/1.1\r\nHost: x\r\n\r\n' )
+      assert_that( ReadResponses( sock, 3 ), contains_exactly(
+        ( b'HTTP/1.1', b'/foobar' ),
+        ( b'HTTP/1.1', b'/ignore_body' ),
+        ( b'HTTP/1.1', b'/qux' ) ) )
+
+
+  def test_KeepAlive_ConnectionClosedOnRequest( self ):
+    port = self.Start( EchoApp )
+    with socket.create_connection( ( '127.0.0.1', port ) ) as sock:
+      sock.sendall( b'GET /foo HTTP/1.1\r\nHost: x\r\n'
+                    b'Connection: close\r\n\r\n' )
+      assert_that( ReadResponses( sock, 1 ),
+                   contains_exactly( ( b'HTTP/1.1', b'/foo' ) ) )
+      assert_that( sock.recv( 1 ), equal_to( b'' ) )
+
+    with socket.create_connection( ( '127.0.0.1', port ) ) as sock:
+      sock.sendall( b'GET /foo HTTP/1.0\r\n\r\n' )
+      assert_that( ReadResponses( sock, 1 ),
+                   contains_exactly( ( b'HTTP/1.1', b'/foo' ) ) )
+      assert_that( sock.recv( 1 ), equal_to( b'' ) )
+
+
+  def test_KeepAlive_ConnectionClosedWithoutContentLength( self ):
+    connection = HTTPConnection( '127.0.0.1', self.Start( StreamingApp ) )
+    connection.request( 'GET', '/' )
+    response = connection.getresponse()
+    assert_that( response.will_close, equal_to( True ) )
+    assert_that( response.read(), equal_to( b'foobar' ) )
+    connection.close()
+
+
+  def test_KeepAlive_IdleConnectionsClosedWithServer( self ):
+    connection = HTTPConnection( '127.0.0.1', self.Start( EchoApp ) )
+    connection.request( 'GET', '/foo' )
+    assert_that( connection.getresponse().read(), equal_to( b'/foo' ) )
+
+    # Closing the server waits for the thread of the idle connection.
+    self._server.shutdown()
+    self._server.server_close()
+    self._thread.join()
+    self._server = None
+    connection.close()
+
+
+  def test_NoKeepAlive_ConnectionClosedAfterRequest( self ):
+    connection = HTTPConnection( '127.0.0.1',
+                                 self.Start( EchoApp, keep_alive = False ) )
+    connection.request( 'POST', '/foo', b'bar' )
+    response = connection.getresponse()
+    assert_that( response.version, equal_to( 10 ) )
+    assert_that( response.will_close, equal_to( True ) )
+    assert_that( response.read(), equal_to( b'/foobar' ) )
+    connection.close()
+
+
+  def test_RequestsRunInTheirLane( self ):
+    connection = HTTPConnection( '127.0.0.1', self.Start( EchoApp ) )
+    for path, body in [
+      ( '/completions', b'' ),
+      ( '/event_notification', b'' ),
+      ( '/semantic_tokens', b'' ),
+      ( '/batch', b'{"requests":[{"handler":"completions"}]}' ),
+      ( '/batch', b'{"requests":[{"handler":"semantic_tokens"}]}' ) ]:
+      connection.request( 'POST', path, body )
+      assert_that( connection.getresponse().read(),
+                   equal_to( path.encode() + body ) )
+    connection.close()
+    assert_that( self._server.RequestPoolDebugInfo(), has_entries( {
+      'interactive': has_entries( { 'requests': 2 } ),
+      'background': has_entries( { 'requests': 3 } ),
+      'long_poll': has_entries( { 'requests': 0 } )
+    } ) )
+
+
+  def test_HealthChecksAndCompletionsNotBlockedBySlowCommands( self ):
+    event = Event()
+    self._events.append( event )
+    port = self.Start( SlowCommandApp )
+    self._server.base_environ[ 'ycmd.test_event' ] = event
+
+    def RunCommand():
+      connection = HTTPConnection( '127.0.0.1', port )
+      connection.request( 'POST', '/run_completer_command' )
+      connection.getresponse().read()
+      connection.close()
+
+    commands = [ StartThread( RunCommand ) for _ in range( 2 * NUM_WORKERS ) ]
+    for _ in range( 1000 ):
+      if self._server.RequestPoolDebugInfo()[ 'command' ][ 'queued' ] == (
+          2 * NUM_WORKERS - NUM_WORKERS // 2 ):
+        break
+      time.sleep( 0.01 )
+
+    connection = HTTPConnection( '127.0.0.1', port, timeout = 10 )
+    for method, path in [ ( 'GET', '/healthy' ),
+                          ( 'GET', '/ready' ),
+                          ( 'POST', '/completions' ) ]:
+      connection.request( method, path )
+      assert_that( connection.getresponse().read(), equal_to( path.encode() ) )
+    connection.close()
+    assert_that( self._server.RequestPoolDebugInfo(), has_entries( {
+      'command': has_entries( { 'running': NUM_WORKERS // 2 } ),
+      'interactive': has_entries( { 'requests': 1 } )
+    } ) )
+
+    event.set()
+    for command in commands:
+      command.join()
+
+
+  def test_ShutdownNotBlockedBySlowEvents( self ):
+    event = Event()
+    self._events.append( event )
+    port = self.Start( SlowParseApp )
+    self._server.base_environ[ 'ycmd.test_event' ] = event
+    self._server.base_environ[ 'ycmd.test_server' ] = self._server
+
+    def SendEvent():
+      connection = HTTPConnection( '127.0.0.1', port )
+      connection.request( 'POST', '/event_notification' )
+      connection.getresponse().read()
+      connection.close()
+
+    events = [ StartThread( SendEvent ) for _ in range( 2 * NUM_WORKERS ) ]
+    for _ in range( 1000 ):
+      if self._server.RequestPoolDebugInfo()[ 'background' ][ 'queued' ] == (
+          2 * NUM_WORKERS - ( NUM_WORKERS - 1 ) ):
+        break
+      time.sleep( 0.01 )
+    assert_that( self._server.RequestPoolDebugInfo(), has_entries( {
+      'background': has_entries( { 'running': NUM_WORKERS - 1 } )
+    } ) )
+
+    connection = HTTPConnection( '127.0.0.1', port, timeout = 10 )
+    connection.request( 'POST', '/shutdown' )
+    assert_that( connection.getresponse().read(), equal_to( b'/shutdown' ) )
+    connection.close()
+    self._thread.join( 10 )
+    assert_that( self._thread.is_alive(), equal_to( False ) )
+
+    event.set()
+    for event_thread in events:
+      event_thread.join()
+
+
+  def test_Batch_TooLargeBodyRejectedUnread( self ):
+    port = self.Start( BatchApp() )
+    with socket.create_connection( ( '127.0.0.1', port ), timeout = 10 ) as sock:
+      # Only the start of the body is sent: the server must answer without
+      # waiting for the rest.
+      sock.sendall( b'POST /batch HTTP/1.1\r\nHost: x\r\n'
+                    b'Content-Length: ' + str( _MEMFILE_MAX + 1 ).encode() +
+                    b'\r\n\r\n{"requests":[' )
+      status_line = sock.makefile( 'rb' ).readline()
+    assert_that( status_line.split()[ 1 ], equal_to( b'413' ) )
+
+    connection = HTTPConnection( '127.0.0.1', port )
+    connection.request( 'POST', '/batch', b'{"requests":[]}' )
+    assert_that( connection.getresponse().read(),
+                 equal_to( b'{"requests":[]}' ) )
+    connection.close()
+
+
+  @skipIf( OnWindows(), 'Unix domain sockets are not supported on Windows' )
+  def test_UnixSocket( self ):
+    with TemporaryTestDir() as tmp_dir:
+      path = os.path.join( tmp_dir, 'ycmd.sock' )
+      # A socket left by a previous server is replaced.
+      with socket.socket( socket.AF_UNIX, socket.SOCK_STREAM ) as sock:
+        sock.bind( path )
+
+      with patch( 'os.umask' ) as umask:
+        self.Start( EchoApp, unix_socket = path )
+      umask.assert_not_called()
+      assert_that( stat.S_IMODE( os.stat( path ).st_mode ),
+                   equal_to( 0o600 ) )
+      connection = UnixHTTPConnection( path )
+      for body in [ b'foo', b'bar' * 100000 ]:
+        connection.request( 'POST', '/echo', body )
+        assert_that( connection.getresponse().read(),
+                     equal_to( b'/echo' + body ) )
+      connection.close()
+
+      self._server.shutdown()
+      self._server.server_close()
+      self._thread.join()
+      self._server = None
+      assert_that( os.path.exists( path ), equal_to( False ) )
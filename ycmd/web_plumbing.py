@@ -44,6 +44,7 @@ class HTTPError( Exception ):
 
 class Response:
   def __init__( self ):
+    self.status : int = 200
     self.headers : List[ Tuple[ str, str ] ] = []
 
   def set_header( self, name : str, value : str ) -> None:
@@ -195,13 +196,21 @@ class AppProducer:
     self.plugins.append( plugin )
     self._RecalculateAllRoutes()
 
+  def GetCallback( self, path : str, method : str = 'POST' ) -> CallbackType:
+    """ Returns the callback of a route, without the plugins applied.
+    Raises RouteNotFound if there is no such route. """
+    for route_path, route_method, callback in self._original_routes:
+      if route_path == path and route_method == method:
+        return callback
+    raise RouteNotFound( path )
+
   def __call__( self, environ, start_response ) -> List[ bytes ]:
-    status = '200 OK'
-    request = Request( environ )
     response = Response()
     try:
+      # Checked before the body is read, so that it is never buffered.
       if int( environ.get( 'CONTENT_LENGTH' ) or '0' ) > _MEMFILE_MAX:
         raise HTTPError( 413, 'Request too large' )
+      request = Request( environ )
       try:
         if request.method == 'GET':
           callback = self._get_routes[ request.path ]
@@ -211,6 +220,8 @@ class AppProducer:
         raise RouteNotFound( e.args[ 0 ] )
       else:
         out = callback( request, response )
+        status = ( f'{ response.status } '
+                   f'{ http.client.responses[ response.status ] }' )
     except HTTPError as e:
       status = f'{ e.status } { e.body }'
       response = Response()
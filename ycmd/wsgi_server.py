@@ -15,13 +15,311 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
-from wsgiref.simple_server import WSGIServer, WSGIRequestHandler
+import io
+import os
+import socket
+import stat
+import threading
+from wsgiref.simple_server import ServerHandler, WSGIServer, WSGIRequestHandler
 from socketserver import ThreadingMixIn
 
+from ycmd.request_pool import ( BATCH_PATH, LaneForBatch, LaneForPath,
+                                RequestPool )
+from ycmd.web_plumbing import _MEMFILE_MAX
+
+# Set in the environment of the requests received on a Unix domain socket.
+UNIX_SOCKET_ENVIRON_KEY = 'ycmd.unix_socket'
+MAX_REQUEST_LINE_LENGTH = 65536
+# Size of the chunks in which the unread part of a request body is discarded.
+DISCARD_CHUNK_SIZE = 65536
+
 
 class StoppableWSGIServer( ThreadingMixIn, WSGIServer ):
+  """WSGI server reading each connection in its own thread. The application is
+  run on the threads of a RequestPool. With |keep_alive|, connections persist
+  across requests as in HTTP/1.1; otherwise, they are closed after each request
+  as in HTTP/1.0. With |unix_socket|, the server listens on a Unix domain socket
+  at that path, which only the user can connect to, instead of |host| and
+  |port|."""
   daemon_threads = False
 
-  def __init__( self, app, host, port ):
-    super().__init__( ( host, port ), WSGIRequestHandler )
-    self.set_app( app )
+  def __init__( self,
+                app,
+                host,
+                port,
+                keep_alive = True,
+                unix_socket = None,
+                **kwargs ):
+    if unix_socket:
+      if not hasattr( socket, 'AF_UNIX' ):
+        raise RuntimeError( 'Unix domain sockets are not supported on this '
+                            'platform.' )
+      self.address_family = socket.AF_UNIX
+      address = unix_socket
+    else:
+      address = ( host, port )
+    super().__init__( address,
+                      KeepAliveWSGIRequestHandler if keep_alive else
+                      WSGIRequestHandler )
+    self._request_pool = RequestPool( **kwargs )
+    self.set_app( _PooledApp( app, self._request_pool ) )
+    self._idle_connections_lock = threading.Lock()
+    self._idle_connections = set()
+    self._closing = False
+
+
+  def IsUnixSocket( self ):
+    return self.address_family == getattr( socket, 'AF_UNIX', None )
+
+
+  def server_bind( self ):
+    if not self.IsUnixSocket():
+      return super().server_bind()
+
+    # A socket left by a server that didn't exit cleanly prevents binding.
+    try:
+      if stat.S_ISSOCK( os.stat( self.server_address ).st_mode ):
+        os.remove( self.server_address )
+    except OSError:
+      pass
+    self.socket.bind( self.server_address )
+    # Restrict the socket to the current user before server_activate starts
+    # listening on it. Changing the umask instead would affect the files
+    # created by the other threads of the process.
+    os.chmod( self.server_address, 0o600 )
+    self.server_name = 'localhost'
+    self.server_port = 0
+    self.setup_environ()
+    self.base_environ[ UNIX_SOCKET_ENVIRON_KEY ] = True
+
+
+  def get_request( self ):
+    request, client_address = super().get_request()
+    if self.IsUnixSocket():
+      # Clients of Unix domain sockets have no address.
+      client_address = ( 'localhost', 0 )
+    return request, client_address
+
+
+  def SetConnectionIdle( self, connection, idle ):
+    """Marks |connection| as waiting for its next request or not. Returns False
+    if the server is closing, in which case no more requests should be read."""
+    with self._idle_connections_lock:
+      if idle:
+        if self._closing:
+          return False
+        self._idle_connections.add( connection )
+      else:
+        self._idle_connections.discard( connection )
+      return True
+
+
+  def server_close( self ):
+    # Connections waiting for their next request are shut down so that their
+    # threads end and can be joined.
+    with self._idle_connections_lock:
+      self._closing = True
+      for connection in self._idle_connections:
+        try:
+          connection.shutdown( socket.SHUT_RDWR )
+        except OSError:
+          pass
+    super().server_close()
+    self._request_pool.Stop()
+    if self.IsUnixSocket():
+      try:
+        os.remove( self.server_address )
+      except OSError:
+        pass
+
+
+  def RequestPoolDebugInfo( self ):
+    return self._request_pool.DebugInfo()
+
+
+class _PooledApp:
+  """Runs a WSGI application in the lane of the request path, or of the
+  requests of a batch. Requests outside of any lane are run directly."""
+
+  def __init__( self, app, request_pool ):
+    self._app = app
+    self._request_pool = request_pool
+
+
+  def __call__( self, environ, start_response ):
+    def Run():
+      result = self._app( environ, start_response )
+      try:
+        return list( result )
+      finally:
+        if hasattr( result, 'close' ):
+          result.close()
+
+    path = environ[ 'PATH_INFO' ]
+    content_length = int( environ.get( 'CONTENT_LENGTH' ) or 0 )
+    # The body of a batch is read first to find the lane of its requests. Too
+    # large bodies are left to the application, which rejects them unread.
+    if path == BATCH_PATH and content_length <= _MEMFILE_MAX:
+      body = environ[ 'wsgi.input' ].read( content_length )
+      environ[ 'wsgi.input' ] = io.BytesIO( body )
+      lane = LaneForBatch( body )
+    else:
+      lane = LaneForPath( path )
+    if lane is None:
+      return Run()
+    return self._request_pool.Run( lane, Run )
+
+
+class KeepAliveWSGIRequestHandler( WSGIRequestHandler ):
+  """Handles the requests of a connection until the client closes it or asks
+  for it to be closed. Requests sent without waiting for the previous responses
+  are answered in order."""
+  protocol_version = 'HTTP/1.1'
+  # Otherwise, the body of a response written after its headers is delayed
+  # until the client acknowledges the headers, which it may itself delay.
+  disable_nagle_algorithm = True
+  # Responses are buffered and sent at once.
+  wbufsize = -1
+
+
+  def setup( self ):
+    self.disable_nagle_algorithm = not self.server.IsUnixSocket()
+    super().setup()
+
+
+  def handle( self ):
+    self.close_connection = False
+    while not self.close_connection:
+      self.handle_one_request()
+
+
+  def handle_one_request( self ):
+    if not self.server.SetConnectionIdle( self.connection, True ):
+      self.close_connection = True
+      return
+    try:
+      self.raw_requestline = self.rfile.readline( MAX_REQUEST_LINE_LENGTH + 1 )
+    except OSError:
+      self.raw_requestline = b''
+    finally:
+      self.server.SetConnectionIdle( self.connection, False )
+
+    if not self.raw_requestline:
+      self.close_connection = True
+      return
+
+    if len( self.raw_requestline ) > MAX_REQUEST_LINE_LENGTH:
+      self.requestline = ''
+      self.request_version = ''
+      self.command = ''
+      self.send_error( 414 )
+      self.close_connection = True
+      return
+
+    # An error is sent and the connection closed if the request is invalid.
+    if not self.parse_request():
+      return
+
+    if 'transfer-encoding' in self.headers:
+      # The end of the body is only known to the application.
+      body = self.rfile
+      self.close_connection = True
+    else:
+      try:
+        body = _RequestBody( self.rfile,
+                             int( self.headers.get( 'content-length', 0 ) ) )
+      except ValueError:
+        self.send_error( 400, 'Bad Content-Length' )
+        self.close_connection = True
+        return
+
+    handler = _KeepAliveServerHandler(
+      body, self.wfile, self.get_stderr(), self.get_environ(),
+      multithread = False )
+    handler.request_handler = self
+    handler.run( self.server.get_app() )
+    try:
+      self.wfile.flush()
+    except OSError:
+      self.close_connection = True
+
+    if not self.close_connection:
+      # The application may not have read the whole body.
+      body.Discard()
+
+
+  def handle_expect_100( self ):
+    result = super().handle_expect_100()
+    self.wfile.flush()
+    return result
+
+
+class _KeepAliveServerHandler( ServerHandler ):
+  http_version = '1.1'
+
+
+  def cleanup_headers( self ):
+    super().cleanup_headers()
+    # Without a length, the end of the response is the end of the connection.
+    if 'Content-Length' not in self.headers:
+      self.request_handler.close_connection = True
+    if self.request_handler.close_connection:
+      self.headers[ 'Connection' ] = 'close'
+
+
+  def handle_error( self ):
+    # The response that was being sent can't be completed.
+    if self.headers_sent:
+      self.request_handler.close_connection = True
+    super().handle_error()
+
+
+class _RequestBody:
+  """Reads the body of a request from a connection without reading past its
+  end, so that the next request can be read from the connection."""
+
+  def __init__( self, stream, length ):
+    self._stream = stream
+    self._remaining = max( length, 0 )
+
+
+  def read( self, size = -1 ):
+    return self._Read( self._stream.read, size )
+
+
+  def readline( self, size = -1 ):
+    return self._Read( self._stream.readline, size )
+
+
+  def readlines( self, hint = -1 ):
+    lines = []
+    total_size = 0
+    for line in self:
+      lines.append( line )
+      total_size += len( line )
+      if 0 < hint <= total_size:
+        break
+    return lines
+
+
+  def __iter__( self ):
+    while True:
+      line = self.readline()
+      if not line:
+        return
+      yield line
+
+
+  def Discard( self ):
+    while self._remaining and self.read( DISCARD_CHUNK_SIZE ):
+      pass
+
+
+  def _Read( self, read, size ):
+    if size is None or size < 0 or size > self._remaining:
+      size = self._remaining
+    if not size:
+      return b''
+    data = read( size )
+    self._remaining -= len( data )
+    return data